@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+"""Offline benchmarks of the onevizion library against the local API stand-in of standin.py.
+
+Each scenario calls one wrapper method over and over, from one or more threads, and measures its
+throughput, latency percentiles and the peak memory the calls allocate.  The results are saved as JSON,
+and a saved run can be compared with the current one to spot regressions between versions:
+
+	python benchmarks/run_benchmarks.py --label before
+	...change the library...
+	python benchmarks/run_benchmarks.py --label after --compare benchmarks/results/before.json
+
+Run it from the root of the repository so the onevizion package being worked on is the one measured.
+"""
+
+import argparse
+import atexit
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import onevizion
+
+ResultsDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+UserName = 'benchmark'
+Password = 'benchmark'
+
+
+class BenchmarkNotificationService(onevizion.NotificationService):
+	"""Notification service that sends nothing, so start() measures only the library's calls."""
+
+	def sendNotification(self, notifQueueRecord):
+		pass
+
+
+def trackorRead(URL, settings):
+	trackor = onevizion.Trackor('Site', URL, UserName, Password)
+	fields = ['TRACKOR_KEY', 'SITE_NAME', 'SITE_STATUS', 'SITE_DESCRIPTION']
+	return lambda: trackor.read(filters={'SITE_STATUS': 'Active'}, fields=fields)
+
+
+def trackorIterRead(URL, settings):
+	trackor = onevizion.Trackor('Site', URL, UserName, Password)
+	fields = ['TRACKOR_KEY', 'SITE_NAME', 'SITE_STATUS', 'SITE_DESCRIPTION']
+	# Reads all the pages of the trackor type, settings.total trackors.
+	return lambda: sum(1 for record in trackor.iterRead(fields=fields, perPage=settings.per_page, prefetch=settings.prefetch, workers=settings.workers))
+
+
+def trackorUpdate(URL, settings):
+	trackor = onevizion.Trackor('Site', URL, UserName, Password)
+	fields = {'SITE_NAME': 'Benchmark Site', 'SITE_STATUS': 'Active', 'SITE_DESCRIPTION': 'x' * 256}
+	return lambda: trackor.update(trackorId=1, fields=fields)
+
+
+def exportGetFile(URL, settings):
+	export = onevizion.Export(URL, UserName, Password, trackorType='Site')
+	return lambda: export.getFile(1001)
+
+
+def importRun(URL, settings):
+	with tempfile.NamedTemporaryFile('wb', suffix='.csv', delete=False) as f:
+		line = b"TRACKOR_KEY,SITE_NAME,SITE_STATUS\r\nK1,Site 1,Active\r\n"
+		f.write((line * (settings.import_size // len(line) + 1))[:settings.import_size])
+	atexit.register(os.remove, f.name)
+	def run():
+		# An Import given its spec and file runs right away, the way modules use it.
+		ovImport = onevizion.Import(URL, UserName, Password, impSpecId=1, file=f.name)
+		ovImport.ImportFile['file'][1].close()
+	return run
+
+
+def moduleLogAdd(URL, settings):
+	moduleLog = onevizion.ModuleLog(1, URL, UserName, Password, logLevelName='Debug')
+	return lambda: moduleLog.add(onevizion.LogLevel.INFO, 'Benchmark message', 'Benchmark description')
+
+
+def notificationServiceStart(URL, settings):
+	service = BenchmarkNotificationService(1, 1, URL, UserName, Password, logLevel='Info')
+	return service.start
+
+
+Scenarios = {
+	'Trackor.read': trackorRead,
+	'Trackor.iterRead': trackorIterRead,
+	'Trackor.update': trackorUpdate,
+	'Export.getFile': exportGetFile,
+	'Import.run': importRun,
+	'ModuleLog.add': moduleLogAdd,
+	'NotificationService.start': notificationServiceStart
+	}
+
+
+def startStandIn(settings):
+	"""Starts standin.py in its own process, so the server does not compete with the library for the GIL."""
+	process = subprocess.Popen(
+		[
+			sys.executable,
+			os.path.join(os.path.dirname(os.path.abspath(__file__)), 'standin.py'),
+			'--port', '0',
+			'--latency', str(settings.latency),
+			'--jitter', str(settings.jitter),
+			'--rows', str(settings.rows),
+			'--file-size', str(settings.file_size),
+			'--queue-size', str(settings.queue_size),
+			'--total', str(settings.total)
+			],
+		stdout=subprocess.PIPE,
+		universal_newlines=True
+		)
+	line = process.stdout.readline()
+	if not line.startswith('Serving on '):
+		process.kill()
+		raise RuntimeError("The stand-in server did not start.")
+	return process, line[len('Serving on '):].strip()
+
+
+def getPercentile(ordered, percentile):
+	if len(ordered) == 0:
+		return None
+	index = min(len(ordered) - 1, int(round((len(ordered) - 1) * percentile / 100.0)))
+	return ordered[index]
+
+
+def runCalls(call, iterations, concurrency):
+	"""Makes iterations calls from concurrency threads.  Returns the wall time and the latency of each call."""
+	latencies = []
+	lock = threading.Lock()
+	counter = [0]
+
+	def worker():
+		own = []
+		while True:
+			with lock:
+				if counter[0] >= iterations:
+					break
+				counter[0] += 1
+			start = time.perf_counter()
+			call()
+			own.append(time.perf_counter() - start)
+		with lock:
+			latencies.extend(own)
+
+	threads = [threading.Thread(target=worker) for i in range(concurrency)]
+	start = time.perf_counter()
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	return time.perf_counter() - start, latencies
+
+
+def runScenario(name, URL, settings):
+	call = Scenarios[name](URL, settings)
+	onevizion.Config["Error"] = False
+	onevizion.Config["Trace"].clear()
+	runCalls(call, settings.warmup, settings.concurrency)
+
+	wall, latencies = runCalls(call, settings.iterations, settings.concurrency)
+	errors = len(onevizion.Config["Trace"]) > 0
+
+	# Memory is measured in a pass of its own, as tracemalloc slows every allocation down.
+	tracemalloc.start()
+	tracemalloc.reset_peak()
+	before = tracemalloc.get_traced_memory()[0]
+	runCalls(call, min(settings.iterations, settings.memory_iterations), settings.concurrency)
+	peak = tracemalloc.get_traced_memory()[1] - before
+	tracemalloc.stop()
+
+	ordered = sorted(latencies)
+	return {
+		"calls": len(latencies),
+		"concurrency": settings.concurrency,
+		"seconds": wall,
+		"throughput": len(latencies) / wall if wall > 0 else None,
+		"mean": sum(latencies) / len(latencies) if len(latencies) > 0 else None,
+		"min": ordered[0] if len(ordered) > 0 else None,
+		"p50": getPercentile(ordered, 50),
+		"p90": getPercentile(ordered, 90),
+		"p99": getPercentile(ordered, 99),
+		"max": ordered[-1] if len(ordered) > 0 else None,
+		"peakMemory": peak,
+		"errors": errors
+		}
+
+
+def getVersion():
+	try:
+		return subprocess.check_output(['git', 'describe', '--always', '--dirty'], stderr=subprocess.DEVNULL, universal_newlines=True).strip()
+	except Exception:
+		return None
+
+
+def compare(current, baseline):
+	"""Prints the change of each scenario against a saved run.  Positive throughput and negative latency and memory changes are better."""
+	def change(new, old):
+		if new is None or old in (None, 0):
+			return "   n/a"
+		return "{Change:+6.1f}%".format(Change=(new - old) * 100.0 / old)
+
+	print("\nCompared with {Label} ({Version}):".format(Label=baseline.get("label"), Version=baseline.get("version")))
+	print("{Name:<28} {Throughput:>10} {P50:>8} {P99:>8} {Memory:>8}".format(Name="scenario", Throughput="calls/s", P50="p50", P99="p99", Memory="memory"))
+	for name, result in current["results"].items():
+		old = baseline["results"].get(name)
+		if old is None:
+			continue
+		print("{Name:<28} {Throughput:>10} {P50:>8} {P99:>8} {Memory:>8}".format(
+			Name=name,
+			Throughput=change(result["throughput"], old["throughput"]),
+			P50=change(result["p50"], old["p50"]),
+			P99=change(result["p99"], old["p99"]),
+			Memory=change(result["peakMemory"], old["peakMemory"])
+			))
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Offline benchmarks of the onevizion library.")
+	parser.add_argument('--scenarios', nargs='*', choices=sorted(Scenarios), default=list(Scenarios), help="scenarios to run, all by default")
+	parser.add_argument('--iterations', type=int, default=200, help="calls measured per scenario")
+	parser.add_argument('--warmup', type=int, default=10, help="calls made before measuring")
+	parser.add_argument('--memory-iterations', type=int, default=50, help="calls made with memory tracing on")
+	parser.add_argument('--concurrency', type=int, default=1, help="threads making the calls")
+	parser.add_argument('--latency', type=float, default=0.0, help="seconds the stand-in delays every answer")
+	parser.add_argument('--jitter', type=float, default=0.0, help="up to this many seconds added to the latency at random")
+	parser.add_argument('--rows', type=int, default=100, help="trackors returned by a read")
+	parser.add_argument('--file-size', type=int, default=1024*1024, help="bytes of an export file")
+	parser.add_argument('--import-size', type=int, default=256*1024, help="bytes of the imported file")
+	parser.add_argument('--queue-size', type=int, default=10, help="records in the notification queue")
+	parser.add_argument('--total', type=int, default=5000, help="trackors read by Trackor.iterRead")
+	parser.add_argument('--per-page', type=int, default=1000, help="trackors of each page read by Trackor.iterRead")
+	parser.add_argument('--prefetch', type=int, default=1, help="pages Trackor.iterRead reads ahead")
+	parser.add_argument('--workers', type=int, default=1, help="pages Trackor.iterRead reads at once")
+	parser.add_argument('--label', default=None, help="name of the run, the results are saved as results/<label>.json")
+	parser.add_argument('--output', default=None, help="file to save the results to instead")
+	parser.add_argument('--compare', default=None, help="results file of an earlier run to compare with")
+	settings = parser.parse_args(argv)
+
+	onevizion.Config["Verbosity"] = 0
+	label = settings.label or datetime.now().strftime('%Y%m%d-%H%M%S')
+	run = {
+		"label": label,
+		"version": getVersion(),
+		"timestamp": datetime.now(timezone.utc).isoformat(),
+		"python": platform.python_version(),
+		"platform": platform.platform(),
+		"settings": {key: value for key, value in vars(settings).items() if key not in ('label', 'output', 'compare')},
+		"results": {}
+		}
+
+	process, URL = startStandIn(settings)
+	try:
+		print("{Name:<28} {Throughput:>10} {P50:>9} {P90:>9} {P99:>9} {Memory:>10}".format(
+			Name="scenario", Throughput="calls/s", P50="p50 ms", P90="p90 ms", P99="p99 ms", Memory="peak KiB"))
+		for name in settings.scenarios:
+			result = runScenario(name, URL, settings)
+			run["results"][name] = result
+			print("{Name:<28} {Throughput:>10.1f} {P50:>9.2f} {P90:>9.2f} {P99:>9.2f} {Memory:>10.1f}{Errors}".format(
+				Name=name,
+				Throughput=result["throughput"],
+				P50=result["p50"] * 1000,
+				P90=result["p90"] * 1000,
+				P99=result["p99"] * 1000,
+				Memory=result["peakMemory"] / 1024.0,
+				Errors="  (calls failed)" if result["errors"] else ""
+				))
+	finally:
+		process.terminate()
+		process.wait()
+
+	output = settings.output or os.path.join(ResultsDir, label + '.json')
+	os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+	with open(output, 'w') as f:
+		json.dump(run, f, indent=2)
+	print("\nSaved to {Output}".format(Output=output))
+
+	if settings.compare is not None:
+		with open(settings.compare) as f:
+			compare(run, json.load(f))
+
+
+if __name__ == '__main__':
+	main()
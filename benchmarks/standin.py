@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+"""Local stand-in for the OneVizion API, for the benchmarks.  It answers the /api/v3 and /api/internal
+endpoints the onevizion library calls with made up data of a configurable size, after a configurable
+latency, and accepts any credentials.
+
+	python benchmarks/standin.py --port 8765 --latency 0.005 --rows 500
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+
+class StandInSettings(object):
+	"""Shape of the stand-in's answers.
+
+	Attributes:
+		latency: seconds every answer is delayed
+		jitter: up to this many seconds are added to the latency at random
+		rows: trackors returned by a read that does not ask for a page
+		fileSize: bytes of an export file or a downloaded file
+		queueSize: records in the notification queue
+		total: trackors of each trackor type, the last page of a paged read is short
+	"""
+
+	def __init__(self, latency=0.0, jitter=0.0, rows=100, fileSize=1024*1024, queueSize=10, total=10000):
+		self.latency = latency
+		self.jitter = jitter
+		self.rows = rows
+		self.fileSize = fileSize
+		self.queueSize = queueSize
+		self.total = total
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"
+	disable_nagle_algorithm = True
+	settings = StandInSettings()
+	processId = 1000
+	processIdLock = threading.Lock()
+
+	def log_message(self, format, *args):
+		pass
+
+	def _handle(self):
+		length = int(self.headers.get('Content-Length') or 0)
+		if length > 0:
+			self.rfile.read(length)
+		delay = self.settings.latency + random.uniform(0, self.settings.jitter)
+		if delay > 0:
+			time.sleep(delay)
+
+		parts = urlsplit(self.path)
+		query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+		for method, pattern, answer in StandInHandler.Routes:
+			if method == self.command:
+				match = re.fullmatch(pattern, parts.path)
+				if match is not None:
+					body, contentType = answer(self, query, *match.groups())
+					return self._send(200, body, contentType)
+		return self._send(404, {"error_message": "No stand-in for {Method} {Path}".format(Method=self.command, Path=parts.path)})
+
+	do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+	def _send(self, status, body, contentType='application/json'):
+		if not isinstance(body, bytes):
+			body = json.dumps(body).encode('utf-8')
+		self.send_response(status)
+		self.send_header('Content-Type', contentType)
+		self.send_header('Content-Length', str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	@staticmethod
+	def _getTrackor(trackorId):
+		return {
+			"TRACKOR_ID": trackorId,
+			"TRACKOR_KEY": "K{ID}".format(ID=trackorId),
+			"XITOR_CLASS_ID": 1,
+			"SITE_NAME": "Site {ID}".format(ID=trackorId),
+			"SITE_STATUS": "Active",
+			"SITE_DESCRIPTION": "x" * 64
+			}
+
+	def _nextProcessId(self):
+		with StandInHandler.processIdLock:
+			StandInHandler.processId += 1
+			return StandInHandler.processId
+
+	def _readTrackors(self, query, trackorType=None):
+		if 'page' not in query:
+			return [StandInHandler._getTrackor(i + 1) for i in range(self.settings.rows)], 'application/json'
+		count = int(query.get('per_page', 1000))
+		first = (int(query['page']) - 1) * count
+		return [StandInHandler._getTrackor(i + 1) for i in range(first, min(first + count, self.settings.total))], 'application/json'
+
+	def _readTrackor(self, query, trackorId):
+		return StandInHandler._getTrackor(int(trackorId)), 'application/json'
+
+	def _writeTrackors(self, query, trackorType):
+		return [{"TRACKOR_ID": 1, "TRACKOR_KEY": "K1"}], 'application/json'
+
+	def _writeTrackor(self, query, trackorId):
+		return {"TRACKOR_ID": int(trackorId), "TRACKOR_KEY": "K{ID}".format(ID=trackorId)}, 'application/json'
+
+	def _createTrackor(self, query, trackorType):
+		trackorId = self._nextProcessId()
+		return {"TRACKOR_ID": trackorId, "TRACKOR_KEY": "K{ID}".format(ID=trackorId)}, 'application/json'
+
+	def _empty(self, query, *args):
+		return {}, 'application/json'
+
+	def _runProcess(self, query, *args):
+		return {"process_id": self._nextProcessId(), "status": "RUNNING", "warnings": []}, 'application/json'
+
+	def _getProcess(self, query, processId):
+		return {"process_id": int(processId), "status": "EXECUTED"}, 'application/json'
+
+	def _interruptProcess(self, query, processId):
+		return {"process_id": int(processId), "status": "INTERRUPTED"}, 'application/json'
+
+	def _listImports(self, query):
+		return [{"process_id": 1, "status": "EXECUTED"}], 'application/json'
+
+	def _getFile(self, query, *args):
+		line = b"TRACKOR_KEY,SITE_NAME,SITE_STATUS\r\nK1,Site 1,Active\r\n"
+		return (line * (self.settings.fileSize // len(line) + 1))[:self.settings.fileSize], 'text/csv'
+
+	def _getWorkPlan(self, query, workplanId=None):
+		return {"id": int(workplanId or 1), "name": "Workplan", "active": True}, 'application/json'
+
+	def _getTasks(self, query, workplanId=None):
+		return [{"id": i + 1, "order_number": i + 1, "name": "Task {Number}".format(Number=i + 1)} for i in range(20)], 'application/json'
+
+	def _getTask(self, query, taskId):
+		return {"id": int(taskId), "order_number": 1, "name": "Task"}, 'application/json'
+
+	def _addLog(self, query, processId):
+		return {"id": self._nextProcessId(), "process_id": int(processId)}, 'application/json'
+
+	def _getNotifQueue(self, query):
+		return [{
+			"notifQueueId": i + 1,
+			"userId": 1,
+			"sender": "sender@example.com",
+			"toAddress": "user{Number}@example.com".format(Number=i + 1),
+			"cc": None,
+			"bcc": None,
+			"subj": "Notification {Number}".format(Number=i + 1),
+			"replyTo": None,
+			"createdTs": "2024-01-01T00:00:00",
+			"status": "NOT_SENT",
+			"msg": "y" * 256,
+			"html": False,
+			"blobDataIds": []
+			} for i in range(self.settings.queueSize)], 'application/json'
+
+	Routes = (
+		('GET', r'/api/v3/trackor_types/([^/]+)/trackors', _readTrackors),
+		('POST', r'/api/v3/trackor_types/([^/]+)/trackors/search', _readTrackors),
+		('GET', r'/api/v3/trackors/(\d+)', _readTrackor),
+		('PUT', r'/api/v3/trackor_types/([^/]+)/trackors', _writeTrackors),
+		('PUT', r'/api/v3/trackors/(\d+)', _writeTrackor),
+		('POST', r'/api/v3/trackor_types/([^/]+)/trackors', _createTrackor),
+		('DELETE', r'/api/v3/trackor_types/([^/]+)/trackors', _empty),
+		('POST', r'/api/v3/trackors/(\d+)/assign_wp', _empty),
+		('POST', r'/api/v3/trackor/(\d+)/file/([^/]+)', _empty),
+		('GET', r'/api/v3/files/(\d+)', _getFile),
+		('POST', r'/api/v3/exports/([^/]+)/run', _runProcess),
+		('GET', r'/api/v3/exports/runs/(\d+)', _getProcess),
+		('GET', r'/api/v3/exports/runs/(\d+)/file', _getFile),
+		('POST', r'/api/v3/exports/runs/(\d+)/interrupt', _interruptProcess),
+		('POST', r'/api/v3/imports/(\d+)/run', _runProcess),
+		('GET', r'/api/v3/imports/runs', _listImports),
+		('GET', r'/api/v3/imports/runs/(\d+)', _getProcess),
+		('POST', r'/api/v3/imports/runs/(\d+)/interrupt', _interruptProcess),
+		('GET', r'/api/v3/wps/(\d+)', _getWorkPlan),
+		('GET', r'/api/v3/wps/', _getWorkPlan),
+		('GET', r'/api/v3/wps/(\d+)/tasks', _getTasks),
+		('GET', r'/api/v3/tasks', _getTasks),
+		('GET', r'/api/v3/tasks/(\d+)', _getTask),
+		('PUT', r'/api/v3/tasks/(\d+)', _getTask),
+		('PATCH', r'/api/v3/tasks/(\d+)', _getTask),
+		('POST', r'/api/v3/modules/runs/(\d+)/logs', _addLog),
+		('GET', r'/api/internal/notif/queue', _getNotifQueue),
+		('PATCH', r'/api/internal/notif/queue/(\d+)/update_status', _empty),
+		('POST', r'/api/internal/notif/queue/(\d+)/attempts', _empty)
+		)
+
+
+def serve(port, settings):
+	StandInHandler.settings = settings
+	server = ThreadingHTTPServer(('127.0.0.1', port), StandInHandler)
+	server.daemon_threads = True
+	# The benchmark runner waits for this line before it starts.
+	print("Serving on http://127.0.0.1:{Port}".format(Port=server.server_address[1]), flush=True)
+	server.serve_forever()
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Local stand-in for the OneVizion API.")
+	parser.add_argument('--port', type=int, default=8765, help="port to listen on, 0 for any free port")
+	parser.add_argument('--latency', type=float, default=0.0, help="seconds every answer is delayed")
+	parser.add_argument('--jitter', type=float, default=0.0, help="up to this many seconds added to the latency at random")
+	parser.add_argument('--rows', type=int, default=100, help="trackors returned by a read")
+	parser.add_argument('--file-size', type=int, default=1024*1024, help="bytes of an export file")
+	parser.add_argument('--queue-size', type=int, default=10, help="records in the notification queue")
+	parser.add_argument('--total', type=int, default=10000, help="trackors of each trackor type, for paged reads")
+	args = parser.parse_args(argv)
+	serve(args.port, StandInSettings(args.latency, args.jitter, args.rows, args.file_size, args.queue_size, args.total))
+
+
+if __name__ == '__main__':
+	main()
@@ -3,6 +3,9 @@ import json
 from datetime import datetime
 from onevizion.util import *
 from onevizion.curl import curl
+from onevizion.asynccurl import AsyncCurl
+from onevizion.retention import retainCall
+from onevizion.scheduler import RequestPriority
 from onevizion.httpbearer import HTTPBearerAuth
 from onevizion.EMail import EMail
 import onevizion
@@ -20,7 +23,8 @@ class Import(object):
 		comments=None,
 		incremental=None,
 		paramToken=None,
-		isTokenAuth=False
+		isTokenAuth=False,
+		client=None
 		):
 		self.URL = URL
 		self.userName = userName
@@ -38,6 +42,7 @@ class Import(object):
 		self.status = None
 		self.processList = []
 		self.isTokenAuth = isTokenAuth
+		self.client = client
 		if paramToken is not None:
 			if self.URL is None:
 				self.URL = onevizion.Config["ParameterData"][paramToken]['url']
@@ -46,6 +51,15 @@ class Import(object):
 			if self.password is None:
 				self.password = onevizion.Config["ParameterData"][paramToken]['Password']
 
+		if client is not None:
+			# The login of the client, unless this wrapper was given its own.
+			if not self.URL:
+				self.URL = client.URL
+			if not self.userName:
+				self.userName = client.userName
+			if not self.password:
+				self.password = client.password
+
 		self.URL = getUrlContainingScheme(self.URL)
 
 		# If all info is filled out, go ahead and run the query.
@@ -53,10 +67,18 @@ class Import(object):
 			self.run()
 
 	def run(self):
-		if self.isTokenAuth:
-			self.auth = HTTPBearerAuth(self.userName, self.password)
-		else:
-			self.auth = requests.auth.HTTPBasicAuth(self.userName, self.password)
+		URL, ImportFile = self._runRequest()
+		self._runResult(curl('POST',URL,files=ImportFile,auth=self.auth,client=self.client,operation='Import.run'), URL, ImportFile)
+
+	async def runAsync(self):
+		"""Same as run, but awaits the call on the running event loop.  Returns the AsyncCurl object of the call."""
+		URL, ImportFile = self._runRequest()
+		OVCall = await AsyncCurl('POST',URL,files=ImportFile,auth=self.auth,client=self.client,operation='Import.run')
+		self._runResult(OVCall, URL, ImportFile)
+		return OVCall
+
+	def _runRequest(self):
+		self._setAuth()
 		self.ImportURL = "{URL}/api/v3/imports/{ImpSpecID}/run?action={Action}".format(
 			URL=self.URL,
 			ImpSpecID=self.impSpecId,
@@ -67,80 +89,75 @@ class Import(object):
 		if self.incremental is not None:
 			self.ImportURL += '&is_incremental=' + str(self.incremental)
 		self.ImportFile = {'file': (os.path.basename(self.file), open(self.file,'rb'))}
-		self.OVCall = curl('POST',self.ImportURL,files=self.ImportFile,auth=self.auth)
-		self.jsonData = self.OVCall.jsonData
-		self.request = self.OVCall.request
+		return self.ImportURL, self.ImportFile
 
-		Message(self.ImportURL,2)
-		Message("FileName: {FileName}".format(FileName=self.ImportFile),2)
-		Message("Import Send completed in {Duration} seconds.".format(Duration=self.OVCall.duration),1)
+	def _runResult(self, OVCall, URL, ImportFile):
+		self._setCall(OVCall)
+
+		Message(URL,2)
+		Message("FileName: {FileName}".format(FileName=ImportFile),2)
+		Message("Import Send completed in {Duration} seconds ({Timing}).".format(Duration=OVCall.duration, Timing=OVCall.getTimingText()),1)
 		TraceTag="{TimeStamp}:{FileName}:".format(TimeStamp=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f'),FileName=self.file)
 		self.TraceTag = TraceTag
-		if len(self.OVCall.errors) > 0:
-			self.errors.append(self.OVCall.errors)
-			onevizion.Config["Trace"][TraceTag+"-URL"] = self.ImportURL
-			onevizion.Config["Trace"][TraceTag+"-FileName"] = self.ImportFile
-			try:
-				TraceMessage("Status Code: {StatusCode}".format(StatusCode=self.OVCall.request.status_code),0,TraceTag+"-StatusCode")
-				TraceMessage("Reason: {Reason}".format(Reason=self.OVCall.request.reason),0,TraceTag+"-Reason")
-				TraceMessage("Body:\n{Body}".format(Body=self.OVCall.request.text),0,TraceTag+"-Body")
-			except Exception as e:
-				TraceMessage("Errors:\n{Errors}".format(Errors=json.dumps(self.OVCall.errors,indent=2)),0,TraceTag+"-Errors")
-			onevizion.Config["Error"]=True
+		if len(OVCall.errors) > 0:
+			self.errors.append(OVCall.errors)
+			TraceCallErrors(OVCall, URL, {"FileName": ImportFile}, TraceTag)
 		else:
 			if "error_message" in self.jsonData and len(self.jsonData["error_message"]) > 0:
 				self.errors.append(self.jsonData["error_message"])
-				onevizion.Config["Trace"][TraceTag+"-URL"] = self.ImportURL
-				onevizion.Config["Trace"][TraceTag+"-FileName"] = self.ImportFile
+				onevizion.Config["Trace"][TraceTag+"-URL"] = URL
+				onevizion.Config["Trace"][TraceTag+"-FileName"] = ImportFile
 				TraceMessage("Eror Message: {Error}".format(Error=self.jsonData["error_message"]),0,TraceTag+"-ErrorMessage")
 				onevizion.Config["Error"]=True
 			if "warnings" in self.jsonData and len(self.jsonData["warnings"]) > 0:
 				self.warnings.extend(self.jsonData["warnings"])
-				onevizion.Config["Trace"][TraceTag+"-URL"] = self.ImportURL
-				onevizion.Config["Trace"][TraceTag+"-FileName"] = self.ImportFile
+				onevizion.Config["Trace"][TraceTag+"-URL"] = URL
+				onevizion.Config["Trace"][TraceTag+"-FileName"] = ImportFile
 				TraceMessage("Eror Message: {Error}".format(Error=self.jsonData["warnings"]),0,TraceTag+"-Warnings")
 			if "process_id" in self.jsonData:
 				self.processId = self.jsonData["process_id"]
 				self.status = self.jsonData["status"]
 				Message("Success!  ProcessID: {ProcID}".format(ProcID=self.processId),1)
+		retainCall(self, OVCall)
 
 	def interrupt(self,ProcessID=None):
+		PID, URL = self._interruptRequest(ProcessID)
+		self._interruptResult(curl('POST',URL,auth=self.auth,priority=RequestPriority.CONTROL,client=self.client,operation='Import.interrupt'), URL, PID)
+
+	async def interruptAsync(self,ProcessID=None):
+		"""Same as interrupt, but awaits the call on the running event loop.  Returns the AsyncCurl object of the call."""
+		PID, URL = self._interruptRequest(ProcessID)
+		OVCall = await AsyncCurl('POST',URL,auth=self.auth,priority=RequestPriority.CONTROL,client=self.client,operation='Import.interrupt')
+		self._interruptResult(OVCall, URL, PID)
+		return OVCall
+
+	def _interruptRequest(self, ProcessID):
 		if ProcessID is None:
 			PID = self.processId
 		else:
 			PID = ProcessID
-		if self.isTokenAuth:
-			self.auth = HTTPBearerAuth(self.userName, self.password)
-		else:
-			self.auth = requests.auth.HTTPBasicAuth(self.userName, self.password)
+		self._setAuth()
 		self.ImportURL = "{URL}/api/v3/imports/runs/{ProcID}/interrupt".format(
 			URL=self.URL,
 			ProcID=PID
 			)
-		self.OVCall = curl('POST',self.ImportURL,auth=self.auth)
-		self.jsonData = self.OVCall.jsonData
-		self.request = self.OVCall.request
-
-		Message(self.ImportURL,2)
-		Message("Interupt Process completed in {Duration} seconds.".format(Duration=self.OVCall.duration),1)
-		if len(self.OVCall.errors) > 0:
-			self.errors.append(self.OVCall.errors)
-			TraceTag="{TimeStamp}:".format(TimeStamp=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f'))
-			self.TraceTag = TraceTag
-			onevizion.Config["Trace"][TraceTag+"-URL"] = self.ImportURL
-			try:
-				TraceMessage("Status Code: {StatusCode}".format(StatusCode=self.OVCall.request.status_code),0,TraceTag+"-StatusCode")
-				TraceMessage("Reason: {Reason}".format(Reason=self.OVCall.request.reason),0,TraceTag+"-Reason")
-				TraceMessage("Body:\n{Body}".format(Body=self.OVCall.request.text),0,TraceTag+"-Body")
-			except Exception as e:
-				TraceMessage("Errors:\n{Errors}".format(Errors=json.dumps(self.OVCall.errors,indent=2)),0,TraceTag+"-Errors")
-			onevizion.Config["Error"]=True
+		return PID, self.ImportURL
+
+	def _interruptResult(self, OVCall, URL, PID):
+		self._setCall(OVCall)
+
+		Message(URL,2)
+		Message("Interupt Process completed in {Duration} seconds ({Timing}).".format(Duration=OVCall.duration, Timing=OVCall.getTimingText()),1)
+		if len(OVCall.errors) > 0:
+			self.errors.append(OVCall.errors)
+			self.TraceTag = TraceCallErrors(OVCall, URL)
 		else:
 			self.processId = PID
 			Message("Successful Interrupt  ProcessID: {ProcID}".format(ProcID=self.processId),1)
 
 		if "status" in self.jsonData:
 			self.status = self.jsonData['status']
+		retainCall(self, OVCall)
 
 	def getProcessData(self,
 		processId=None,
@@ -150,16 +167,29 @@ class Import(object):
 		owner=None,
 		isPdf=None
 		):
+		URL = self._getProcessDataRequest(processId, status, comments, importName, owner, isPdf)
+		return self._getProcessDataResult(curl('GET',URL,auth=self.auth,priority=RequestPriority.INTERACTIVE,client=self.client,operation='Import.getProcessData'), URL)
+
+	async def getProcessDataAsync(self,
+		processId=None,
+		status=None,
+		comments=None,
+		importName=None,
+		owner=None,
+		isPdf=None
+		):
+		"""Same as getProcessData, but awaits the call on the running event loop."""
+		URL = self._getProcessDataRequest(processId, status, comments, importName, owner, isPdf)
+		return self._getProcessDataResult(await AsyncCurl('GET',URL,auth=self.auth,priority=RequestPriority.INTERACTIVE,client=self.client,operation='Import.getProcessData'), URL)
+
+	def _getProcessDataRequest(self, processId, status, comments, importName, owner, isPdf):
 		def addParam(paramName,param):
 			if param is not None:
 				if not self.ImportURL.endswith("?"):
 					self.ImportURL += "&"
 				self.ImportURL += paramName + "=" +URLEncode(str(param))
 
-		if self.isTokenAuth:
-			self.auth = HTTPBearerAuth(self.userName, self.password)
-		else:
-			self.auth = requests.auth.HTTPBasicAuth(self.userName, self.password)
+		self._setAuth()
 		self.ImportURL = "{URL}/api/v3/imports/runs".format(
 			URL=self.URL
 			)
@@ -180,29 +210,35 @@ class Import(object):
 				self.ImportURL += "/"+str(self.processId)
 			else:
 				self.ImportURL += "/"+str(processId)
+		return self.ImportURL
 
-		self.OVCall = curl('GET',self.ImportURL,auth=self.auth)
-		self.jsonData = self.OVCall.jsonData
-		self.request = self.OVCall.request
-
-		Message(self.ImportURL,2)
-		Message("Get Process Data completed in {Duration} seconds.".format(Duration=self.OVCall.duration),1)
-		if len(self.OVCall.errors) > 0:
-			self.errors.append(self.OVCall.errors)
-			TraceTag="{TimeStamp}:".format(TimeStamp=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f'))
-			self.TraceTag = TraceTag
-			onevizion.Config["Trace"][TraceTag+"-URL"] = self.ImportURL
-			try:
-				TraceMessage("Status Code: {StatusCode}".format(StatusCode=self.OVCall.request.status_code),0,TraceTag+"-StatusCode")
-				TraceMessage("Reason: {Reason}".format(Reason=self.OVCall.request.reason),0,TraceTag+"-Reason")
-				TraceMessage("Body:\n{Body}".format(Body=self.OVCall.request.text),0,TraceTag+"-Body")
-			except Exception as e:
-				TraceMessage("Errors:\n{Errors}".format(Errors=json.dumps(self.OVCall.errors,indent=2)),0,TraceTag+"-Errors")
-			onevizion.Config["Error"]=True
+	def _getProcessDataResult(self, OVCall, URL):
+		self._setCall(OVCall)
+
+		Message(URL,2)
+		Message("Get Process Data completed in {Duration} seconds ({Timing}).".format(Duration=OVCall.duration, Timing=OVCall.getTimingText()),1)
+		if len(OVCall.errors) > 0:
+			self.errors.append(OVCall.errors)
+			self.TraceTag = TraceCallErrors(OVCall, URL)
 		if "status" in self.jsonData:
 			self.status = self.jsonData['status']
 		else:
 			self.status = 'No Status'
 		Message("Status: {Status}".format(Status=self.status),1)
 
-		return self.jsonData
+		jsonData = self.jsonData
+		retainCall(self, OVCall)
+		return jsonData
+
+	def _setAuth(self):
+		if self.client is not None:
+			self.auth = self.client.auth
+		elif self.isTokenAuth:
+			self.auth = HTTPBearerAuth(self.userName, self.password)
+		else:
+			self.auth = requests.auth.HTTPBasicAuth(self.userName, self.password)
+
+	def _setCall(self, OVCall):
+		self.OVCall = OVCall
+		self.jsonData = OVCall.jsonData
+		self.request = OVCall.request
@@ -16,7 +16,19 @@ Config = {
 	"ParameterData":{},
 	"SMTPToken":None,
 	"Trace":OrderedDict(),
-	"Error":False
+	"Error":False,
+	"PoolSize":10,
+	"AsyncWorkers":64,
+	"SingleFlight":False,
+	"RateLimiter":None,
+	"RequestCompressor":None,
+	"CircuitBreaker":None,
+	"Timeout":(10, 300),
+	"HedgePolicy":None,
+	"Scheduler":None,
+	"Cassette":None,
+	"HTTPCache":None,
+	"TrackorReadCache":None
 	}
 
 #Let's add some compatibility between Python 2 and 3
@@ -46,8 +58,51 @@ from onevizion.util import *
 
 from onevizion.singleton import Singleton
 
+from onevizion.pool import SessionPool, DefaultPool
+
+from onevizion.retry import RetryPolicy
+Config["RetryPolicy"] = RetryPolicy()
+
+from onevizion.jsoncodec import JSONCodec, StdlibCodec, findCodec
+Config["JSONCodec"] = findCodec()
+Config["JSONEncoder"] = StdlibCodec
+
+from onevizion.singleflight import SingleFlight, DefaultSingleFlight
+
+from onevizion.ratelimit import RateLimiter, TokenBucket
+
+from onevizion.compress import RequestCompressor
+
+from onevizion.breaker import CircuitBreaker, CircuitOpenError
+
+from onevizion.deadline import Deadline, DeadlineExceeded
+
+from onevizion.hedge import HedgePolicy
+
+from onevizion.scheduler import RequestScheduler, RequestPriority, Priority
+from onevizion.adaptive import AdaptiveLimiter
+
+from onevizion.metrics import MetricsRegistry
+Config["Metrics"] = MetricsRegistry()
+
+from onevizion.hooks import CallHooks, CallEvent
+Config["CallHooks"] = CallHooks()
+
+from onevizion.retention import Retention
+Config["Retention"] = Retention.FULL
+
+from onevizion.result import CallResult
+
+from onevizion.cassette import Cassette, CassetteMode, CassetteMissError
+
+from onevizion.httpcache import HTTPCache
+
 from onevizion.curl import curl
 
+from onevizion.readcache import TrackorReadCache
+
+from onevizion.asynccurl import AsyncCurl
+
 from onevizion.httpbearer import HTTPBearerAuth
 
 from onevizion.ovimport import OVImport
@@ -73,4 +128,7 @@ if sys.version_info.major >= 3 and sys.version_info.minor >= 4:
 	from onevizion.notif.queuerecord import NotifQueueRecord
 	from onevizion.notif.queuestatus import NotifQueueStatus
 
+from onevizion.client import OneVizionClient
+from onevizion.fanout import FanOut, TenantResult
+
 
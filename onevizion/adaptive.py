@@ -0,0 +1,94 @@
+import time
+from onevizion.scheduler import RequestScheduler, _HostQueue
+from onevizion.util import getEndpointTemplate
+
+class _AdaptiveHost(_HostQueue):
+
+	def __init__(self, limit):
+		_HostQueue.__init__(self)
+		self.limit = float(limit)
+		self.latencies = {}
+		self.samples = {}
+		self.cutAt = None
+
+
+class AdaptiveLimiter(RequestScheduler):
+	"""Request scheduler whose per-host limit of calls in flight is found by AIMD (additive increase,
+	multiplicative decrease) instead of being fixed.  While calls succeed with stable latency and the limit
+	is in use, it grows by about one call per round trip, up to maxLimit.  A 429 or 5xx answer, a
+	connection error or a call slower than latencyTolerance times the usual latency of its endpoint cuts it
+	by backoffRatio, at most once per round trip, down to minLimit.  Calls keep their RequestPriority.
+
+		onevizion.Config["Scheduler"] = onevizion.AdaptiveLimiter(initialLimit=4, maxLimit=32)
+		...
+		print(onevizion.Config["Scheduler"].getLimit(trackor.URL))
+
+	Attributes:
+		initialLimit: limit of a host before anything is known about it
+		minLimit: the limit is never cut below this
+		maxLimit: the limit never grows above this
+		backoffRatio: factor, 0 to 1, applied to the limit on overload
+		latencyTolerance: a call slower than this many times the average latency of its endpoint is a spike
+		minSamples: latencies needed on an endpoint before its spikes count
+		smoothing: weight, 0 to 1, of the latest latency in the moving average
+		failureStatusCodes: HTTP status codes that count as overload
+
+		increases: number of times a limit grew by a whole call
+		decreases: number of times a limit was cut
+	"""
+
+	def __init__(self, initialLimit=4, minLimit=1, maxLimit=64, backoffRatio=0.5, latencyTolerance=2.0,
+			minSamples=10, smoothing=0.1, failureStatusCodes=(429, 500, 502, 503, 504)):
+		RequestScheduler.__init__(self, maxPerHost=maxLimit)
+		self.initialLimit = initialLimit
+		self.minLimit = minLimit
+		self.maxLimit = maxLimit
+		self.backoffRatio = backoffRatio
+		self.latencyTolerance = latencyTolerance
+		self.minSamples = minSamples
+		self.smoothing = smoothing
+		self.failureStatusCodes = failureStatusCodes
+		self.increases = 0
+		self.decreases = 0
+
+	def _newHost(self):
+		return _AdaptiveHost(self.initialLimit)
+
+	def _getLimit(self, host):
+		return max(self.minLimit, int(host.limit))
+
+	def getLimit(self, url):
+		"""Returns the current limit of calls in flight to the URL's host."""
+		with self._lock:
+			return self._getLimit(self._getHost(url))
+
+	def _record(self, host, url, response, exception, latency):
+		overloaded = exception is not None or (response is not None and response.status_code in self.failureStatusCodes)
+		if not overloaded and latency is not None:
+			overloaded = self._addLatency(host, getEndpointTemplate(url), latency)
+
+		now = time.monotonic()
+		if overloaded:
+			# Calls that were already in flight when the host got overloaded report it too; only cut once for them.
+			roundTrip = max(host.latencies.values()) if len(host.latencies) > 0 else 0.0
+			if host.cutAt is None or now - host.cutAt >= roundTrip:
+				host.limit = max(float(self.minLimit), host.limit * self.backoffRatio)
+				host.cutAt = now
+				self.decreases += 1
+		elif host.active >= self._getLimit(host) and host.limit < self.maxLimit:
+			before = int(host.limit)
+			host.limit = min(float(self.maxLimit), host.limit + 1.0 / host.limit)
+			if int(host.limit) > before:
+				self.increases += 1
+
+	def _addLatency(self, host, endpoint, latency):
+		"""Adds a latency to the moving average of the endpoint and returns True if it is a spike."""
+		average = host.latencies.get(endpoint)
+		samples = host.samples.get(endpoint, 0)
+		spike = average is not None and samples >= self.minSamples and latency > self.latencyTolerance * average
+		if average is None:
+			host.latencies[endpoint] = latency
+		else:
+			host.latencies[endpoint] = average + self.smoothing * (latency - average)
+		host.samples[endpoint] = samples + 1
+		return spike
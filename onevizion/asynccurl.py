@@ -0,0 +1,233 @@
+import asyncio
+import threading
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from onevizion.curl import curl
+from onevizion.singleflight import DefaultSingleFlight
+from onevizion.hooks import CallHooks
+from onevizion.deadline import DeadlineExceeded
+import onevizion
+
+try:
+	import aiohttp
+except ImportError:
+	aiohttp = None
+
+class AsyncCurl(curl):
+	"""asyncio counterpart of curl.  It takes the same arguments and fills in the same "errors",
+	"jsonData", "request" and "duration" properties, but the call is only sent when the object is awaited:
+
+		OVCall = await AsyncCurl('GET', URL, auth=auth)
+
+	When aiohttp is installed the request is sent on the event loop itself, through one aiohttp session
+	per loop.  Otherwise the pooled requests session is run in a shared thread pool.  Either way at most
+	onevizion.Config["AsyncWorkers"] calls are in flight at once, and "request" is a requests.Response,
+	so callers can treat both transports alike.
+	"""
+
+	_executor = None
+	_executorLock = threading.Lock()
+	_sessions = {}
+
+	def __init__(self, method='GET', url=None, **kwargs):
+		curl.__init__(self, method, None, **kwargs)
+		self.url = url
+
+	def __await__(self):
+		return self.runQuery().__await__()
+
+	async def runQuery(self):
+		self._prepare()
+		before = time.monotonic()
+		self._startedAt = before
+		flightKey = self._getFlightKey()
+		if flightKey is None:
+			await self._runAttemptsAsync()
+		else:
+			try:
+				owner = await DefaultSingleFlight.doAsync(flightKey, self, self._runAttemptsAsync)
+			except DeadlineExceeded as e:
+				self._failDeadline(e)
+			else:
+				if owner is not self:
+					self._shareResult(owner)
+		self.duration = time.monotonic() - before
+		self._recordMetrics()
+		return self
+
+	async def _runAttemptsAsync(self):
+		if self._sendFromCache():
+			return
+		while True:
+			self._startAttempt()
+			if not self._checkDeadline() or not self._checkCircuit():
+				break
+			# The finally also gives the half-open trial slot back when the task is cancelled.
+			try:
+				delay = self._getRateLimitDelay()
+				if delay > 0:
+					if not self._checkRateLimitDelay(delay):
+						break
+					await asyncio.sleep(delay)
+				if not self._checkDeadline():
+					break
+				scheduler = self._getScheduler()
+				if scheduler is not None:
+					try:
+						self.queueWait += await scheduler.acquireAsync(self.url, self.priority)
+					except DeadlineExceeded as e:
+						self._failDeadline(e)
+						break
+					if not self._checkDeadline():
+						scheduler.release(self.url)
+						break
+				self._emit(CallHooks.BeforeRequest)
+				response = None
+				error = None
+				sendStart = time.monotonic()
+				try:
+					response = await self._sendAsync()
+				except Exception as e:
+					error = e
+					self._failAttempt(e)
+				finally:
+					if scheduler is not None:
+						scheduler.release(self.url, response, error, time.monotonic() - sendStart)
+			finally:
+				self._releaseCircuit()
+			if response is not None:
+				self._finishAttempt(response)
+				if self._checkCompressionRejected():
+					continue
+			delay = self._getRetryDelay()
+			if delay is None:
+				break
+			await asyncio.sleep(delay)
+
+	@staticmethod
+	def _getExecutor():
+		if AsyncCurl._executor is None:
+			with AsyncCurl._executorLock:
+				if AsyncCurl._executor is None:
+					AsyncCurl._executor = ThreadPoolExecutor(
+						max_workers=onevizion.Config["AsyncWorkers"],
+						thread_name_prefix="onevizion-async"
+						)
+		return AsyncCurl._executor
+
+	@staticmethod
+	def _getSession():
+		loop = asyncio.get_running_loop()
+		session = AsyncCurl._sessions.get(loop)
+		if session is None or session.closed:
+			connector = aiohttp.TCPConnector(limit=onevizion.Config["AsyncWorkers"])
+			trace = aiohttp.TraceConfig()
+			trace.on_connection_create_start.append(AsyncCurl._onConnectStart)
+			trace.on_connection_create_end.append(AsyncCurl._onConnectEnd)
+			session = aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar(), trace_configs=[trace])
+			AsyncCurl._sessions[loop] = session
+		return session
+
+	@staticmethod
+	async def _onConnectStart(session, context, params):
+		context.connectStart = time.perf_counter()
+
+	@staticmethod
+	async def _onConnectEnd(session, context, params):
+		context.trace_request_ctx["connect"] += time.perf_counter() - context.connectStart
+
+	@staticmethod
+	async def close():
+		"""Close the aiohttp session that belongs to the running event loop.  Call it before the loop ends."""
+		session = AsyncCurl._sessions.pop(asyncio.get_running_loop(), None)
+		if session is not None:
+			await session.close()
+
+	async def _sendAsync(self):
+		if aiohttp is None:
+			return await asyncio.get_running_loop().run_in_executor(AsyncCurl._getExecutor(), self._send)
+		cache = self._getHTTPCache()
+		if cache is not None:
+			return await cache.sendAsync(self._sendTransportAsync, self.method, self.url, self.args)
+		return await self._sendTransportAsync(self.args)
+
+	async def _sendTransportAsync(self, args):
+		cassette = self._getSetting('cassette', "Cassette")
+		if cassette is not None:
+			return await cassette.sendAsync(lambda: self._sendAiohttp(args), self.method, self.url, self._matchArgs or args)
+		policy = self._getHedgePolicy()
+		if policy is None:
+			return await self._sendAiohttp(args)
+		return await policy.sendAsync(lambda: self._sendAiohttp(args), self.url, lambda: self._sendHedgeAsync(args))
+
+	async def _sendHedgeAsync(self, args):
+		"""Same as _sendHedge, on the event loop."""
+		admitted = self._admitHedge()
+		if admitted is None:
+			return None
+		response = None
+		error = None
+		start = time.monotonic()
+		try:
+			response = await self._sendAiohttp(args)
+		except Exception as e:
+			error = e
+			raise
+		finally:
+			self._settleHedge(admitted, response, error, time.monotonic() - start)
+		return response
+
+	async def _sendAiohttp(self, args):
+		# Let requests build the final URL, headers, auth and body (including multipart files),
+		# so both transports send exactly the same bytes.
+		prepared = requests.Request(
+			method=self.method,
+			url=self.url,
+			headers=args.get('headers'),
+			files=args.get('files'),
+			data=args.get('data'),
+			json=args.get('json'),
+			params=args.get('params'),
+			auth=args.get('auth'),
+			cookies=args.get('cookies')
+			).prepare()
+
+		options = {'allow_redirects': self.allow_redirects}
+		timeout = args.get('timeout')
+		if isinstance(timeout, tuple):
+			options['timeout'] = aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+		elif timeout is not None:
+			options['timeout'] = aiohttp.ClientTimeout(total=timeout)
+		if self.verify is False:
+			options['ssl'] = False
+		if self.proxies:
+			proxy = self.proxies.get(prepared.url.split(':', 1)[0])
+			if proxy is not None:
+				options['proxy'] = proxy
+
+		timing = {"connect": 0.0}
+		start = time.perf_counter()
+		async with AsyncCurl._getSession().request(
+			prepared.method,
+			prepared.url,
+			headers=dict(prepared.headers),
+			data=prepared.body,
+			trace_request_ctx=timing,
+			**options
+			) as resp:
+			headers = time.perf_counter()
+			response = requests.models.Response()
+			response.status_code = resp.status
+			response.reason = resp.reason
+			response.headers = CaseInsensitiveDict(resp.headers)
+			response.url = str(resp.url)
+			response.encoding = get_encoding_from_headers(response.headers)
+			response.request = prepared
+			response._content = await resp.read()
+		end = time.perf_counter()
+		connect = timing["connect"]
+		response._onevizionTiming = (connect, max(0.0, headers - start - connect), end - headers)
+		return response
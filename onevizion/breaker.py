@@ -0,0 +1,152 @@
+import threading
+import time
+from collections import deque
+from onevizion.pool import SessionPool
+
+class CircuitOpenError(Exception):
+	"""Raised into curl.exception when a call is refused because the circuit of its host is open."""
+	pass
+
+
+class _Circuit(object):
+
+	def __init__(self):
+		self.state = CircuitBreaker.Closed
+		self.outcomes = deque()
+		self.openedAt = None
+		self.trials = 0
+		self.rejected = 0
+
+
+class CircuitBreaker(object):
+	"""Per-host circuit breaker consulted by curl before every attempt.  While a host is healthy its
+	circuit is closed and every call goes through.  When at least minimumCalls calls were made in the last
+	window seconds and failureRate of them failed (connection errors, timeouts and failureStatusCodes),
+	the circuit opens and calls fail at once with a CircuitOpenError instead of waiting on the host.
+	After openTime seconds the circuit is half-open: up to halfOpenCalls trial calls are let through, and
+	it closes again if they succeed or opens again if one fails.
+
+	Attributes:
+		failureRate: share of failed calls, 0 to 1, that opens the circuit
+		minimumCalls: the least number of calls in the window before the failure rate is considered
+		window: length in seconds of the window the failure rate is measured on
+		openTime: seconds the circuit stays open before trial calls are let through
+		halfOpenCalls: number of trial calls allowed at once while half-open
+		failureStatusCodes: HTTP status codes that count as failures
+	"""
+
+	Closed = "closed"
+	Open = "open"
+	HalfOpen = "half-open"
+
+	def __init__(self, failureRate=0.5, minimumCalls=20, window=60, openTime=30, halfOpenCalls=1, failureStatusCodes=range(500,600)):
+		self.failureRate = failureRate
+		self.minimumCalls = minimumCalls
+		self.window = window
+		self.openTime = openTime
+		self.halfOpenCalls = halfOpenCalls
+		self.failureStatusCodes = failureStatusCodes
+		self._circuits = {}
+		self._lock = threading.Lock()
+
+	def _getCircuit(self, url):
+		key = SessionPool.hostKey(url)
+		circuit = self._circuits.get(key)
+		if circuit is None:
+			circuit = _Circuit()
+			self._circuits[key] = circuit
+		return circuit
+
+	def _refresh(self, circuit, now):
+		if circuit.state == CircuitBreaker.Open and now - circuit.openedAt >= self.openTime:
+			circuit.state = CircuitBreaker.HalfOpen
+			circuit.trials = 0
+		while len(circuit.outcomes) > 0 and now - circuit.outcomes[0][0] > self.window:
+			circuit.outcomes.popleft()
+
+	def allow(self, url):
+		"""Returns True if a call to the host may be sent now.  Every allowed call must be followed by record(),
+			or by release() if it ends without being sent.
+		"""
+		with self._lock:
+			circuit = self._getCircuit(url)
+			self._refresh(circuit, time.monotonic())
+			if circuit.state == CircuitBreaker.Closed:
+				return True
+			if circuit.state == CircuitBreaker.HalfOpen and circuit.trials < self.halfOpenCalls:
+				circuit.trials += 1
+				return True
+			circuit.rejected += 1
+			return False
+
+	def release(self, url):
+		"""Gives back the trial slot of an allowed call that ended without being sent, so it counts neither way."""
+		with self._lock:
+			circuit = self._getCircuit(url)
+			if circuit.state == CircuitBreaker.HalfOpen:
+				circuit.trials = max(0, circuit.trials - 1)
+
+	def record(self, url, failed):
+		with self._lock:
+			now = time.monotonic()
+			circuit = self._getCircuit(url)
+			self._refresh(circuit, now)
+			if circuit.state == CircuitBreaker.HalfOpen:
+				circuit.trials = max(0, circuit.trials - 1)
+				if failed:
+					self._open(circuit, now)
+				else:
+					circuit.state = CircuitBreaker.Closed
+					circuit.outcomes.clear()
+				return
+			if circuit.state == CircuitBreaker.Open:
+				return
+			circuit.outcomes.append((now, failed))
+			calls = len(circuit.outcomes)
+			if calls >= self.minimumCalls:
+				failures = sum(1 for outcome in circuit.outcomes if outcome[1])
+				if failures >= self.failureRate * calls:
+					self._open(circuit, now)
+
+	def _open(self, circuit, now):
+		circuit.state = CircuitBreaker.Open
+		circuit.openedAt = now
+		circuit.outcomes.clear()
+
+	def isFailure(self, response=None, exception=None):
+		return exception is not None or (response is not None and response.status_code in self.failureStatusCodes)
+
+	def getState(self, url):
+		"""Returns "closed", "open" or "half-open" for the host of the URL."""
+		with self._lock:
+			circuit = self._getCircuit(url)
+			self._refresh(circuit, time.monotonic())
+			return circuit.state
+
+	def isOpen(self, url):
+		return self.getState(url) == CircuitBreaker.Open
+
+	def getStats(self):
+		"""Returns the state, recent failure rate and number of refused calls of every host."""
+		stats = {}
+		with self._lock:
+			now = time.monotonic()
+			for key, circuit in self._circuits.items():
+				self._refresh(circuit, now)
+				calls = len(circuit.outcomes)
+				failures = sum(1 for outcome in circuit.outcomes if outcome[1])
+				stats[key] = {
+					"state": circuit.state,
+					"calls": calls,
+					"failureRate": float(failures) / calls if calls > 0 else 0.0,
+					"rejected": circuit.rejected
+					}
+		return stats
+
+	def reset(self, url=None):
+		"""Closes the circuit of the URL's host, or of every host."""
+		with self._lock:
+			if url is None:
+				self._circuits = {}
+			else:
+				self._circuits.pop(SessionPool.hostKey(url), None)
@@ -0,0 +1,202 @@
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import threading
+import time
+from datetime import timedelta
+from enum import Enum
+from urllib.parse import urlencode
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+class CassetteMode(Enum):
+	RECORD = "record"
+	REPLAY = "replay"
+	PASSTHROUGH = "passthrough"
+
+
+class CassetteMissError(Exception):
+	"""Raised by a call in replay mode that has no recorded response."""
+	pass
+
+
+class Cassette(object):
+	"""Transport of curl and AsyncCurl that records API calls to a file and plays them back, so modules
+	can be profiled and tested with no network and no credentials.
+
+		cassette = onevizion.Cassette("site_audit.json.gz", onevizion.CassetteMode.RECORD)
+		onevizion.Config["Cassette"] = cassette
+		...run the module against a live instance...
+		cassette.save()
+
+	In RECORD mode the calls go to the server and each response (status, headers, body and the timing
+	phases) is kept, to be written by save().  In REPLAY mode the file is read once and each call is
+	answered from it, at full speed or, with realTime, after the latency that was recorded.  Calls are
+	matched on method, URL with its params, and body; identical calls get their recorded responses in the
+	order they were recorded, and the last one again once those run out.  A call with no recorded response
+	fails with CassetteMissError.  PASSTHROUGH sends the calls as if there were no cassette.
+
+	Request headers, and so the credentials, are never written, and neither is Set-Cookie.  Multipart
+	files are matched on their field and file names only.  HedgePolicy is not used while a cassette is
+	set.  Streamed calls, such as Trackor.GetFile downloads, are recorded and replayed like the others,
+	their body is read whole when it is recorded.  A file name ending in ".gz" is gzipped.
+
+	Attributes:
+		fileName: path of the cassette file
+		mode: CassetteMode
+		realTime: in REPLAY mode, wait the recorded latency of each call before answering it
+
+		hits: calls answered from the cassette
+		misses: calls in REPLAY mode that had no recorded response
+	"""
+
+	def __init__(self, fileName, mode=CassetteMode.REPLAY, realTime=False):
+		self.fileName = fileName
+		self.mode = mode
+		self.realTime = realTime
+		self.hits = 0
+		self.misses = 0
+		self._interactions = []
+		self._byKey = {}
+		self._replayed = {}
+		self._lock = threading.Lock()
+		if mode == CassetteMode.REPLAY:
+			self.load()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, excType, excValue, traceback):
+		if self.mode == CassetteMode.RECORD:
+			self.save()
+
+	def _open(self, mode):
+		if self.fileName.endswith(".gz"):
+			return gzip.open(self.fileName, mode + "t", encoding="utf-8")
+		return open(self.fileName, mode, encoding="utf-8")
+
+	def load(self):
+		with self._open("r") as f:
+			document = json.load(f)
+		with self._lock:
+			self._interactions = document["interactions"]
+			self._byKey = {}
+			for interaction in self._interactions:
+				self._byKey.setdefault(interaction["key"], []).append(interaction)
+			self._replayed = {}
+
+	def save(self):
+		with self._lock:
+			interactions = list(self._interactions)
+		with self._open("w") as f:
+			json.dump({"version": 1, "interactions": interactions}, f, separators=(',', ':'))
+
+	@staticmethod
+	def getKey(method, url, args):
+		"""Returns the key a call is matched on: its method, URL with params, and a digest of its body."""
+		URL = requests.Request('GET', url, params=args.get('params')).prepare().url
+		digest = hashlib.sha1()
+		data = args.get('data')
+		if isinstance(data, dict):
+			data = urlencode(sorted(data.items()))
+		if isinstance(data, str):
+			data = data.encode('utf-8')
+		if isinstance(data, bytes):
+			if (args.get('headers') or {}).get('Content-Encoding') == 'gzip':
+				data = gzip.decompress(data)
+			digest.update(data)
+		if args.get('json') is not None:
+			digest.update(json.dumps(args['json'], sort_keys=True).encode('utf-8'))
+		files = args.get('files')
+		if files:
+			for field, value in sorted(files.items() if isinstance(files, dict) else files, key=lambda item: item[0]):
+				name = value[0] if isinstance(value, (tuple, list)) else getattr(value, 'name', '')
+				digest.update("{Field}={Name};".format(Field=field, Name=name).encode('utf-8'))
+		return "{Method} {URL} {Body}".format(Method=method.upper(), URL=URL, Body=digest.hexdigest()[:16])
+
+	def send(self, send, method, url, args):
+		"""Answers a call of curl.  send() sends it to the server and returns the response."""
+		if self.mode == CassetteMode.PASSTHROUGH:
+			return send()
+		key = Cassette.getKey(method, url, args)
+		if self.mode == CassetteMode.RECORD:
+			response = send()
+			self._record(key, method, url, response)
+			return response
+		interaction = self._find(key)
+		if self.realTime:
+			time.sleep(interaction["latency"])
+		return Cassette._getResponse(interaction)
+
+	async def sendAsync(self, send, method, url, args):
+		"""Same as send, for AsyncCurl.  send() is a coroutine."""
+		if self.mode == CassetteMode.PASSTHROUGH:
+			return await send()
+		key = Cassette.getKey(method, url, args)
+		if self.mode == CassetteMode.RECORD:
+			response = await send()
+			self._record(key, method, url, response)
+			return response
+		interaction = self._find(key)
+		if self.realTime:
+			await asyncio.sleep(interaction["latency"])
+		return Cassette._getResponse(interaction)
+
+	def _record(self, key, method, url, response):
+		timing = getattr(response, '_onevizionTiming', (0.0, 0.0, 0.0))
+		body = response.content
+		interaction = {
+			"key": key,
+			"method": method.upper(),
+			"url": url,
+			"status": response.status_code,
+			"reason": response.reason,
+			"headers": {name: value for name, value in response.headers.items() if name.lower() != 'set-cookie'},
+			"latency": sum(timing),
+			"timing": list(timing)
+			}
+		try:
+			interaction["body"] = body.decode('utf-8')
+		except UnicodeDecodeError:
+			interaction["body"] = base64.b64encode(body).decode('ascii')
+			interaction["base64"] = True
+		with self._lock:
+			self._interactions.append(interaction)
+
+	def _find(self, key):
+		with self._lock:
+			recorded = self._byKey.get(key)
+			if recorded is None:
+				self.misses += 1
+				raise CassetteMissError("No recorded response in {FileName} for {Key}".format(FileName=self.fileName, Key=key))
+			index = self._replayed.get(key, 0)
+			self._replayed[key] = index + 1
+			self.hits += 1
+			return recorded[min(index, len(recorded) - 1)]
+
+	@staticmethod
+	def _getResponse(interaction):
+		response = requests.models.Response()
+		response.status_code = interaction["status"]
+		response.reason = interaction["reason"]
+		response.headers = CaseInsensitiveDict(interaction["headers"])
+		response.url = interaction["url"]
+		response.encoding = get_encoding_from_headers(response.headers)
+		if interaction.get("base64"):
+			response._content = base64.b64decode(interaction["body"])
+		else:
+			response._content = interaction["body"].encode('utf-8')
+		# Read already, so iter_content of a streamed call yields the recorded body.
+		response._content_consumed = True
+		connect, firstByte, download = interaction["timing"]
+		response.elapsed = timedelta(seconds=connect + firstByte)
+		response._onevizionTiming = (connect, firstByte, download)
+		return response
+
+	def rewind(self):
+		"""Plays the recorded responses of identical calls from the first one again."""
+		with self._lock:
+			self._replayed = {}
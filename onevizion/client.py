@@ -0,0 +1,157 @@
+import requests
+from onevizion.util import *
+from onevizion.pool import SessionPool
+from onevizion.httpbearer import HTTPBearerAuth
+from onevizion.trackor import Trackor
+from onevizion.workplan import WorkPlan
+from onevizion.task import Task
+from onevizion.Import import Import
+from onevizion.export import Export
+from onevizion.module.log import ModuleLog
+from onevizion.notif.queue import NotifQueue
+import onevizion
+
+class OneVizionClient(object):
+	"""One login, connection pool and set of call settings shared by any number of wrappers.  The paramToken
+		is resolved and the auth built once, and the wrappers handed out by the client are the usual Trackor,
+		Task, WorkPlan, Import, Export, ModuleLog, NotifQueue and NotificationService, bound to it: they use
+		the client's login, and every call they make uses the client's pool and settings.
+
+		client = onevizion.OneVizionClient(paramToken='trackor.onevizion.com', rateLimiter=onevizion.RateLimiter(readRate=20, writeRate=5))
+		sites = client.trackor('Site')
+		log = client.moduleLog(processId, logLevelName='Info')
+
+	Attributes:
+		URL: A string representing the website's main URL for instance "trackor.onevizion.com".
+		userName: the username or the OneVizion API Security Token Access Key that is used to login to the system
+		password: the password or the OneVizion API Security Token Secret Key that is used to gain access to the system
+		isTokenAuth: True to send userName and password as a Bearer token instead of Basic auth
+		auth: the requests auth object shared by all the wrappers of the client
+		pool: SessionPool of the client.  Defaults to a new SessionPool, closed by close()
+		retry, singleFlight, rateLimiter, compressor, circuitBreaker, hedge, scheduler, metrics, callHooks,
+			retention, cassette, httpCache, timeout: settings of the calls made through the client, see curl.  A setting left at
+			None falls back to onevizion.Config, and a call can still override it with a keyword argument.
+		readCache: TrackorReadCache of the client's Trackors, invalidated by their writes.  Defaults to
+			onevizion.Config["TrackorReadCache"]
+	"""
+
+	def __init__(
+		self,
+		URL="",
+		userName="",
+		password="",
+		paramToken=None,
+		isTokenAuth=False,
+		pool=None,
+		retry=None,
+		singleFlight=None,
+		rateLimiter=None,
+		compressor=None,
+		circuitBreaker=None,
+		hedge=None,
+		scheduler=None,
+		metrics=None,
+		callHooks=None,
+		retention=None,
+		cassette=None,
+		httpCache=None,
+		readCache=None,
+		timeout=None
+		):
+		self.URL = URL
+		self.userName = userName
+		self.password = password
+		self.isTokenAuth = isTokenAuth
+		if paramToken is not None:
+			if not self.URL:
+				self.URL = onevizion.Config["ParameterData"][paramToken]['url']
+			if not self.userName:
+				self.userName = onevizion.Config["ParameterData"][paramToken]['UserName']
+			if not self.password:
+				self.password = onevizion.Config["ParameterData"][paramToken]['Password']
+
+		self.URL = getUrlContainingScheme(self.URL)
+
+		if isTokenAuth:
+			self.auth = HTTPBearerAuth(self.userName, self.password)
+		else:
+			self.auth = requests.auth.HTTPBasicAuth(self.userName, self.password)
+
+		self._ownsPool = pool is None
+		self.pool = SessionPool() if pool is None else pool
+		self.retry = retry
+		self.singleFlight = singleFlight
+		self.rateLimiter = rateLimiter
+		self.compressor = compressor
+		self.circuitBreaker = circuitBreaker
+		self.hedge = hedge
+		self.scheduler = scheduler
+		self.metrics = metrics
+		self.callHooks = callHooks
+		self.retention = retention
+		self.cassette = cassette
+		self.httpCache = httpCache
+		self.readCache = readCache
+		self.timeout = timeout
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, excType, excValue, traceback):
+		self.close()
+
+	def _getLogin(self):
+		return dict(URL=self.URL, userName=self.userName, password=self.password, isTokenAuth=self.isTokenAuth, client=self)
+
+	def trackor(self, trackorType=""):
+		return Trackor(trackorType, **self._getLogin())
+
+	def workPlan(self):
+		return WorkPlan(**self._getLogin())
+
+	def task(self):
+		return Task(**self._getLogin())
+
+	def importer(self, impSpecId=None, file=None, action='INSERT_UPDATE', comments=None, incremental=None):
+		"""Returns an Import, which is run right away if impSpecId and file are given."""
+		return Import(impSpecId=impSpecId, file=file, action=action, comments=comments, incremental=incremental, **self._getLogin())
+
+	def export(self, trackorType=None, filters={}, fields=[], exportMode="CSV", delivery="File", viewOptions=None, filterOptions=None, fileFields=None, comments=None):
+		"""Returns an Export, which is run right away if the trackorType, the fields and the filters are given."""
+		return Export(
+			trackorType=trackorType,
+			filters=filters,
+			fields=fields,
+			exportMode=exportMode,
+			delivery=delivery,
+			viewOptions=viewOptions,
+			filterOptions=filterOptions,
+			fileFields=fileFields,
+			comments=comments,
+			**self._getLogin()
+			)
+
+	def moduleLog(self, processId, logLevelName="Error"):
+		return ModuleLog(processId, logLevelName=logLevelName, **self._getLogin())
+
+	def notifQueue(self, serviceId):
+		return NotifQueue(serviceId, **self._getLogin())
+
+	def notificationService(self, serviceClass, serviceId, processId, logLevel="", maxAttempts=1, nextAttemptDelay=30, **kwargs):
+		"""Returns an instance of serviceClass, a NotificationService subclass, bound to the client.  Any
+			other keyword arguments are passed on to its constructor.
+		"""
+		return serviceClass(
+			serviceId,
+			processId,
+			logLevel=logLevel,
+			maxAttempts=maxAttempts,
+			nextAttemptDelay=nextAttemptDelay,
+			**kwargs,
+			**self._getLogin()
+			)
+
+	def close(self):
+		"""Closes the client's pool, unless it was given to the client."""
+		if self._ownsPool:
+			self.pool.close()
@@ -0,0 +1,39 @@
+import gzip
+import threading
+from onevizion.pool import SessionPool
+
+class RequestCompressor(object):
+	"""Gzips request bodies of at least minSize bytes before curl sends them, and sets the
+	Content-Encoding header.  If the server answers a compressed call with one of rejectStatusCodes and
+	the same call sent uncompressed succeeds, the host is remembered and its calls are no longer compressed.
+
+	Attributes:
+		minSize: smallest body, in bytes, that is compressed
+		level: gzip compression level, 1 (fastest) to 9 (smallest)
+		rejectStatusCodes: answers to a compressed call that make curl resend it uncompressed
+
+		bytesIn: total size of the bodies that were compressed
+		bytesOut: total size of those bodies after compression
+	"""
+
+	def __init__(self, minSize=64*1024, level=6, rejectStatusCodes=(400, 415)):
+		self.minSize = minSize
+		self.level = level
+		self.rejectStatusCodes = rejectStatusCodes
+		self.bytesIn = 0
+		self.bytesOut = 0
+		self._rejectedHosts = set()
+		self._lock = threading.Lock()
+
+	def isRejected(self, url):
+		return SessionPool.hostKey(url) in self._rejectedHosts
+
+	def reject(self, url):
+		self._rejectedHosts.add(SessionPool.hostKey(url))
+
+	def compress(self, body):
+		compressed = gzip.compress(body, compresslevel=self.level)
+		with self._lock:
+			self.bytesIn += len(body)
+			self.bytesOut += len(compressed)
+		return compressed
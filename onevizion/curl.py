@@ -1,19 +1,74 @@
 import requests
-import json
-from datetime import datetime
+import threading
+import time
+from requests.structures import CaseInsensitiveDict
+from onevizion.pool import SessionPool, DefaultPool, resetConnectTime, getConnectTime
+from onevizion.util import Message, getCredentialKey
+from onevizion.singleflight import DefaultSingleFlight
+from onevizion.breaker import CircuitOpenError
+from onevizion.deadline import Deadline, DeadlineExceeded, getTimeout, getRemaining
+from onevizion.jsoncodec import loadsJSON
+from onevizion.hooks import CallHooks
+from onevizion.cassette import CassetteMissError
+import onevizion
 
 class curl(object):
 	"""Wrapper for requests.request() that will handle Error trapping and try to give JSON for calling.
 	If URL is passed on Instantiation, it will automatically run, else, it will wait for you to set
 	properties, then run it with runQuery() command.  Erors should be trapped and put into "errors" array.
-	If JSON is returned, it will be put into "data" as per json.loads
+	If JSON is returned, it will be put into "jsonData".  The body is only decoded the first time "jsonData"
+	is read, straight from the response bytes, with the codec in onevizion.Config["JSONCodec"].
 
 	Attributes:
 		method: GET, PUT, POST, PATCH, DELETE methods for HTTP call
 		url: URL to send the request
+		client: OneVizionClient whose settings are used for every option below that is not given.  Options
+			the client does not set either fall back to onevizion.Config
+		pool: SessionPool to take the keep-alive session from.  Defaults to the shared DefaultPool
+		retry: RetryPolicy for this call.  Defaults to onevizion.Config["RetryPolicy"], None means no retries
+		singleFlight: if True, a GET that is identical (method, URL, params, headers and credentials) to one
+			already in flight waits for it and shares its response and parsed jsonData instead of going to
+			the server again.  Defaults to onevizion.Config["SingleFlight"].  Do not modify a shared jsonData.
+		rateLimiter: RateLimiter consulted before every attempt.  Defaults to onevizion.Config["RateLimiter"]
+		compressor: RequestCompressor that gzips large request bodies.  Defaults to onevizion.Config["RequestCompressor"]
+		circuitBreaker: CircuitBreaker that refuses calls to failing hosts.  Defaults to onevizion.Config["CircuitBreaker"]
+		scheduler: RequestScheduler that bounds the calls in flight per host.  Defaults to onevizion.Config["Scheduler"]
+		priority: RequestPriority of the call when it has to wait for the scheduler.  Defaults to the
+			priority of the enclosing Priority block, or NORMAL
+		hedge: HedgePolicy that sends a second copy of slow GET calls.  Defaults to onevizion.Config["HedgePolicy"]
+		operation: name of the wrapper method making the call, such as "Trackor.read", for metrics
+		metrics: MetricsRegistry the finished call is added to.  Defaults to onevizion.Config["Metrics"]
+		callHooks: CallHooks told about each step of the call.  Defaults to onevizion.Config["CallHooks"]
+		retention: Retention, what the wrappers keep of the call.  Defaults to onevizion.Config["Retention"]
+		cassette: Cassette that records the call or answers it from a file.  Defaults to onevizion.Config["Cassette"]
+		httpCache: HTTPCache that keeps the GET response of this call on disk.  Without one, the client's or
+			onevizion.Config["HTTPCache"] is used if it lists the call's operation, see HTTPCache.caches
+		timeout: (connect, read) timeout in seconds.  Defaults to onevizion.Config["Timeout"].  Inside a
+			Deadline block it is cut down to the remaining budget, and the call fails with DeadlineExceeded
+			once the budget is spent.
 		**kwargs:  any other arguments to send to the request
+
+		duration: seconds the whole runQuery() took, retries and waits included
+		timing: seconds spent in each phase of the attempt that got the response: "connect" (opening the
+			connection: DNS, TCP and TLS, 0 when a kept-alive one was reused), "firstByte" (sending the
+			request and waiting for the answer), "download" (reading the body) and "decode" (parsing
+			jsonData, filled in when it is first read)
+		attempts: number of attempts made by the last runQuery()
+		retryWait: seconds spent waiting between those attempts
+		rateLimitWait: seconds the rate limiter held those attempts back
+		bodySize: size in bytes of the request body before compression, None if it was not measured
+		sentBodySize: size in bytes of the request body as it was sent
+		queueWait: seconds the scheduler held the attempts back
+		circuitOpen: True if the call was refused without being sent because the host's circuit is open
+		exception: the exception raised by the last attempt, if any
+		coalesced: True if the result was shared from an identical call that was already in flight
+		fromCache: True if the response was served by the HTTPCache, with or without revalidation, or the result by a TrackorReadCache
 	"""
 
+	# keyword arguments that configure curl itself and are not passed on to requests
+	Options = ('client', 'pool', 'retry', 'singleFlight', 'rateLimiter', 'compressor', 'circuitBreaker', 'hedge', 'scheduler', 'priority',
+		'operation', 'metrics', 'callHooks', 'retention', 'cassette', 'httpCache')
+
 	def __init__(self, method='GET', url=None, **kwargs):
 		self.method = method
 		self.url = url
@@ -33,13 +88,47 @@ class curl(object):
 		self.json = None
 		self.request = None
 		self.errors = []
+		self._jsonLock = threading.Lock()
 		self.jsonData = {}
 		self.args = {}
 		self.duration = None
+		self.timing = curl._newTiming()
 		self.sentUrl = None
 		self.sentArgs = None
+		self.client = None
+		self.pool = None
+		self.retry = None
+		self.attempts = 0
+		self.retryWait = 0.0
+		self.exception = None
+		self.singleFlight = None
+		self.coalesced = False
+		self.rateLimiter = None
+		self.rateLimitWait = 0.0
+		self.compressor = None
+		self.bodySize = None
+		self.sentBodySize = None
+		self._plainArgs = None
+		self._matchArgs = None
+		self._sentPlain = False
+		self.circuitBreaker = None
+		self.circuitOpen = False
+		self._circuitPending = False
+		self.hedge = None
+		self.scheduler = None
+		self.priority = None
+		self.queueWait = 0.0
+		self.operation = None
+		self.metrics = None
+		self.callHooks = None
+		self.retention = None
+		self.cassette = None
+		self.httpCache = None
+		self.fromCache = False
+		self._startedAt = time.monotonic()
 		for key, value in kwargs.items():
-			self.args[key] = value
+			if key not in curl.Options:
+				self.args[key] = value
 			setattr(self, key, value)
 
 		if self.url is not None:
@@ -52,6 +141,74 @@ class curl(object):
 			self.args[key] = value
 
 	def runQuery(self):
+		self._prepare()
+		before = time.monotonic()
+		self._startedAt = before
+		flightKey = self._getFlightKey()
+		if flightKey is None:
+			self._runAttempts()
+		else:
+			try:
+				owner = DefaultSingleFlight.do(flightKey, self, self._runAttempts)
+			except DeadlineExceeded as e:
+				self._failDeadline(e)
+			else:
+				if owner is not self:
+					self._shareResult(owner)
+		self.duration = time.monotonic() - before
+		self._recordMetrics()
+
+	def _runAttempts(self):
+		if self._sendFromCache():
+			return
+		while True:
+			self._startAttempt()
+			# The deadline is checked first, so an expired call does not take a half-open trial slot.
+			if not self._checkDeadline() or not self._checkCircuit():
+				break
+			try:
+				delay = self._getRateLimitDelay()
+				if delay > 0:
+					if not self._checkRateLimitDelay(delay):
+						break
+					time.sleep(delay)
+				if not self._checkDeadline():
+					break
+				scheduler = self._getScheduler()
+				if scheduler is not None:
+					try:
+						self.queueWait += scheduler.acquire(self.url, self.priority)
+					except DeadlineExceeded as e:
+						self._failDeadline(e)
+						break
+					# The timeout is cut down again to what the wait left of the deadline.
+					if not self._checkDeadline():
+						scheduler.release(self.url)
+						break
+				self._emit(CallHooks.BeforeRequest)
+				response = None
+				error = None
+				sendStart = time.monotonic()
+				try:
+					response = self._send()
+				except Exception as e:
+					error = e
+					self._failAttempt(e)
+				finally:
+					if scheduler is not None:
+						scheduler.release(self.url, response, error, time.monotonic() - sendStart)
+			finally:
+				self._releaseCircuit()
+			if response is not None:
+				self._finishAttempt(response)
+				if self._checkCompressionRejected():
+					continue
+			delay = self._getRetryDelay()
+			if delay is None:
+				break
+			time.sleep(delay)
+
+	def _prepare(self):
 		self.setArg('params', self.params)
 		self.setArg('data', self.data)
 		self.setArg('headers', self.headers)
@@ -71,18 +228,474 @@ class curl(object):
 		self.jsonData = {}
 		self.sentUrl = self.url
 		self.sentArgs = self.args
-		before = datetime.utcnow()
+		self.attempts = 0
+		self.retryWait = 0.0
+		self.rateLimitWait = 0.0
+		self.queueWait = 0.0
+		self.timing = curl._newTiming()
+		self.coalesced = False
+		self.fromCache = False
+		self._compressBody()
+
+	def _getCompressor(self):
+		return self._getSetting('compressor', "RequestCompressor")
+
+	def _compressBody(self):
+		self.bodySize = None
+		self.sentBodySize = None
+		self._plainArgs = None
+		self._matchArgs = self.args
+		self._sentPlain = False
+		compressor = self._getCompressor()
+		if compressor is None or compressor.isRejected(self.url):
+			return
+		data = self.args.get('data')
+		if isinstance(data, (str, bytes)) and self.args.get('files') is None:
+			body = data.encode('utf-8') if isinstance(data, str) else data
+			headers = CaseInsensitiveDict(self.args.get('headers') or {})
+		elif self.args.get('files') is not None or isinstance(data, dict) or self.args.get('json') is not None:
+			# Encoding the multipart body reads the files, so only do it once it is sure to be compressed.
+			if self.args.get('files') is not None and curl._getFilesSize(self.args['files']) < compressor.minSize:
+				return
+			# Let requests encode the multipart, form or json body, then send those bytes.
+			prepared = requests.Request(
+				method=self.method,
+				url=self.url,
+				headers=self.args.get('headers'),
+				files=self.args.get('files'),
+				data=data,
+				json=self.args.get('json')
+				).prepare()
+			body = prepared.body
+			if isinstance(body, str):
+				body = body.encode('utf-8')
+			headers = CaseInsensitiveDict(self.args.get('headers') or {})
+			if 'Content-Type' in prepared.headers:
+				headers['Content-Type'] = prepared.headers['Content-Type']
+		else:
+			return
+		if not isinstance(body, bytes):
+			return
+		self.bodySize = len(body)
+		self.sentBodySize = len(body)
+		if len(body) < compressor.minSize:
+			return
+
+		self.args = dict(self.args)
+		self.args.pop('files', None)
+		self.args.pop('json', None)
+		self.args['data'] = body
+		self.args['headers'] = headers
+		self._plainArgs = dict(self.args)
+		compressedHeaders = CaseInsensitiveDict(headers)
+		compressedHeaders['Content-Encoding'] = 'gzip'
+		self.args['data'] = compressor.compress(body)
+		self.args['headers'] = compressedHeaders
+		self.sentArgs = self.args
+		self.sentBodySize = len(self.args['data'])
+		Message("Request body compressed from {Before} to {After} bytes.".format(Before=self.bodySize, After=self.sentBodySize),2)
+
+	@staticmethod
+	def _getFilesSize(files):
+		"""Returns the size in bytes of the files of a multipart body, without reading them.  Files of unknown size count as 0."""
+		size = 0
+		for value in (files.values() if isinstance(files, dict) else (item[1] for item in files)):
+			if isinstance(value, (tuple, list)):
+				value = value[1]
+			size += requests.utils.super_len(value) or 0
+		return size
+
+	def _checkCompressionRejected(self):
+		"""Returns True when a compressed body was refused and the call should be sent again uncompressed."""
+		compressor = self._getCompressor()
+		if self._sentPlain:
+			self._sentPlain = False
+			if self.request.status_code in range(200,300):
+				compressor.reject(self.url)
+				Message("{URL} does not accept compressed request bodies.".format(URL=self.url),1)
+			return False
+		if self._plainArgs is None or self.request.status_code not in compressor.rejectStatusCodes:
+			return False
+		self.args = self._plainArgs
+		self.sentArgs = self.args
+		self._plainArgs = None
+		self._sentPlain = True
+		self.sentBodySize = self.bodySize
+		self.attempts -= 1
+		return True
+
+	def _getFlightKey(self):
+		singleFlight = self._getSetting('singleFlight', "SingleFlight")
+		if not singleFlight or self.method.upper() not in ('GET', 'HEAD') or self.stream:
+			return None
+		return (
+			self.method.upper(),
+			self.url,
+			repr(self.params),
+			repr(sorted((self.headers or {}).items())),
+			getCredentialKey(self.auth)
+			)
+
+	def _shareResult(self, owner):
+		self.request = owner.request
+		self.errors = list(owner.errors)
+		self.exception = owner.exception
+		self.attempts = owner.attempts
+		self.retryWait = owner.retryWait
+		self.rateLimitWait = owner.rateLimitWait
+		self.queueWait = owner.queueWait
+		# The same dict, so the decode time shows once the owner parses the shared jsonData.
+		self.timing = owner.timing
+		self.circuitOpen = owner.circuitOpen
+		self.fromCache = owner.fromCache
+		self.jsonData = {}
+		self._jsonSource = owner
+		self.coalesced = True
+
+	def _getSetting(self, name, configKey):
+		"""The option of this call, else the one of its client, else onevizion.Config[configKey]."""
+		value = getattr(self, name)
+		if value is None and self.client is not None:
+			value = getattr(self.client, name)
+		if value is None:
+			value = onevizion.Config[configKey]
+		return value
+
+	def _getPool(self):
+		if self.pool is not None:
+			return self.pool
+		if self.client is not None:
+			return self.client.pool
+		return DefaultPool
+
+	def _recordMetrics(self):
+		metrics = self._getSetting('metrics', "Metrics")
+		if metrics is not None:
+			metrics.recordCall(self)
+
+	def _emit(self, event, retryDelay=None):
+		hooks = self._getSetting('callHooks', "CallHooks")
+		if hooks is not None and hooks.has(event):
+			hooks.emit(event, self, retryDelay)
+
+	def getRequestSize(self):
+		"""Returns the size in bytes of the request body as sent, or None if it is not known yet."""
+		if self.sentBodySize is not None:
+			return self.sentBodySize
+		if self.request is not None and self.request.request is not None:
+			body = self.request.request.body
+			return len(body) if isinstance(body, (bytes, str)) else 0
+		data = self.args.get('data')
+		if isinstance(data, (bytes, str)):
+			return len(data)
+		if data is None and self.args.get('files') is None and self.args.get('json') is None:
+			return 0
+		return None
+
+	def getResponseSize(self):
+		"""Returns the size in bytes of the response body.  Streamed bodies are not read, their Content-Length is used."""
+		if self.request is None:
+			return 0
+		if self.stream:
+			return int(self.request.headers.get('Content-Length') or 0)
+		return len(self.request.content or b'')
+
+	def _startAttempt(self):
+		self.attempts += 1
+		self.errors = []
+		self.jsonData = {}
+		self.exception = None
+
+	def _failAttempt(self, exception):
+		self.exception = exception
+		self.errors.append(str(exception) or type(exception).__name__)
+		self._recordCircuit()
+		self._emit(CallHooks.OnError)
+
+	def _finishAttempt(self, response):
+		self.request = response
+		self.fromCache = getattr(response, '_onevizionCached', False)
+		self.timing = curl._newTiming(*getattr(response, '_onevizionTiming', (0.0, 0.0, 0.0)))
+		self._checkResponse()
+		self._recordCircuit()
+		self._emit(CallHooks.AfterResponse)
+		if len(self.errors) > 0:
+			self._emit(CallHooks.OnError)
+
+	def _getCircuitBreaker(self):
+		return self._getSetting('circuitBreaker', "CircuitBreaker")
+
+	def _checkCircuit(self):
+		"""Returns False, and fails the call, when the circuit breaker refuses to let it through."""
+		self.circuitOpen = False
+		circuitBreaker = self._getCircuitBreaker()
+		if circuitBreaker is None:
+			return True
+		if circuitBreaker.allow(self.url):
+			self._circuitPending = True
+			return True
+		self.circuitOpen = True
+		self.exception = CircuitOpenError("Circuit is open for {Host}, call not sent.".format(Host=SessionPool.hostKey(self.url)))
+		self.errors.append(str(self.exception))
+		self._emit(CallHooks.OnError)
+		return False
+
+	def _recordCircuit(self):
+		circuitBreaker = self._getCircuitBreaker()
+		if circuitBreaker is not None:
+			self._circuitPending = False
+			response = self.request if self.exception is None else None
+			circuitBreaker.record(self.url, circuitBreaker.isFailure(response, self.exception))
+
+	def _releaseCircuit(self):
+		"""Gives back the slot the breaker allowed the attempt, if it ended without an outcome being recorded."""
+		if self._circuitPending:
+			self._circuitPending = False
+			self._getCircuitBreaker().release(self.url)
+
+	def _checkDeadline(self):
+		"""Sets the timeout of the next attempt.  Returns False, and fails the call, if the deadline has expired."""
 		try:
-			self.request = requests.request(self.method, self.url, **self.args)
-		except Exception as e:
-			self.errors.append(str(e))
+			self.args['timeout'] = getTimeout(self._getSetting('timeout', "Timeout"))
+		except DeadlineExceeded as e:
+			self._failDeadline(e)
+			return False
+		return True
+
+	def _failDeadline(self, exception):
+		self.exception = exception
+		self.errors.append(str(exception))
+		self._emit(CallHooks.OnError)
+
+	def _getScheduler(self):
+		return self._getSetting('scheduler', "Scheduler")
+
+	def _getRateLimitDelay(self):
+		rateLimiter = self._getSetting('rateLimiter', "RateLimiter")
+		if rateLimiter is None:
+			return 0.0
+		return rateLimiter.reserve(self.url, self.auth, self.method)
+
+	def _checkRateLimitDelay(self, delay):
+		"""Returns False, and fails the call, if waiting delay seconds for the rate limiter would pass the deadline."""
+		remaining = getRemaining()
+		if remaining is not None and delay >= remaining:
+			self._failDeadline(DeadlineExceeded("Deadline of {Seconds} seconds exceeded waiting for the rate limiter.".format(Seconds=Deadline.current().seconds)))
+			return False
+		self.rateLimitWait += delay
+		return True
+
+	def _getRetryPolicy(self):
+		return self._getSetting('retry', "RetryPolicy")
+
+	def _getRetryDelay(self):
+		policy = self._getRetryPolicy()
+		# A call missing from the cassette will not be found on the next attempt either.
+		if policy is None or isinstance(self.exception, CassetteMissError):
+			return None
+		response = self.request if self.exception is None else None
+		delay = policy.getDelay(self.method, self.attempts, response, self.exception)
+		remaining = getRemaining()
+		if delay is not None and remaining is not None and delay >= remaining:
+			return None
+		if delay is not None:
+			self.retryWait += delay
+			Message("{Method} {URL} failed on attempt {Attempt}, retrying in {Delay:.2f} seconds.".format(
+				Method=self.method,
+				URL=self.url,
+				Attempt=self.attempts,
+				Delay=delay
+				),1)
+			self._emit(CallHooks.OnRetry, delay)
+		return delay
+
+	def _getHedgePolicy(self):
+		policy = self._getSetting('hedge', "HedgePolicy")
+		if policy is None or self.method.upper() not in ('GET', 'HEAD') or self.stream:
+			return None
+		return policy
+
+	def _getHTTPCache(self):
+		if self.httpCache is not None:
+			cache, given = self.httpCache, True
 		else:
-			if self.request.status_code not in range(200,300):
-				self.errors.append(str(self.request.status_code)+" = "+self.request.reason+"\n"+str(self.request.text))
-			try:
-				self.jsonData = json.loads(self.request.text)
-			except Exception as err:
-				pass
-		after = datetime.utcnow()
-		delta = after - before
-		self.duration = delta.total_seconds()
+			cache, given = self._getSetting('httpCache', "HTTPCache"), False
+		if cache is None or not cache.caches(self.operation, self.priority, given):
+			return None
+		return cache
+
+	def _sendFromCache(self):
+		"""Answers the call from the HTTP cache, without sending it, if the cached response is still fresh."""
+		cache = self._getHTTPCache()
+		if cache is None:
+			return False
+		response = cache.getFresh(self.method, self.url, self.args)
+		if response is None:
+			return False
+		self._startAttempt()
+		self.request = response
+		self.timing = curl._newTiming()
+		self.fromCache = True
+		self._checkResponse()
+		self._emit(CallHooks.AfterResponse)
+		return True
+
+	def _send(self):
+		cache = self._getHTTPCache()
+		if cache is not None:
+			return cache.send(self._sendTransport, self.method, self.url, self.args)
+		return self._sendTransport(self.args)
+
+	def _sendTransport(self, args):
+		cassette = self._getSetting('cassette', "Cassette")
+		if cassette is not None:
+			# Matched on the body as given, not on the bytes it was encoded to for compression.
+			return cassette.send(lambda: self._sendOnce(args), self.method, self.url, self._matchArgs or args)
+		policy = self._getHedgePolicy()
+		if policy is None:
+			return self._sendOnce(args)
+		return policy.send(lambda: self._sendOnce(args), self.url, lambda: self._sendHedge(args))
+
+	def _admitHedge(self):
+		"""Lets the second call of a hedged attempt through the circuit breaker, scheduler and rate limiter,
+			if they all let it through at once.  Returns the breaker and scheduler to settle it with, or None.
+		"""
+		circuitBreaker = self._getCircuitBreaker()
+		if circuitBreaker is not None and not circuitBreaker.allow(self.url):
+			return None
+		scheduler = self._getScheduler()
+		if scheduler is not None and not scheduler.tryAcquire(self.url):
+			scheduler = None
+			admitted = False
+		else:
+			rateLimiter = self._getSetting('rateLimiter', "RateLimiter")
+			admitted = rateLimiter is None or rateLimiter.tryReserve(self.url, self.auth, self.method)
+		if not admitted:
+			self._settleHedge((circuitBreaker, scheduler), None, None, None)
+			return None
+		return (circuitBreaker, scheduler)
+
+	def _settleHedge(self, admitted, response, exception, latency):
+		"""Records the outcome of the second call of a hedged attempt, or gives back its slots if it was not sent."""
+		circuitBreaker, scheduler = admitted
+		sent = response is not None or exception is not None
+		if scheduler is not None:
+			scheduler.release(self.url, response, exception, latency if sent else None)
+		if circuitBreaker is not None:
+			if sent:
+				circuitBreaker.record(self.url, circuitBreaker.isFailure(response, exception))
+			else:
+				circuitBreaker.release(self.url)
+
+	def _sendHedge(self, args):
+		"""Sends the second call of a hedged attempt, admitted like the first.  Returns None if it was held back."""
+		admitted = self._admitHedge()
+		if admitted is None:
+			return None
+		response = None
+		error = None
+		start = time.monotonic()
+		try:
+			response = self._sendOnce(args)
+		except Exception as e:
+			error = e
+			raise
+		finally:
+			self._settleHedge(admitted, response, error, time.monotonic() - start)
+		return response
+
+	def _sendOnce(self, args):
+		session = self._getPool().getSession(self.url)
+		resetConnectTime()
+		start = time.perf_counter()
+		response = session.request(self.method, self.url, **args)
+		end = time.perf_counter()
+		# requests sets "elapsed" once the headers are in, before the body is read.
+		connect = getConnectTime()
+		headers = response.elapsed.total_seconds()
+		# Kept on the response, as hedged attempts of the same call run side by side.
+		response._onevizionTiming = (connect, max(0.0, headers - connect), max(0.0, end - start - headers))
+		return response
+
+	def _checkResponse(self):
+		if self.request.status_code not in range(200,300):
+			self.errors.append(str(self.request.status_code)+" = "+self.request.reason+"\n"+str(self.request.text))
+		self._jsonPending = True
+
+	@property
+	def jsonData(self):
+		if self._jsonSource is not None:
+			return self._jsonSource.jsonData
+		if self._jsonPending:
+			# Coalesced calls read the owner's jsonData from their own threads, so it is decoded once, under the lock.
+			with self._jsonLock:
+				if self._jsonPending:
+					start = time.perf_counter()
+					self._jsonData = self._decodeJSON()
+					self.timing["decode"] = time.perf_counter() - start
+					self._jsonPending = False
+		return self._jsonData
+
+	@jsonData.setter
+	def jsonData(self, value):
+		with self._jsonLock:
+			self._jsonSource = None
+			self._jsonData = value
+			self._jsonPending = False
+
+	def _decodeJSON(self):
+		try:
+			if not curl._looksLikeJSON(self.request):
+				return {}
+			return loadsJSON(self.request.content)
+		except Exception as err:
+			return {}
+
+	def getRetention(self):
+		return self._getSetting('retention', "Retention")
+
+	def releaseBody(self):
+		"""Drops the response body and the request body, so only the status, headers, timings and parsed
+			jsonData stay in memory.  "request.content" and "request.text" are empty afterwards.  The body of a
+			stream call belongs to its caller and is not parsed, its jsonData is empty.
+		"""
+		if self.stream and self._jsonSource is None:
+			# The caller reads a streamed body itself, it may be gone already and is not parsed here.
+			if self._jsonPending:
+				self.jsonData = {}
+		elif self._jsonSource is not None or self._jsonPending:
+			self.jsonData = self.jsonData
+		if self.request is not None:
+			self.request._content = b''
+			self.request._content_consumed = True
+			self.request.raw = None
+			if self.request.request is not None:
+				self.request.request.body = None
+		for args in (self.args, self.sentArgs, self._plainArgs, self._matchArgs):
+			if args is not None:
+				for key in ('data', 'files', 'json'):
+					args.pop(key, None)
+		self.data = None
+		self.files = None
+		self.json = None
+
+	@staticmethod
+	def _newTiming(connect=0.0, firstByte=0.0, download=0.0):
+		return {"connect": connect, "firstByte": firstByte, "download": download, "decode": 0.0}
+
+	def getTimingText(self):
+		"""Returns the timing phases of the call as text, for the completion messages of the wrappers."""
+		return "connect {Connect:.3f}s, first byte {FirstByte:.3f}s, download {Download:.3f}s, decode {Decode:.3f}s".format(
+			Connect=self.timing["connect"],
+			FirstByte=self.timing["firstByte"],
+			Download=self.timing["download"],
+			Decode=self.timing["decode"]
+			)
+
+	@staticmethod
+	def _looksLikeJSON(response):
+		# Files and CSV exports are not worth handing to the decoder just to fail on them.
+		contentType = response.headers.get('Content-Type', '').lower()
+		if contentType == '' or 'json' in contentType:
+			return True
+		return response.content[:64].lstrip()[:1] in (b'{', b'[')
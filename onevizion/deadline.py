@@ -0,0 +1,97 @@
+import time
+from contextvars import ContextVar
+import onevizion
+
+_currentDeadline = ContextVar("onevizion_deadline", default=None)
+
+class DeadlineExceeded(Exception):
+	"""Raised into curl.exception, or by Deadline.check(), once the time budget of an operation is spent."""
+	pass
+
+
+class Deadline(object):
+	"""Time budget for an operation made of several API calls, such as running an export, polling its
+	status and downloading the file.  Inside the "with" block every curl call gets at most the remaining
+	budget as its timeout, retries stop when they would wait past it, and calls made after it expired fail
+	at once with DeadlineExceeded.  Deadlines nest, the earliest one wins, and they follow the code into
+	asyncio tasks.  Work handed to other threads must be run with contextvars.copy_context() to carry it.
+
+		with Deadline(600):
+			export.run()
+			while export.getProcessStatus() not in ('EXECUTED', 'FAILED'):
+				Deadline.sleep(10)
+			export.getFile()
+
+	Attributes:
+		seconds: length of the budget
+	"""
+
+	def __init__(self, seconds):
+		self.seconds = seconds
+		self.expiresAt = time.monotonic() + seconds
+		self._token = None
+
+	def __enter__(self):
+		outer = _currentDeadline.get()
+		if outer is not None and outer.expiresAt < self.expiresAt:
+			self.expiresAt = outer.expiresAt
+		self._token = _currentDeadline.set(self)
+		return self
+
+	def __exit__(self, excType, excValue, traceback):
+		_currentDeadline.reset(self._token)
+		self._token = None
+		return False
+
+	def remaining(self):
+		return max(0.0, self.expiresAt - time.monotonic())
+
+	def expired(self):
+		return time.monotonic() >= self.expiresAt
+
+	@staticmethod
+	def current():
+		"""Returns the Deadline of the running code, or None."""
+		return _currentDeadline.get()
+
+	@staticmethod
+	def check():
+		"""Raises DeadlineExceeded if the current deadline has expired."""
+		deadline = _currentDeadline.get()
+		if deadline is not None and deadline.expired():
+			raise DeadlineExceeded("Deadline of {Seconds} seconds exceeded.".format(Seconds=deadline.seconds))
+
+	@staticmethod
+	def sleep(seconds):
+		"""Sleeps, but not past the current deadline, then raises DeadlineExceeded if it has expired."""
+		deadline = _currentDeadline.get()
+		if deadline is not None:
+			seconds = min(seconds, deadline.remaining())
+		time.sleep(seconds)
+		Deadline.check()
+
+
+def getTimeout(timeout=None):
+	"""Returns the (connect, read) timeout for a call: the given one or onevizion.Config["Timeout"],
+		cut down to what is left of the current deadline.  Raises DeadlineExceeded if nothing is left.
+	"""
+	if timeout is None:
+		timeout = onevizion.Config["Timeout"]
+	deadline = _currentDeadline.get()
+	if deadline is None:
+		return timeout
+	remaining = deadline.remaining()
+	if remaining <= 0:
+		raise DeadlineExceeded("Deadline of {Seconds} seconds exceeded.".format(Seconds=deadline.seconds))
+	if timeout is None:
+		return remaining
+	if isinstance(timeout, tuple):
+		return tuple(remaining if part is None else min(part, remaining) for part in timeout)
+	return min(timeout, remaining)
+
+def getRemaining():
+	"""Returns the seconds left of the current deadline, or None if there is none."""
+	deadline = _currentDeadline.get()
+	if deadline is None:
+		return None
+	return deadline.remaining()
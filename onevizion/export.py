@@ -3,6 +3,10 @@ import json
 from datetime import datetime
 from onevizion.util import *
 from onevizion.curl import curl
+from onevizion.asynccurl import AsyncCurl
+from onevizion.retention import Retention, retainCall
+from onevizion.result import CallResult
+from onevizion.scheduler import RequestPriority
 from onevizion.httpbearer import HTTPBearerAuth
 from onevizion.EMail import EMail
 import onevizion
@@ -24,7 +28,8 @@ class Export(object):
 		fileFields=None,
 		comments=None,
 		paramToken=None,
-		isTokenAuth=False
+		isTokenAuth=False,
+		client=None
 		):
 		self.URL = URL
 		self.userName = userName
@@ -46,6 +51,7 @@ class Export(object):
 		self.processList = []
 		self.content = None
 		self.isTokenAuth = isTokenAuth
+		self.client = client
 		if paramToken is not None:
 			if self.URL is None:
 				self.URL = onevizion.Config["ParameterData"][paramToken]['url']
@@ -54,18 +60,42 @@ class Export(object):
 			if self.password is None:
 				self.password = onevizion.Config["ParameterData"][paramToken]['Password']
 
+		if client is not None:
+			# The login of the client, unless this wrapper was given its own.
+			if not self.URL:
+				self.URL = client.URL
+			if not self.userName:
+				self.userName = client.userName
+			if not self.password:
+				self.password = client.password
+
 		self.URL = getUrlContainingScheme(self.URL)
 
 		# If all info is filled out, go ahead and run the query.
 		if self.URL is not None and self.userName is not None and self.password is not None and self.trackorType is not None and (self.viewOptions is not None or len(self.fields)>0 or self.fileFields is not None) and (self.filterOptions is not None or len(self.filters)>0):
 			self.run()
 
+	@property
+	def results(self):
+		"""The result call style of this Export: export.results.run() returns a CallResult and is thread safe."""
+		return ExportResults(self)
+
 	def run(self):
-		if self.isTokenAuth:
-			self.auth = HTTPBearerAuth(self.userName, self.password)
-		else:
-			self.auth = requests.auth.HTTPBasicAuth(self.userName, self.password)
-		self.ImportURL = "{URL}/api/v3/exports/{TrackorType}/run?export_mode={ExportMode}&delivery={Delivery}".format(
+		URL = self._runRequest()
+		return self._runResult(curl('POST',URL,auth=self.auth,client=self.client,operation='Export.run'), URL)
+
+	async def runAsync(self):
+		"""Same as run, but awaits the call on the running event loop."""
+		URL = self._runRequest()
+		return self._runResult(await AsyncCurl('POST',URL,auth=self.auth,client=self.client,operation='Export.run'), URL)
+
+	def _runRequest(self):
+		self._setAuth()
+		self.ImportURL = self._getRunURL()
+		return self.ImportURL
+
+	def _getRunURL(self):
+		URL = "{URL}/api/v3/exports/{TrackorType}/run?export_mode={ExportMode}&delivery={Delivery}".format(
 			URL=self.URL,
 			TrackorType=self.trackorType,
 			ExportMode=self.exportMode,
@@ -77,7 +107,7 @@ class Export(object):
 			ViewSection = '&fields=' + ",".join(self.fields)
 		else:
 			ViewSection = '&view=' + URLEncode(self.viewOptions)
-		self.ImportURL += ViewSection
+		URL += ViewSection
 
 		FilterSection = "&"
 		if self.filterOptions is None:
@@ -86,28 +116,20 @@ class Export(object):
 			FilterSection = FilterSection.rstrip('?&')
 		else:
 			FilterSection = "&filter="+URLEncode(self.filterOptions)
-		self.ImportURL += FilterSection
+		URL += FilterSection
 
 		if self.comments is not None:
-			self.ImportURL += '&comments=' + URLEncode(self.comments)
-		self.OVCall = curl('POST',self.ImportURL,auth=self.auth)
-		self.jsonData = self.OVCall.jsonData
-		self.request = self.OVCall.request
-
-		Message(self.ImportURL,2)
-		Message("Run Export completed in {Duration} seconds.".format(Duration=self.OVCall.duration),1)
-		if len(self.OVCall.errors) > 0:
-			self.errors.append(self.OVCall.errors)
-			TraceTag="{TimeStamp}:".format(TimeStamp=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f'))
-			self.TraceTag = TraceTag
-			onevizion.Config["Trace"][TraceTag+"-URL"] = self.ImportURL
-			try:
-				TraceMessage("Status Code: {StatusCode}".format(StatusCode=self.OVCall.request.status_code),0,TraceTag+"-StatusCode")
-				TraceMessage("Reason: {Reason}".format(Reason=self.OVCall.request.reason),0,TraceTag+"-Reason")
-				TraceMessage("Body:\n{Body}".format(Body=self.OVCall.request.text),0,TraceTag+"-Body")
-			except Exception as e:
-				TraceMessage("Errors:\n{Errors}".format(Errors=json.dumps(self.OVCall.errors,indent=2)),0,TraceTag+"-Errors")
-			onevizion.Config["Error"]=True
+			URL += '&comments=' + URLEncode(self.comments)
+		return URL
+
+	def _runResult(self, OVCall, URL):
+		self._setCall(OVCall)
+
+		Message(URL,2)
+		Message("Run Export completed in {Duration} seconds ({Timing}).".format(Duration=OVCall.duration, Timing=OVCall.getTimingText()),1)
+		if len(OVCall.errors) > 0:
+			self.errors.append(OVCall.errors)
+			self.TraceTag = TraceCallErrors(OVCall, URL)
 		else:
 			if "error_message" in self.jsonData and len(self.jsonData["error_message"]) > 0:
 				self.errors.append(self.jsonData["error_message"])
@@ -117,112 +139,178 @@ class Export(object):
 				self.processId = self.jsonData["process_id"]
 			if "status" in self.jsonData:
 				self.status = self.jsonData["status"]
+		retainCall(self, OVCall)
 		return self.processId
 
 	def interrupt(self,ProcessID=None):
+		PID, URL = self._interruptRequest(ProcessID)
+		self._interruptResult(curl('POST',URL,auth=self.auth,priority=RequestPriority.CONTROL,client=self.client,operation='Export.interrupt'), URL, PID)
+
+	async def interruptAsync(self,ProcessID=None):
+		"""Same as interrupt, but awaits the call on the running event loop.  Returns the AsyncCurl object of the call."""
+		PID, URL = self._interruptRequest(ProcessID)
+		OVCall = await AsyncCurl('POST',URL,auth=self.auth,priority=RequestPriority.CONTROL,client=self.client,operation='Export.interrupt')
+		self._interruptResult(OVCall, URL, PID)
+		return OVCall
+
+	def _interruptRequest(self, ProcessID):
 		if ProcessID is None:
 			PID = self.processId
 		else:
 			PID = ProcessID
-		if self.isTokenAuth:
-			self.auth = HTTPBearerAuth(self.userName, self.password)
-		else:
-			self.auth = requests.auth.HTTPBasicAuth(self.userName, self.password)
-		self.ImportURL = "{URL}/api/v3/exports/runs/{ProcID}/interrupt".format(
-			URL=self.URL,
-			ProcID=PID
-			)
-		self.OVCall = curl('POST',self.ImportURL,auth=self.auth)
-		self.jsonData = self.OVCall.jsonData
-		self.request = self.OVCall.request
-
-		Message(self.ImportURL,2)
-		Message("Get Interupt Export completed in {Duration} seconds.".format(Duration=self.OVCall.duration),1)
-		if len(self.OVCall.errors) > 0:
-			self.errors.append(self.OVCall.errors)
-			TraceTag="{TimeStamp}:".format(TimeStamp=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f'))
-			self.TraceTag = TraceTag
-			onevizion.Config["Trace"][TraceTag+"-URL"] = self.ImportURL
-			try:
-				TraceMessage("Status Code: {StatusCode}".format(StatusCode=self.OVCall.request.status_code),0,TraceTag+"-StatusCode")
-				TraceMessage("Reason: {Reason}".format(Reason=self.OVCall.request.reason),0,TraceTag+"-Reason")
-				TraceMessage("Body:\n{Body}".format(Body=self.OVCall.request.text),0,TraceTag+"-Body")
-			except Exception as e:
-				TraceMessage("Errors:\n{Errors}".format(Errors=json.dumps(self.OVCall.errors,indent=2)),0,TraceTag+"-Errors")
-			onevizion.Config["Error"]=True
+		self._setAuth()
+		self.ImportURL = self._getProcessURL(PID, "/interrupt")
+		return PID, self.ImportURL
+
+	def _interruptResult(self, OVCall, URL, PID):
+		self._setCall(OVCall)
+
+		Message(URL,2)
+		Message("Get Interupt Export completed in {Duration} seconds ({Timing}).".format(Duration=OVCall.duration, Timing=OVCall.getTimingText()),1)
+		if len(OVCall.errors) > 0:
+			self.errors.append(OVCall.errors)
+			self.TraceTag = TraceCallErrors(OVCall, URL)
 		else:
 			self.processId = PID
 		if "status" in self.jsonData:
 			self.status = self.jsonData['status']
+		retainCall(self, OVCall)
 
 	def getProcessStatus(self,ProcessID=None):
+		URL = self._getProcessStatusRequest(ProcessID)
+		return self._getProcessStatusResult(curl('GET',URL,auth=self.auth,priority=RequestPriority.INTERACTIVE,client=self.client,operation='Export.getProcessStatus'), URL)
+
+	async def getProcessStatusAsync(self,ProcessID=None):
+		"""Same as getProcessStatus, but awaits the call on the running event loop."""
+		URL = self._getProcessStatusRequest(ProcessID)
+		return self._getProcessStatusResult(await AsyncCurl('GET',URL,auth=self.auth,priority=RequestPriority.INTERACTIVE,client=self.client,operation='Export.getProcessStatus'), URL)
+
+	def _getProcessStatusRequest(self, ProcessID):
 		if ProcessID is None:
 			PID = self.processId
 		else:
 			PID = ProcessID
-		if self.isTokenAuth:
-			self.auth = HTTPBearerAuth(self.userName, self.password)
-		else:
-			self.auth = requests.auth.HTTPBasicAuth(self.userName, self.password)
-		self.ImportURL = "{URL}/api/v3/exports/runs/{ProcID}".format(
-			URL=self.URL,
-			ProcID=PID
-			)
-		self.OVCall = curl('GET',self.ImportURL,auth=self.auth)
-		self.jsonData = self.OVCall.jsonData
-		self.request = self.OVCall.request
-
-		Message(self.ImportURL,2)
-		Message("Get Process Status for Export completed in {Duration} seconds.".format(Duration=self.OVCall.duration),1)
-		if len(self.OVCall.errors) > 0:
-			self.errors.append(self.OVCall.errors)
-			TraceTag="{TimeStamp}:".format(TimeStamp=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f'))
-			self.TraceTag = TraceTag
-			onevizion.Config["Trace"][TraceTag+"-URL"] = self.ImportURL
-			try:
-				TraceMessage("Status Code: {StatusCode}".format(StatusCode=self.OVCall.request.status_code),0,TraceTag+"-StatusCode")
-				TraceMessage("Reason: {Reason}".format(Reason=self.OVCall.request.reason),0,TraceTag+"-Reason")
-				TraceMessage("Body:\n{Body}".format(Body=self.OVCall.request.text),0,TraceTag+"-Body")
-			except Exception as e:
-				TraceMessage("Errors:\n{Errors}".format(Errors=json.dumps(self.OVCall.errors,indent=2)),0,TraceTag+"-Errors")
-			onevizion.Config["Error"]=True
+		self._setAuth()
+		self.ImportURL = self._getProcessURL(PID)
+		return self.ImportURL
+
+	def _getProcessStatusResult(self, OVCall, URL):
+		self._setCall(OVCall)
+
+		Message(URL,2)
+		Message("Get Process Status for Export completed in {Duration} seconds ({Timing}).".format(Duration=OVCall.duration, Timing=OVCall.getTimingText()),1)
+		if len(OVCall.errors) > 0:
+			self.errors.append(OVCall.errors)
+			self.TraceTag = TraceCallErrors(OVCall, URL)
 		if "status" in self.jsonData:
 			self.status = self.jsonData['status']
 		else:
 			self.status = 'No Status'
+		retainCall(self, OVCall)
 		return self.status
 
 	def getFile(self,ProcessID=None):
+		URL = self._getFileRequest(ProcessID)
+		return self._getFileResult(curl('GET',URL,auth=self.auth,client=self.client,operation='Export.getFile'), URL)
+
+	async def getFileAsync(self,ProcessID=None):
+		"""Same as getFile, but awaits the call on the running event loop."""
+		URL = self._getFileRequest(ProcessID)
+		return self._getFileResult(await AsyncCurl('GET',URL,auth=self.auth,client=self.client,operation='Export.getFile'), URL)
+
+	def _getFileRequest(self, ProcessID):
 		if ProcessID is None:
 			PID = self.processId
 		else:
 			PID = ProcessID
-		if self.isTokenAuth:
-			self.auth = HTTPBearerAuth(self.userName, self.password)
+		self._setAuth()
+		self.ImportURL = self._getProcessURL(PID, "/file")
+		return self.ImportURL
+
+	def _getFileResult(self, OVCall, URL):
+		self._setCall(OVCall)
+
+		Message(URL,2)
+		Message("Get File for Export completed in {Duration} seconds ({Timing}).".format(Duration=OVCall.duration, Timing=OVCall.getTimingText()),1)
+		content = self.content
+		if len(OVCall.errors) > 0:
+			self.errors.append(OVCall.errors)
+			TraceCallErrors(OVCall, URL)
 		else:
-			self.auth = requests.auth.HTTPBasicAuth(self.userName, self.password)
-		self.ImportURL = "{URL}/api/v3/exports/runs/{ProcID}/file".format(
+			content = self.request.content
+			if OVCall.getRetention() == Retention.FULL:
+				self.content = content
+		retainCall(self, OVCall)
+		return content
+
+	def _getProcessURL(self, PID, Suffix=""):
+		return "{URL}/api/v3/exports/runs/{ProcID}{Suffix}".format(
 			URL=self.URL,
-			ProcID=PID
+			ProcID=PID,
+			Suffix=Suffix
 			)
 
-		self.OVCall = curl('GET',self.ImportURL,auth=self.auth)
-		self.jsonData = self.OVCall.jsonData
-		self.request = self.OVCall.request
-
-		Message(self.ImportURL,2)
-		Message("Get File for Export completed in {Duration} seconds.".format(Duration=self.OVCall.duration),1)
-		if len(self.OVCall.errors) > 0:
-			self.errors.append(self.OVCall.errors)
-			TraceTag="{TimeStamp}:".format(TimeStamp=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f'))
-			onevizion.Config["Trace"][TraceTag+"-URL"] = self.ImportURL
-			try:
-				TraceMessage("Status Code: {StatusCode}".format(StatusCode=self.OVCall.request.status_code),0,TraceTag+"-StatusCode")
-				TraceMessage("Reason: {Reason}".format(Reason=self.OVCall.request.reason),0,TraceTag+"-Reason")
-				TraceMessage("Body:\n{Body}".format(Body=self.OVCall.request.text),0,TraceTag+"-Body")
-			except Exception as e:
-				TraceMessage("Errors:\n{Errors}".format(Errors=json.dumps(self.OVCall.errors,indent=2)),0,TraceTag+"-Errors")
-			onevizion.Config["Error"]=True
-		else:
-			self.content = self.request.content
-		return self.content
+	def _getAuth(self):
+		if self.client is not None:
+			return self.client.auth
+		if self.isTokenAuth:
+			return HTTPBearerAuth(self.userName, self.password)
+		return requests.auth.HTTPBasicAuth(self.userName, self.password)
+
+	def _setAuth(self):
+		self.auth = self._getAuth()
+
+	def _setCall(self, OVCall):
+		self.OVCall = OVCall
+		self.jsonData = OVCall.jsonData
+		self.request = OVCall.request
+
+
+class ExportResults(object):
+	"""Result call style of an Export, see CallResult.  It has the same methods as Export, each returning
+		a CallResult instead of setting the Export's attributes, so the process id must always be given.
+		The "error_message" of a run is added to the errors, and the data of getFile is the file content.
+		Get it from Export.results.
+	"""
+
+	def __init__(self, export):
+		self._export = export
+
+	def run(self):
+		return ExportResults._runResult(curl('POST',self._export._getRunURL(),auth=self._export._getAuth(),client=self._export.client,operation='Export.run'))
+
+	async def runAsync(self):
+		return ExportResults._runResult(await AsyncCurl('POST',self._export._getRunURL(),auth=self._export._getAuth(),client=self._export.client,operation='Export.run'))
+
+	@staticmethod
+	def _runResult(OVCall):
+		ErrorMessage = OVCall.jsonData.get("error_message") if len(OVCall.errors) == 0 and isinstance(OVCall.jsonData, dict) else None
+		return CallResult(OVCall, extraErrors=(ErrorMessage,) if ErrorMessage else ())
+
+	def interrupt(self, ProcessID):
+		URL = self._export._getProcessURL(ProcessID, "/interrupt")
+		return CallResult(curl('POST',URL,auth=self._export._getAuth(),priority=RequestPriority.CONTROL,client=self._export.client,operation='Export.interrupt'))
+
+	async def interruptAsync(self, ProcessID):
+		URL = self._export._getProcessURL(ProcessID, "/interrupt")
+		return CallResult(await AsyncCurl('POST',URL,auth=self._export._getAuth(),priority=RequestPriority.CONTROL,client=self._export.client,operation='Export.interrupt'))
+
+	def getProcessStatus(self, ProcessID):
+		URL = self._export._getProcessURL(ProcessID)
+		return CallResult(curl('GET',URL,auth=self._export._getAuth(),priority=RequestPriority.INTERACTIVE,client=self._export.client,operation='Export.getProcessStatus'))
+
+	async def getProcessStatusAsync(self, ProcessID):
+		URL = self._export._getProcessURL(ProcessID)
+		return CallResult(await AsyncCurl('GET',URL,auth=self._export._getAuth(),priority=RequestPriority.INTERACTIVE,client=self._export.client,operation='Export.getProcessStatus'))
+
+	def getFile(self, ProcessID):
+		URL = self._export._getProcessURL(ProcessID, "/file")
+		return ExportResults._getFileResult(curl('GET',URL,auth=self._export._getAuth(),client=self._export.client,operation='Export.getFile'))
+
+	async def getFileAsync(self, ProcessID):
+		URL = self._export._getProcessURL(ProcessID, "/file")
+		return ExportResults._getFileResult(await AsyncCurl('GET',URL,auth=self._export._getAuth(),client=self._export.client,operation='Export.getFile'))
+
+	@staticmethod
+	def _getFileResult(OVCall):
+		return CallResult(OVCall, data=OVCall.request.content if len(OVCall.errors) == 0 else b'')
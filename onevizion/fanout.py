@@ -0,0 +1,162 @@
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from onevizion.util import *
+from onevizion.client import OneVizionClient
+from onevizion.pool import SessionPool
+from onevizion.scheduler import RequestScheduler
+import onevizion
+
+class TenantResult(object):
+	"""Outcome of a FanOut operation on one OneVizion instance.
+
+	Attributes:
+		paramToken: the tenant's entry in onevizion.Config["ParameterData"]
+		URL: the tenant's URL
+		value: what the operation returned, None if it raised
+		errors: tuple of the errors of the tenant: the exception raised by the operation, or else the
+			"errors" of the returned value when it has some, such as a CallResult or a wrapper
+		exception: the exception raised by the operation, if any
+		duration: seconds the operation took on this tenant
+	"""
+
+	def __init__(self, paramToken, URL, value=None, exception=None, duration=None):
+		self.paramToken = paramToken
+		self.URL = URL
+		self.value = value
+		self.exception = exception
+		self.duration = duration
+		if exception is not None:
+			self.errors = (str(exception),)
+		else:
+			self.errors = tuple(getattr(value, 'errors', None) or ())
+
+	@property
+	def ok(self):
+		return len(self.errors) == 0
+
+	def __repr__(self):
+		return "TenantResult({ParamToken}: errors={Errors}, duration={Duration})".format(
+			ParamToken=self.paramToken,
+			Errors=len(self.errors),
+			Duration=self.duration
+			)
+
+
+class FanOut(object):
+	"""Runs the same operation against many OneVizion instances at once, each given by its paramToken in
+		onevizion.Config["ParameterData"].  The operation is called with a OneVizionClient bound to the
+		tenant, and a TenantResult is handed back for each tenant as soon as it finishes:
+
+		def audit(client):
+			return client.trackor('Site').results.read(filters={'SITE_STATUS': 'Active'}, fields=['TRACKOR_KEY'])
+
+		with onevizion.FanOut(paramTokens, maxPerHost=4) as fanOut:
+			for result in fanOut.run(audit):
+				print(result.paramToken, result.ok, result.duration)
+
+		Tenants on the same host share one SessionPool, and one RequestScheduler bounds the calls in flight
+		on each host, so tenants hosted together do not flood their server while the others run.
+
+	Attributes:
+		paramTokens: list of the tenants' paramTokens
+		maxWorkers: tenants run at once by run()
+		scheduler: RequestScheduler shared by all the tenants.  Defaults to RequestScheduler(maxPerHost)
+		clients: OneVizionClient of each paramToken
+		pools: SessionPool of each host
+		**clientSettings: any other settings of the clients, such as rateLimiter, retry or metrics, see OneVizionClient
+	"""
+
+	def __init__(self, paramTokens, maxWorkers=8, maxPerHost=4, scheduler=None, isTokenAuth=False, **clientSettings):
+		self.paramTokens = list(paramTokens)
+		self.maxWorkers = maxWorkers
+		self.scheduler = RequestScheduler(maxPerHost) if scheduler is None else scheduler
+		self.clients = {}
+		self.pools = {}
+		for paramToken in self.paramTokens:
+			URL = getUrlContainingScheme(onevizion.Config["ParameterData"][paramToken]['url'])
+			host = SessionPool.hostKey(URL)
+			if host not in self.pools:
+				self.pools[host] = SessionPool()
+			self.clients[paramToken] = OneVizionClient(
+				paramToken=paramToken,
+				isTokenAuth=isTokenAuth,
+				pool=self.pools[host],
+				scheduler=self.scheduler,
+				**clientSettings
+				)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, excType, excValue, traceback):
+		self.close()
+
+	def _runTenant(self, paramToken, operation):
+		client = self.clients[paramToken]
+		start = time.monotonic()
+		try:
+			value = operation(client)
+		except Exception as e:
+			return self._getResult(paramToken, None, e, time.monotonic() - start)
+		return self._getResult(paramToken, value, None, time.monotonic() - start)
+
+	async def _runTenantAsync(self, paramToken, operation, semaphore):
+		client = self.clients[paramToken]
+		async with semaphore:
+			start = time.monotonic()
+			try:
+				value = await operation(client)
+			except Exception as e:
+				return self._getResult(paramToken, None, e, time.monotonic() - start)
+			return self._getResult(paramToken, value, None, time.monotonic() - start)
+
+	def _getResult(self, paramToken, value, exception, duration):
+		result = TenantResult(paramToken, self.clients[paramToken].URL, value, exception, duration)
+		Message("{ParamToken} completed in {Duration} seconds with {Errors} errors.".format(
+			ParamToken=paramToken,
+			Duration=duration,
+			Errors=len(result.errors)
+			),1)
+		return result
+
+	def run(self, operation):
+		"""Calls operation(client) for every tenant on a pool of maxWorkers threads, and yields the
+			TenantResults in the order the tenants finish.  Tenants not started yet are skipped if the loop
+			is left early.
+		"""
+		if len(self.paramTokens) == 0:
+			return
+		executor = ThreadPoolExecutor(max_workers=min(self.maxWorkers, len(self.paramTokens)), thread_name_prefix="onevizion-fanout")
+		# Each tenant runs in a copy of the caller's context, so Deadline and Priority blocks carry over.
+		futures = [executor.submit(contextvars.copy_context().run, self._runTenant, paramToken, operation) for paramToken in self.paramTokens]
+		try:
+			for future in as_completed(futures):
+				yield future.result()
+		finally:
+			for future in futures:
+				future.cancel()
+			executor.shutdown(wait=False)
+
+	def runAll(self, operation):
+		"""Same as run, but waits for all the tenants and returns their TenantResults by paramToken."""
+		results = {result.paramToken: result for result in self.run(operation)}
+		return {paramToken: results[paramToken] for paramToken in self.paramTokens}
+
+	async def runAsync(self, operation):
+		"""Same as run, for an async operation, for instance one awaiting the Async variants of the wrappers.
+			Yields the TenantResults as the tenants finish, with at most maxWorkers tenants running at once.
+		"""
+		semaphore = asyncio.Semaphore(self.maxWorkers)
+		tasks = [asyncio.ensure_future(self._runTenantAsync(paramToken, operation, semaphore)) for paramToken in self.paramTokens]
+		try:
+			for task in asyncio.as_completed(tasks):
+				yield await task
+		finally:
+			for task in tasks:
+				task.cancel()
+
+	def close(self):
+		for pool in self.pools.values():
+			pool.close()
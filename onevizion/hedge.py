@@ -0,0 +1,203 @@
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from onevizion.pool import SessionPool
+from onevizion.util import getEndpointTemplate
+
+class _Race(object):
+	"""The attempts of one hedged call of curl: the first response wins, the later ones are closed as they arrive."""
+
+	def __init__(self, policy):
+		self.policy = policy
+		self.winner = None
+		self.failures = []
+		self.running = 0
+		self._done = threading.Condition()
+
+	def start(self, name, fn, url):
+		with self._done:
+			self.running += 1
+		# Each attempt runs in a thread of its own, so hedged calls are not capped by a shared pool,
+		# and in a copy of the caller's context so Deadline and Priority blocks carry over.
+		thread = threading.Thread(target=contextvars.copy_context().run, args=(self._run, name, fn, url), name="onevizion-hedge", daemon=True)
+		thread.start()
+
+	def _run(self, name, fn, url):
+		start = time.monotonic()
+		try:
+			response = fn()
+		except Exception as e:
+			self._finish(name, None, e)
+			return
+		if response is not None:
+			self.policy.recordLatency(url, time.monotonic() - start)
+		self._finish(name, response, None)
+
+	def _finish(self, name, response, exception):
+		with self._done:
+			self.running -= 1
+			if exception is not None:
+				self.failures.append(exception)
+			elif response is None:
+				# The hedge was held back by the rate limiter, circuit breaker or scheduler, and not sent.
+				self.policy._returnBudget()
+			elif self.winner is None:
+				self.winner = (name, response)
+			else:
+				response.close()
+			self._done.notify_all()
+
+	def wait(self, timeout=None):
+		"""Waits until an attempt answered or all of them failed, at most timeout seconds."""
+		with self._done:
+			self._done.wait_for(lambda: self.winner is not None or self.running == 0, timeout)
+
+
+class HedgePolicy(object):
+	"""Cuts the tail latency of idempotent GET calls.  If a call has not answered after the given
+	percentile of the latencies recently seen on its endpoint, an identical second call is sent and the
+	first answer wins.  The losing call is cancelled when it runs on the event loop; a losing thread can
+	not be interrupted, so its response is closed as soon as it arrives.  Hedges are only sent while they
+	stay under maxHedgeRatio of all calls, and only once minSamples latencies are known for the endpoint.
+
+	The second call goes through the same rate limiter, circuit breaker and scheduler as the first, and is
+	only sent if they let it through at once.  The latency of every attempt is recorded, the losing ones
+	included, so hedging does not hide how slow the endpoint is.
+
+	Attributes:
+		percentile: percentile of recent latencies to wait before hedging, 0 to 100
+		minDelay: never hedge sooner than this many seconds
+		maxHedgeRatio: largest share of calls that may be hedged
+		minSamples: latencies needed on an endpoint before it is hedged
+		window: number of recent latencies kept per endpoint
+
+		requests: calls seen by the policy
+		hedges: second calls sent
+		hedgeWins: second calls that answered first
+	"""
+
+	def __init__(self, percentile=95, minDelay=0.05, maxHedgeRatio=0.05, minSamples=20, window=200):
+		self.percentile = percentile
+		self.minDelay = minDelay
+		self.maxHedgeRatio = maxHedgeRatio
+		self.minSamples = minSamples
+		self.window = window
+		self.requests = 0
+		self.hedges = 0
+		self.hedgeWins = 0
+		self._latencies = {}
+		self._lock = threading.Lock()
+
+	@staticmethod
+	def _getKey(url):
+		return SessionPool.hostKey(url) + getEndpointTemplate(url)
+
+	def getDelay(self, url):
+		"""Returns how long to wait for a call before hedging it, or None while too little is known."""
+		with self._lock:
+			latencies = self._latencies.get(HedgePolicy._getKey(url))
+			if latencies is None or len(latencies) < self.minSamples:
+				return None
+			ordered = sorted(latencies)
+		index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100.0))
+		return max(self.minDelay, ordered[index])
+
+	def recordLatency(self, url, seconds):
+		key = HedgePolicy._getKey(url)
+		with self._lock:
+			latencies = self._latencies.get(key)
+			if latencies is None:
+				latencies = deque(maxlen=self.window)
+				self._latencies[key] = latencies
+			latencies.append(seconds)
+
+	def _startCall(self):
+		with self._lock:
+			self.requests += 1
+
+	def _takeBudget(self):
+		with self._lock:
+			if self.hedges + 1 > self.maxHedgeRatio * self.requests:
+				return False
+			self.hedges += 1
+			return True
+
+	def _returnBudget(self):
+		with self._lock:
+			self.hedges -= 1
+
+	def send(self, fn, url, hedgeFn=None):
+		"""Runs fn(), which sends the call and returns the response, hedging it if it is slow.  hedgeFn()
+			sends the second call, or returns None if it may not be sent now.  Defaults to fn.
+		"""
+		self._startCall()
+		delay = self.getDelay(url)
+		if delay is None:
+			start = time.monotonic()
+			response = fn()
+			self.recordLatency(url, time.monotonic() - start)
+			return response
+
+		race = _Race(self)
+		race.start("primary", fn, url)
+		# The delay runs from the moment the call is sent: it was let through before send() was called.
+		race.wait(delay)
+		if race.winner is None and race.running > 0 and self._takeBudget():
+			race.start("hedge", hedgeFn or fn, url)
+		race.wait()
+		if race.winner is None:
+			raise race.failures[0]
+		name, response = race.winner
+		if name == "hedge":
+			with self._lock:
+				self.hedgeWins += 1
+		return response
+
+	async def _sendTimed(self, fn, url):
+		start = time.monotonic()
+		try:
+			response = await fn()
+		except asyncio.CancelledError:
+			# A cancelled loser took at least this long.
+			self.recordLatency(url, time.monotonic() - start)
+			raise
+		if response is not None:
+			self.recordLatency(url, time.monotonic() - start)
+		return response
+
+	async def sendAsync(self, fn, url, hedgeFn=None):
+		"""Same as send(), but fn and hedgeFn are coroutine functions and the losing call is cancelled."""
+		self._startCall()
+		delay = self.getDelay(url)
+		if delay is None:
+			return await self._sendTimed(fn, url)
+
+		primary = asyncio.ensure_future(self._sendTimed(fn, url))
+		done, pending = await asyncio.wait([primary], timeout=delay)
+		if len(done) == 0 and self._takeBudget():
+			hedge = asyncio.ensure_future(self._sendTimed(hedgeFn or fn, url))
+			tasks = [primary, hedge]
+			winner = None
+			while winner is None and len(tasks) > 0:
+				done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+				for task in done:
+					tasks.remove(task)
+					if task.exception() is not None:
+						continue
+					if task.result() is None:
+						self._returnBudget()
+					elif winner is None:
+						winner = task
+			for task in tasks:
+				task.cancel()
+			if winner is None:
+				winner = primary
+			if winner is hedge:
+				with self._lock:
+					self.hedgeWins += 1
+		else:
+			winner = primary
+
+		return await winner
@@ -0,0 +1,101 @@
+import threading
+import time
+from onevizion.util import Message, getEndpointTemplate
+
+class CallEvent(object):
+	"""What a hook function is given about a call when one of its events fires.
+
+	Attributes:
+		event: the CallHooks event that fired
+		call: the curl object, for anything not copied here
+		operation: name of the wrapper method making the call, such as "Trackor.read", or None
+		method: HTTP method
+		url: URL of the call
+		endpoint: endpoint template of the URL, such as "/api/v3/trackor_types/{type}/trackors"
+		attempt: number of the attempt, starting at 1
+		elapsed: seconds since the call started, waits and earlier attempts included
+		requestSize: size in bytes of the request body, None when it is not known yet
+		responseSize: size in bytes of the response body, None before a response
+		status: HTTP status code of the response, None before a response
+		timing: phases of the attempt (see curl.timing), None before a response
+		errors: errors of the attempt
+		exception: the exception that ended the attempt, if any
+		retryDelay: seconds before the next attempt, for OnRetry
+	"""
+
+	def __init__(self, event, call, retryDelay=None):
+		# Before a retry, call.request still holds the response of the previous attempt.
+		response = call.request if event != CallHooks.BeforeRequest else None
+		self.event = event
+		self.call = call
+		self.operation = call.operation
+		self.method = call.method
+		self.url = call.url
+		self.endpoint = getEndpointTemplate(call.url)
+		self.attempt = call.attempts
+		self.elapsed = time.monotonic() - call._startedAt
+		self.requestSize = call.getRequestSize()
+		self.responseSize = call.getResponseSize() if response is not None else None
+		self.status = response.status_code if response is not None else None
+		self.timing = dict(call.timing) if response is not None else None
+		self.errors = list(call.errors)
+		self.exception = call.exception
+		self.retryDelay = retryDelay
+
+
+class CallHooks(object):
+	"""Functions called by curl and AsyncCurl at each step of every call, to plug in tracing, profilers
+	or custom metrics.  Each function is given a CallEvent.  When no function is registered for an event
+	no CallEvent is built, so unused hooks cost nothing.  Exceptions raised by hook functions are printed
+	at Verbosity 1 and do not fail the call.
+
+		def onResponse(event):
+			print(event.operation, event.endpoint, event.status, event.timing)
+
+		onevizion.Config["CallHooks"].register(onevizion.CallHooks.AfterResponse, onResponse)
+
+	Events:
+		BeforeRequest: an attempt is about to be sent
+		AfterResponse: an attempt got a response, whatever its status
+		OnError: an attempt failed, with an exception or a status outside 2xx, or the call was refused
+			by the circuit breaker or its deadline
+		OnRetry: a failed attempt will be retried after retryDelay seconds
+	"""
+
+	BeforeRequest = "beforeRequest"
+	AfterResponse = "afterResponse"
+	OnError = "onError"
+	OnRetry = "onRetry"
+	Events = (BeforeRequest, AfterResponse, OnError, OnRetry)
+
+	def __init__(self):
+		self._functions = dict((event, ()) for event in CallHooks.Events)
+		self._lock = threading.Lock()
+
+	def register(self, event, function):
+		if event not in self._functions:
+			raise ValueError("Unknown hook event {Event}, use one of {Events}.".format(Event=event, Events=", ".join(CallHooks.Events)))
+		with self._lock:
+			self._functions[event] = self._functions[event] + (function,)
+
+	def unregister(self, event, function):
+		with self._lock:
+			self._functions[event] = tuple(f for f in self._functions[event] if f is not function)
+
+	def has(self, event):
+		return len(self._functions[event]) > 0
+
+	def emit(self, event, call, retryDelay=None):
+		functions = self._functions[event]
+		if len(functions) == 0:
+			return
+		callEvent = CallEvent(event, call, retryDelay)
+		for function in functions:
+			try:
+				function(callEvent)
+			except Exception as e:
+				Message("{Event} hook {Function} failed: {Error}".format(Event=event, Function=getattr(function, '__name__', function), Error=e),1)
+
+	def clear(self):
+		with self._lock:
+			self._functions = dict((event, ()) for event in CallHooks.Events)
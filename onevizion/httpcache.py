@@ -0,0 +1,309 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from onevizion.util import getCredentialKey
+from onevizion.scheduler import Priority, RequestPriority
+
+class HTTPCache(object):
+	"""Cache of GET responses on disk, shared by the runs of a module so data that did not change is not
+	downloaded again.  Responses are keyed by URL, request headers and credentials.
+
+	A response with an ETag or Last-Modified header is revalidated: the next identical call is sent with
+	If-None-Match / If-Modified-Since, and when the server answers 304 Not Modified the cached body is used.
+	A response without either is served from the cache, with no call at all, for ttl seconds after it was
+	stored and fetched again afterwards.  A Cache-Control max-age from the server takes the place of the
+	ttl, no-cache forces revalidation and no-store keeps the response out of the cache.
+
+	Caching is opt-in: a cache set in onevizion.Config or on a OneVizionClient only keeps the calls of the
+	wrapper operations it is given, and a call given the cache with curl(httpCache=...) is always kept.
+	Process status, import data and notification queue polls are never cached, and neither are CONTROL
+	or INTERACTIVE calls, see RequestPriority.
+
+	The cache holds at most maxSize bytes of files; the least recently used responses are removed first.
+	Several processes may share a directory.
+
+		onevizion.Config["HTTPCache"] = onevizion.HTTPCache("/var/cache/my_module", ttl=3600, operations=['WorkPlan.read'])
+
+	Attributes:
+		directory: folder the responses are stored in, created if needed
+		ttl: seconds a response without validators is served from the cache
+		maxSize: total bytes of the cache files
+		operations: names of the wrapper operations whose GET calls are cached, such as "Trackor.read"
+
+		hits: calls answered from the cache without being sent
+		revalidations: calls answered 304 Not Modified and served from the cache
+		misses: calls that had to download their response
+		evictions: responses removed to stay under maxSize
+	"""
+
+	Suffix = ".cache"
+	# Polled for changes, a cached answer would hide them.
+	NeverCached = frozenset(('Export.getProcessStatus', 'Import.getProcessData', 'NotifQueue.getNotifQueue'))
+
+	def __init__(self, directory, ttl=300, maxSize=256*1024*1024, operations=()):
+		self.directory = directory
+		self.ttl = ttl
+		self.maxSize = maxSize
+		self.operations = frozenset(operations)
+		self.hits = 0
+		self.revalidations = 0
+		self.misses = 0
+		self.evictions = 0
+		self._lock = threading.Lock()
+		self._entries = OrderedDict()
+		self._size = 0
+		os.makedirs(directory, exist_ok=True)
+		self._scan()
+
+	def _scan(self):
+		"""Indexes the responses already on disk, least recently used first."""
+		found = []
+		for fileName in os.listdir(self.directory):
+			if fileName.endswith(HTTPCache.Suffix):
+				try:
+					stat = os.stat(os.path.join(self.directory, fileName))
+				except OSError:
+					continue
+				found.append((stat.st_mtime, fileName[:-len(HTTPCache.Suffix)], stat.st_size))
+		with self._lock:
+			for mtime, key, size in sorted(found):
+				self._entries[key] = size
+				self._size += size
+		self._evict()
+
+	def _getPath(self, key):
+		return os.path.join(self.directory, key + HTTPCache.Suffix)
+
+	@staticmethod
+	def accepts(method, args):
+		return method.upper() == 'GET' and not args.get('stream')
+
+	def caches(self, operation, priority=None, given=False):
+		"""Returns True if the calls of an operation are cached: those of the operations listed, or any call
+			the cache was given to directly, but never the polls in NeverCached nor CONTROL or INTERACTIVE calls.
+		"""
+		if operation in HTTPCache.NeverCached:
+			return False
+		if (priority or Priority.current()) in (RequestPriority.CONTROL, RequestPriority.INTERACTIVE):
+			return False
+		return given or operation in self.operations
+
+	@staticmethod
+	def getKey(url, args):
+		URL = requests.Request('GET', url, params=args.get('params')).prepare().url
+		identity = "{URL}\n{Headers}\n{Credentials}".format(
+			URL=URL,
+			Headers=repr(sorted((args.get('headers') or {}).items())),
+			Credentials=getCredentialKey(args.get('auth'))
+			)
+		return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+	def _read(self, key):
+		if not os.path.exists(self._getPath(key)):
+			return None, None
+		try:
+			with open(self._getPath(key), 'rb') as f:
+				header = f.readline()
+				body = f.read()
+			meta = json.loads(header.decode('utf-8'))
+		except (OSError, ValueError):
+			self._forget(key)
+			return None, None
+		with self._lock:
+			# It may have been stored by another process sharing the directory.
+			if key not in self._entries:
+				self._entries[key] = len(header) + len(body)
+				self._size += len(header) + len(body)
+		return meta, body
+
+	def _write(self, key, meta, body):
+		header = json.dumps(meta).encode('utf-8') + b"\n"
+		fd, tmpName = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+		try:
+			with os.fdopen(fd, 'wb') as f:
+				f.write(header)
+				f.write(body)
+			os.replace(tmpName, self._getPath(key))
+		except OSError:
+			if os.path.exists(tmpName):
+				os.remove(tmpName)
+			return
+		with self._lock:
+			self._size -= self._entries.pop(key, 0)
+			self._entries[key] = len(header) + len(body)
+			self._size += len(header) + len(body)
+		self._evict()
+
+	def _touch(self, key):
+		with self._lock:
+			if key in self._entries:
+				self._entries.move_to_end(key)
+		try:
+			os.utime(self._getPath(key))
+		except OSError:
+			pass
+
+	def _forget(self, key):
+		with self._lock:
+			self._size -= self._entries.pop(key, 0)
+		try:
+			os.remove(self._getPath(key))
+		except OSError:
+			pass
+
+	def _evict(self):
+		while True:
+			with self._lock:
+				if self._size <= self.maxSize or len(self._entries) == 0:
+					return
+				key, size = self._entries.popitem(last=False)
+				self._size -= size
+				self.evictions += 1
+			try:
+				os.remove(self._getPath(key))
+			except OSError:
+				pass
+
+	@staticmethod
+	def _getCacheControl(headers):
+		directives = {}
+		for part in (headers.get('Cache-Control') or '').split(','):
+			name, _, value = part.strip().partition('=')
+			if name:
+				directives[name.lower()] = value.strip('"')
+		return directives
+
+	def _isFresh(self, meta):
+		age = time.time() - meta["storedAt"]
+		if meta.get("noCache"):
+			return False
+		if meta.get("maxAge") is not None:
+			return age < meta["maxAge"]
+		if meta.get("etag") or meta.get("lastModified"):
+			return False
+		return age < self.ttl
+
+	@staticmethod
+	def _getResponse(meta, body, timing=(0.0, 0.0, 0.0)):
+		response = requests.models.Response()
+		response.status_code = meta["status"]
+		response.reason = meta["reason"]
+		response.headers = CaseInsensitiveDict(meta["headers"])
+		response.url = meta["url"]
+		response.encoding = get_encoding_from_headers(response.headers)
+		response._content = body
+		response.elapsed = timedelta(seconds=timing[0] + timing[1])
+		response._onevizionTiming = timing
+		response._onevizionCached = True
+		return response
+
+	def getFresh(self, method, url, args):
+		"""Returns the cached response of a call if it can be used without asking the server, else None."""
+		if not HTTPCache.accepts(method, args):
+			return None
+		key = HTTPCache.getKey(url, args)
+		meta, body = self._read(key)
+		if meta is None or not self._isFresh(meta):
+			return None
+		self._touch(key)
+		with self._lock:
+			self.hits += 1
+		return HTTPCache._getResponse(meta, body)
+
+	def send(self, send, method, url, args):
+		"""Sends a call of curl, conditionally if a cached response can be revalidated, and stores its
+			response.  send(args) sends the call with the given requests arguments and returns the response.
+		"""
+		if not HTTPCache.accepts(method, args):
+			return send(args)
+		key, meta, body, args = self._begin(url, args)
+		return self._end(key, meta, body, send(args))
+
+	async def sendAsync(self, send, method, url, args):
+		"""Same as send, for AsyncCurl.  send(args) is a coroutine."""
+		if not HTTPCache.accepts(method, args):
+			return await send(args)
+		key, meta, body, args = self._begin(url, args)
+		return self._end(key, meta, body, await send(args))
+
+	def _begin(self, url, args):
+		"""Returns the key and cached response of a call, and its arguments with the conditional headers."""
+		key = HTTPCache.getKey(url, args)
+		meta, body = self._read(key)
+		conditions = {}
+		if meta is not None:
+			if meta.get("etag"):
+				conditions['If-None-Match'] = meta["etag"]
+			if meta.get("lastModified"):
+				conditions['If-Modified-Since'] = meta["lastModified"]
+		if len(conditions) > 0:
+			args = dict(args)
+			args['headers'] = dict(args.get('headers') or {}, **conditions)
+		return key, meta, body, args
+
+	def _end(self, key, meta, body, response):
+		if response.status_code == 304 and meta is not None:
+			meta["storedAt"] = time.time()
+			self._setFreshness(meta, response.headers)
+			self._write(key, meta, body)
+			with self._lock:
+				self.revalidations += 1
+			return HTTPCache._getResponse(meta, body, getattr(response, '_onevizionTiming', (0.0, 0.0, 0.0)))
+
+		with self._lock:
+			self.misses += 1
+		if response.status_code == 200:
+			self._store(key, response)
+		return response
+
+	def _setFreshness(self, meta, headers):
+		directives = HTTPCache._getCacheControl(headers)
+		meta["noCache"] = 'no-cache' in directives
+		meta["maxAge"] = int(directives['max-age']) if re.fullmatch(r'\d+', directives.get('max-age', '')) else None
+		if headers.get('ETag'):
+			meta["etag"] = headers['ETag']
+		if headers.get('Last-Modified'):
+			meta["lastModified"] = headers['Last-Modified']
+
+	def _store(self, key, response):
+		if 'no-store' in HTTPCache._getCacheControl(response.headers):
+			self._forget(key)
+			return
+		body = response.content
+		if len(body) > self.maxSize:
+			return
+		meta = {
+			"url": response.url,
+			"status": response.status_code,
+			"reason": response.reason,
+			"headers": {name: value for name, value in response.headers.items() if name.lower() != 'set-cookie'},
+			"storedAt": time.time()
+			}
+		self._setFreshness(meta, response.headers)
+		self._write(key, meta, body)
+
+	def clear(self):
+		with self._lock:
+			keys = list(self._entries)
+		for key in keys:
+			self._forget(key)
+
+	def getStats(self):
+		with self._lock:
+			return {
+				"entries": len(self._entries),
+				"size": self._size,
+				"hits": self.hits,
+				"revalidations": self.revalidations,
+				"misses": self.misses,
+				"evictions": self.evictions
+				}
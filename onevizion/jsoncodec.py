@@ -0,0 +1,49 @@
+import json
+import onevizion
+
+class JSONCodec(object):
+	"""A pair of functions used to decode API responses and encode request bodies.
+
+	Attributes:
+		name: name of the codec, for messages
+		loads: function that takes bytes (or str) and returns the decoded object
+		dumps: function that takes an object and returns the JSON text as str or bytes
+	"""
+
+	def __init__(self, name, loads, dumps):
+		self.name = name
+		self.loads = loads
+		self.dumps = dumps
+
+	def __repr__(self):
+		return "JSONCodec({Name})".format(Name=self.name)
+
+
+StdlibCodec = JSONCodec("json", json.loads, json.dumps)
+
+try:
+	import orjson
+except ImportError:
+	OrjsonCodec = None
+else:
+	OrjsonCodec = JSONCodec("orjson", orjson.loads, lambda obj: orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS))
+
+try:
+	import ujson
+except ImportError:
+	UjsonCodec = None
+else:
+	UjsonCodec = JSONCodec("ujson", ujson.loads, ujson.dumps)
+
+
+def findCodec():
+	"""Returns the fastest installed codec: orjson, then ujson, then the standard json module.
+		Used by default to decode responses only, as their encoders do not write request bodies exactly like json.dumps.
+	"""
+	return OrjsonCodec or UjsonCodec or StdlibCodec
+
+def loadsJSON(data):
+	return onevizion.Config["JSONCodec"].loads(data)
+
+def dumpsJSON(obj):
+	return onevizion.Config["JSONEncoder"].dumps(obj)
@@ -0,0 +1,179 @@
+import json
+import threading
+from onevizion.pool import SessionPool, DefaultPool
+from onevizion.util import getEndpointTemplate
+
+class _Series(object):
+
+	def __init__(self, bucketCount):
+		self.statuses = {}
+		self.buckets = [0] * bucketCount
+		self.count = 0
+		self.sum = 0.0
+		self.bytesOut = 0
+		self.bytesIn = 0
+		self.retries = 0
+
+
+class MetricsRegistry(object):
+	"""Aggregates every API call made through curl: calls and errors by status, a latency histogram and
+	the bytes sent and received, per host, operation (such as "Trackor.read"), method and endpoint
+	template (such as "/api/v3/trackor_types/{type}/trackors").  Calls that shared the result of an
+	identical call in flight are only counted in "coalesced".  Dump it as Prometheus text or JSON:
+
+		onevizion.Config["Metrics"].save("metrics.prom")
+		onevizion.Config["Metrics"].push("http://pushgateway:9091", job="my_module")
+
+	Attributes:
+		buckets: upper bounds in seconds of the latency histogram buckets
+
+		coalesced: number of calls answered by an identical call already in flight
+	"""
+
+	DefaultBuckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+	def __init__(self, buckets=DefaultBuckets):
+		self.buckets = tuple(sorted(buckets))
+		self.coalesced = 0
+		self._series = {}
+		self._lock = threading.Lock()
+
+	def record(self, method, url, status, seconds, bytesOut=0, bytesIn=0, operation=None, retries=0):
+		"""Adds one call.  status is the HTTP status code, or the name of the exception that ended the call."""
+		key = (SessionPool.hostKey(url), operation or "", method.upper(), getEndpointTemplate(url))
+		status = str(status)
+		with self._lock:
+			series = self._series.get(key)
+			if series is None:
+				series = _Series(len(self.buckets))
+				self._series[key] = series
+			series.statuses[status] = series.statuses.get(status, 0) + 1
+			for i in range(len(self.buckets)):
+				if seconds <= self.buckets[i]:
+					series.buckets[i] += 1
+					break
+			series.count += 1
+			series.sum += seconds
+			series.bytesOut += bytesOut
+			series.bytesIn += bytesIn
+			series.retries += retries
+
+	def recordCall(self, call):
+		"""Adds a finished curl call."""
+		if call.coalesced:
+			with self._lock:
+				self.coalesced += 1
+			return
+		response = call.request
+		if call.exception is not None or response is None:
+			status = type(call.exception).__name__ if call.exception is not None else "None"
+			bytesOut = 0
+			bytesIn = 0
+		else:
+			status = response.status_code
+			bytesOut = call.getRequestSize() or 0
+			bytesIn = call.getResponseSize()
+		self.record(call.method, call.url, status, call.duration, bytesOut, bytesIn, call.operation, max(0, call.attempts - 1))
+
+	@staticmethod
+	def isError(status):
+		return not (status.isdigit() and 200 <= int(status) < 300)
+
+	def getStats(self):
+		"""Returns the metrics as a list of plain dicts, one per host, operation, method and endpoint."""
+		stats = []
+		with self._lock:
+			for key, series in self._series.items():
+				cumulative = 0
+				buckets = {}
+				for bound, count in zip(self.buckets, series.buckets):
+					cumulative += count
+					buckets[str(bound)] = cumulative
+				buckets["+Inf"] = series.count
+				stats.append({
+					"host": key[0],
+					"operation": key[1],
+					"method": key[2],
+					"endpoint": key[3],
+					"requests": series.count,
+					"statuses": dict(series.statuses),
+					"errors": dict((status, count) for status, count in series.statuses.items() if MetricsRegistry.isError(status)),
+					"retries": series.retries,
+					"latencyBuckets": buckets,
+					"latencySum": series.sum,
+					"bytesOut": series.bytesOut,
+					"bytesIn": series.bytesIn
+					})
+			coalesced = self.coalesced
+		return {"series": stats, "coalesced": coalesced}
+
+	def getJSON(self, indent=None):
+		return json.dumps(self.getStats(), indent=indent)
+
+	@staticmethod
+	def _labels(series, **extra):
+		labels = [("host", series["host"]), ("operation", series["operation"]), ("method", series["method"]), ("endpoint", series["endpoint"])]
+		labels.extend(sorted(extra.items()))
+		return "{" + ",".join(
+			'{Name}="{Value}"'.format(Name=name, Value=str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+			for name, value in labels
+			) + "}"
+
+	def getPrometheusText(self):
+		"""Returns the metrics in the Prometheus text exposition format."""
+		stats = self.getStats()
+		lines = []
+
+		def family(name, kind, helpText):
+			lines.append("# HELP {Name} {Help}".format(Name=name, Help=helpText))
+			lines.append("# TYPE {Name} {Kind}".format(Name=name, Kind=kind))
+
+		family("onevizion_requests_total", "counter", "API calls by final status code or exception.")
+		for series in stats["series"]:
+			for status, count in series["statuses"].items():
+				lines.append("onevizion_requests_total{Labels} {Value}".format(Labels=MetricsRegistry._labels(series, status=status), Value=count))
+		family("onevizion_request_errors_total", "counter", "API calls that failed, by status code or exception.")
+		for series in stats["series"]:
+			for status, count in series["errors"].items():
+				lines.append("onevizion_request_errors_total{Labels} {Value}".format(Labels=MetricsRegistry._labels(series, status=status), Value=count))
+		family("onevizion_request_retries_total", "counter", "Attempts made beyond the first one.")
+		for series in stats["series"]:
+			lines.append("onevizion_request_retries_total{Labels} {Value}".format(Labels=MetricsRegistry._labels(series), Value=series["retries"]))
+		family("onevizion_request_duration_seconds", "histogram", "Duration of API calls, retries included.")
+		for series in stats["series"]:
+			for bound, count in series["latencyBuckets"].items():
+				lines.append("onevizion_request_duration_seconds_bucket{Labels} {Value}".format(Labels=MetricsRegistry._labels(series, le=bound), Value=count))
+			lines.append("onevizion_request_duration_seconds_sum{Labels} {Value}".format(Labels=MetricsRegistry._labels(series), Value=series["latencySum"]))
+			lines.append("onevizion_request_duration_seconds_count{Labels} {Value}".format(Labels=MetricsRegistry._labels(series), Value=series["requests"]))
+		family("onevizion_request_bytes_total", "counter", "Request body bytes sent.")
+		for series in stats["series"]:
+			lines.append("onevizion_request_bytes_total{Labels} {Value}".format(Labels=MetricsRegistry._labels(series), Value=series["bytesOut"]))
+		family("onevizion_response_bytes_total", "counter", "Response body bytes received.")
+		for series in stats["series"]:
+			lines.append("onevizion_response_bytes_total{Labels} {Value}".format(Labels=MetricsRegistry._labels(series), Value=series["bytesIn"]))
+		family("onevizion_requests_coalesced_total", "counter", "Calls answered by an identical call already in flight.")
+		lines.append("onevizion_requests_coalesced_total {Value}".format(Value=stats["coalesced"]))
+		return "\n".join(lines) + "\n"
+
+	def save(self, fileName, format="prometheus"):
+		"""Writes the metrics to a file, as "prometheus" text or "json"."""
+		text = self.getJSON(indent=2) if format == "json" else self.getPrometheusText()
+		with open(fileName, 'w') as f:
+			f.write(text)
+
+	def push(self, url, job="onevizion", instance=None):
+		"""Sends the metrics to a Prometheus Pushgateway and returns its response."""
+		pushUrl = "{URL}/metrics/job/{Job}".format(URL=url.rstrip('/'), Job=job)
+		if instance is not None:
+			pushUrl += "/instance/{Instance}".format(Instance=instance)
+		return DefaultPool.getSession(pushUrl).put(
+			pushUrl,
+			data=self.getPrometheusText().encode('utf-8'),
+			headers={'Content-Type': 'text/plain; version=0.0.4'},
+			timeout=30
+			)
+
+	def reset(self):
+		with self._lock:
+			self._series = {}
+			self.coalesced = 0
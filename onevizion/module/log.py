@@ -4,6 +4,8 @@ import json
 from warnings import warn
 from onevizion.util import *
 from onevizion.curl import curl
+from onevizion.scheduler import RequestPriority
+from onevizion.jsoncodec import dumpsJSON
 from onevizion.module.loglevel import LogLevel
 from onevizion.httpbearer import HTTPBearerAuth
 import onevizion
@@ -18,15 +20,17 @@ class ModuleLog(object):
 		userName: the username or the OneVizion API Security Token Access Key that is used to login to the system
 		password: the password or the OneVizion API Security Token Secret Key that is used to gain access to the system
 		logLevel: log level name (Info, Warning, Error, Debug) for logging module actions
+		client: OneVizionClient whose login, pool and call settings are used, see OneVizionClient.moduleLog
 
 	Exception can be thrown for method 'add'
 	"""
 
-	def __init__(self, processId, URL="", userName="", password="", paramToken=None, isTokenAuth=False, logLevelName="Error"):
+	def __init__(self, processId, URL="", userName="", password="", paramToken=None, isTokenAuth=False, logLevelName="Error", client=None):
 		self._URL = URL
 		self._userName = userName
 		self._password = password
 		self._processId = processId
+		self._client = client
 
 		if paramToken is not None:
 			if self._URL == "":
@@ -36,9 +40,20 @@ class ModuleLog(object):
 			if self._password == "":
 				self._password = onevizion.Config["ParameterData"][paramToken]['Password']
 
+		if client is not None:
+			# The login of the client, unless this wrapper was given its own.
+			if not self._URL:
+				self._URL = client.URL
+			if not self._userName:
+				self._userName = client.userName
+			if not self._password:
+				self._password = client.password
+
 		self._URL = getUrlContainingScheme(self._URL)
 
-		if isTokenAuth:
+		if client is not None:
+			self._auth = client.auth
+		elif isTokenAuth:
 			self._auth = HTTPBearerAuth(self._userName, self._password)
 		else:
 			self._auth = requests.auth.HTTPBasicAuth(self._userName, self._password)
@@ -49,10 +64,10 @@ class ModuleLog(object):
 	def add(self, logLevel, message, description=""):
 		if logLevel.logLevelId <= self._ovLogLevel.logLevelId:
 			parameters = {'message': message, 'description': description, 'log_level_name': logLevel.logLevelName}
-			jsonData = json.dumps(parameters)
+			jsonData = dumpsJSON(parameters)
 			headers = {'content-type': 'application/json'}
 			url_log = "{URL}/api/v3/modules/runs/{ProcessID}/logs".format(URL=self._URL, ProcessID=self._processId)
-			OVCall = curl('POST', url_log, data=jsonData, headers=headers, auth=self._auth)
+			OVCall = curl('POST', url_log, data=jsonData, headers=headers, auth=self._auth, priority=RequestPriority.CONTROL, client=self._client, operation='ModuleLog.add')
 			if len(OVCall.errors) > 0:
 				raise Exception(OVCall.errors)
 			return OVCall.jsonData
@@ -66,11 +81,11 @@ class IntegrationLog(object):
 	This class is deprecated. Use ModuleLog instead.
 	"""
 
-	def __init__(self, processId, URL="", userName="", password="", paramToken=None, isTokenAuth=False, logLevelName="Error"):
+	def __init__(self, processId, URL="", userName="", password="", paramToken=None, isTokenAuth=False, logLevelName="Error", client=None):
 		"""This throws a deprecation warning on initialization."""
 		warn(f'{self.__class__.__name__} is deprecated. Use ModuleLog instead.', DeprecationWarning, stacklevel=2)
 
-		self._module_log = ModuleLog(processId, URL, userName, password, paramToken, isTokenAuth, logLevelName)
+		self._module_log = ModuleLog(processId, URL, userName, password, paramToken, isTokenAuth, logLevelName, client)
  
 
 	def add(self, logLevel, message, description=""):
@@ -1,6 +1,7 @@
 import requests
 from onevizion.util import *
 from onevizion.curl import curl
+from onevizion.scheduler import RequestPriority
 from onevizion.httpbearer import HTTPBearerAuth
 from onevizion.notif.queuerecord import NotifQueueRecord
 from onevizion.notif.queuestatus import NotifQueueStatus
@@ -15,6 +16,7 @@ class NotifQueue:
 		URL: a string representing the website's main URL for instance "trackor.onevizion.com".
 		userName: the username or the OneVizion API Security Token Access Key that is used to login to the system
 		password: the password or the OneVizion API Security Token Secret Key that is used to gain access to the system
+		client: OneVizionClient whose login, pool and call settings are used, see OneVizionClient.notifQueue
 
 	Exception can be thrown for methods:
 		getNotifQueue,
@@ -22,12 +24,13 @@ class NotifQueue:
 		addNewAttempt
 	"""
 
-	def __init__(self, serviceId, URL="", userName="", password="", paramToken=None, isTokenAuth=False):
+	def __init__(self, serviceId, URL="", userName="", password="", paramToken=None, isTokenAuth=False, client=None):
 		self._serviceId = serviceId
 		self._URL = URL
 		self._userName = userName
 		self._password = password
 		self._headers = {'content-type': 'application/json'}
+		self._client = client
 
 		if paramToken is not None:
 			if self._URL == "":
@@ -37,9 +40,20 @@ class NotifQueue:
 			if self._password == "":
 				self._password = onevizion.Config["ParameterData"][paramToken]['Password']
 
+		if client is not None:
+			# The login of the client, unless this wrapper was given its own.
+			if not self._URL:
+				self._URL = client.URL
+			if not self._userName:
+				self._userName = client.userName
+			if not self._password:
+				self._password = client.password
+
 		self._URL = getUrlContainingScheme(self._URL)
 
-		if isTokenAuth:
+		if client is not None:
+			self._auth = client.auth
+		elif isTokenAuth:
 			self._auth = HTTPBearerAuth(self._userName, self._password)
 		else:
 			self._auth = requests.auth.HTTPBasicAuth(self._userName, self._password)
@@ -47,20 +61,20 @@ class NotifQueue:
 
 	def getNotifQueue(self):
 		URL = "{URL}/api/internal/notif/queue?service_id={ServiceID}".format(URL=self._URL, ServiceID=self._serviceId)
-		OVCall = curl('GET', URL, headers=self._headers, auth=self._auth)
+		OVCall = curl('GET', URL, headers=self._headers, auth=self._auth, priority=RequestPriority.INTERACTIVE, client=self._client, operation='NotifQueue.getNotifQueue')
 		if len(OVCall.errors) > 0:
 			raise Exception(OVCall.errors)
 		return OVCall.jsonData
 
 	def updateNotifQueueRecStatusById(self, notifQueueRecId, status):
 		URL = "{URL}/api/internal/notif/queue/{notifQueueRecId}/update_status?status={status}".format(URL=self._URL, notifQueueRecId=notifQueueRecId, status=status)
-		OVCall = curl('PATCH', URL, headers=self._headers, auth=self._auth)
+		OVCall = curl('PATCH', URL, headers=self._headers, auth=self._auth, priority=RequestPriority.CONTROL, client=self._client, operation='NotifQueue.updateNotifQueueRecStatusById')
 		if len(OVCall.errors) > 0:
 			raise Exception(OVCall.errors)
 
 	def addNewAttempt(self, notifQueueRecId, errorMessage):
 		URL = "{URL}/api/internal/notif/queue/{notifQueueRecId}/attempts?error_code={errorMessage}".format(URL=self._URL, notifQueueRecId=notifQueueRecId, errorMessage=errorMessage)
-		OVCall = curl('POST', URL, headers=self._headers, auth=self._auth)
+		OVCall = curl('POST', URL, headers=self._headers, auth=self._auth, priority=RequestPriority.CONTROL, client=self._client, operation='NotifQueue.addNewAttempt')
 		if len(OVCall.errors) > 0:
 			raise Exception(OVCall.errors)
 
@@ -21,19 +21,20 @@ class NotificationService(ABC):
 		logLevel: log level name (Info, Warning, Error, Debug) for logging Module actions
 		maxAttempts: the number of attempts to send message 
 		nextAttemptDelay: the delay in seconds before the next message sending after an unsuccessful attempt
+		client: OneVizionClient shared by the queue and the log, see OneVizionClient.notificationService
 
 	Exceptions are processed, written to the log and an exception is thrown for methods:
 		_convertNotifQueueJsonToList,
 		_prepareNotifQueue
 	"""
 
-	def __init__(self, serviceId, processId, URL="", userName="", password="", paramToken=None, isTokenAuth=False, logLevel="", maxAttempts=1, nextAttemptDelay=30):
-		self._notifQueue = NotifQueue(serviceId, URL, userName, password, paramToken, isTokenAuth)
+	def __init__(self, serviceId, processId, URL="", userName="", password="", paramToken=None, isTokenAuth=False, logLevel="", maxAttempts=1, nextAttemptDelay=30, client=None):
+		self._notifQueue = NotifQueue(serviceId, URL, userName, password, paramToken, isTokenAuth, client)
 		self._maxAttempts = maxAttempts or 1
 		self._nextAttemptDelay = nextAttemptDelay or 30
-		self._moduleLog = ModuleLog(processId, URL, userName, password, paramToken, isTokenAuth, logLevel)
+		self._moduleLog = ModuleLog(processId, URL, userName, password, paramToken, isTokenAuth, logLevel, client)
 		#_integrationLog is deprecated. Use _moduleLog instead.
-		self._integrationLog = IntegrationLog(processId, URL, userName, password, paramToken, isTokenAuth, logLevel)
+		self._integrationLog = IntegrationLog(processId, URL, userName, password, paramToken, isTokenAuth, logLevel, client)
 
 	def __getattribute__(self, item):
 		if '_integrationLog' == item:
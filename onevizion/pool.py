@@ -0,0 +1,110 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+import onevizion
+
+_connectTime = threading.local()
+
+def resetConnectTime():
+	"""Starts measuring the time the calling thread spends opening connections (DNS, TCP and TLS)."""
+	_connectTime.seconds = 0.0
+
+def getConnectTime():
+	"""Returns the seconds the calling thread spent opening connections since resetConnectTime()."""
+	return getattr(_connectTime, "seconds", 0.0)
+
+
+class _TimedHTTPConnection(HTTPConnection):
+
+	def connect(self):
+		start = time.perf_counter()
+		try:
+			HTTPConnection.connect(self)
+		finally:
+			_connectTime.seconds = getConnectTime() + time.perf_counter() - start
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+
+	def connect(self):
+		start = time.perf_counter()
+		try:
+			HTTPSConnection.connect(self)
+		finally:
+			_connectTime.seconds = getConnectTime() + time.perf_counter() - start
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+	ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+	ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+	"""HTTPAdapter whose connections record how long they took to open, see getConnectTime()."""
+
+	def init_poolmanager(self, *args, **kwargs):
+		HTTPAdapter.init_poolmanager(self, *args, **kwargs)
+		self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool, "https": _TimedHTTPSConnectionPool}
+
+
+class SessionPool(object):
+	"""Keeps one requests.Session per host so that API calls reuse keep-alive connections instead of
+	opening a new TCP+TLS connection for every request.  Sessions are created on first use and are safe
+	to share between threads.  Cookies are never stored, so calls made with different credentials
+	against the same host stay independent, just like one-shot requests.request() calls.
+
+	Attributes:
+		poolSize: maximum number of connections kept open per host.  Defaults to onevizion.Config["PoolSize"]
+	"""
+
+	def __init__(self, poolSize=None):
+		self.poolSize = poolSize
+		self._sessions = {}
+		self._lock = threading.Lock()
+
+	@staticmethod
+	def hostKey(url):
+		parts = urlsplit(url)
+		return "{Scheme}://{Host}".format(Scheme=parts.scheme.lower(), Host=parts.netloc.lower())
+
+	def getSession(self, url):
+		key = SessionPool.hostKey(url)
+		session = self._sessions.get(key)
+		if session is None:
+			with self._lock:
+				session = self._sessions.get(key)
+				if session is None:
+					session = self._newSession()
+					self._sessions[key] = session
+		return session
+
+	def _newSession(self):
+		poolSize = self.poolSize or onevizion.Config["PoolSize"]
+		session = requests.Session()
+		session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+		adapter = _TimedAdapter(pool_connections=1, pool_maxsize=poolSize)
+		session.mount("https://", adapter)
+		session.mount("http://", adapter)
+		return session
+
+	def hosts(self):
+		return list(self._sessions.keys())
+
+	def close(self):
+		with self._lock:
+			sessions = list(self._sessions.values())
+			self._sessions = {}
+		for session in sessions:
+			session.close()
+
+
+# Shared by every curl call that is not given its own pool.
+DefaultPool = SessionPool()
@@ -0,0 +1,122 @@
+import threading
+import time
+from onevizion.pool import SessionPool
+from onevizion.util import getCredentialKey
+
+class TokenBucket(object):
+	"""Token bucket that refills "rate" tokens per second up to "capacity".  reserve() always takes a token
+	and returns how long the caller has to wait for it, so callers sleep outside the lock, with time.sleep
+	or asyncio.sleep, and waiting callers are served in the order they reserved.
+	"""
+
+	def __init__(self, rate, capacity=None):
+		self.rate = float(rate)
+		self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+		self.tokens = self.capacity
+		self.updated = time.monotonic()
+		self.requests = 0
+		self.waits = 0
+		self.waitTime = 0.0
+		self._lock = threading.Lock()
+
+	def reserve(self):
+		with self._lock:
+			now = time.monotonic()
+			self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+			self.updated = now
+			self.tokens -= 1
+			self.requests += 1
+			if self.tokens >= 0:
+				return 0.0
+			delay = -self.tokens / self.rate
+			self.waits += 1
+			self.waitTime += delay
+			return delay
+
+	def tryReserve(self):
+		"""Takes a token only if one is available now.  Returns True if it did."""
+		with self._lock:
+			now = time.monotonic()
+			self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+			self.updated = now
+			if self.tokens < 1:
+				return False
+			self.tokens -= 1
+			self.requests += 1
+			return True
+
+
+class RateLimiter(object):
+	"""Process-wide token bucket rate limiter that curl consults before every attempt.  There is one pair
+	of buckets per host and credential, one for read methods (GET, HEAD, OPTIONS) and one for write methods,
+	so a bulk update loop does not use up the quota of reads and the other way around.
+
+	Attributes:
+		readRate: read requests per second allowed per host and credential.  None means unlimited
+		writeRate: write requests per second allowed per host and credential.  None means unlimited
+		readBurst: how many read requests may be sent at once after an idle period.  Defaults to readRate
+		writeBurst: how many write requests may be sent at once after an idle period.  Defaults to writeRate
+
+		waits: number of requests that had to wait
+		waitTime: total seconds requests were held back
+	"""
+
+	ReadMethods = ('GET', 'HEAD', 'OPTIONS')
+
+	def __init__(self, readRate=None, writeRate=None, readBurst=None, writeBurst=None):
+		self.readRate = readRate
+		self.writeRate = writeRate
+		self.readBurst = readBurst
+		self.writeBurst = writeBurst
+		self._buckets = {}
+		self._lock = threading.Lock()
+
+	def getBucket(self, url, auth, method):
+		"""Returns the TokenBucket the call belongs to, or None if that kind of call is not limited."""
+		isRead = method.upper() in RateLimiter.ReadMethods
+		rate = self.readRate if isRead else self.writeRate
+		if rate is None:
+			return None
+		key = (SessionPool.hostKey(url), getCredentialKey(auth), 'read' if isRead else 'write')
+		bucket = self._buckets.get(key)
+		if bucket is None:
+			with self._lock:
+				bucket = self._buckets.get(key)
+				if bucket is None:
+					bucket = TokenBucket(rate, self.readBurst if isRead else self.writeBurst)
+					self._buckets[key] = bucket
+		return bucket
+
+	def reserve(self, url, auth, method):
+		"""Takes a token for the call and returns the number of seconds to wait before sending it."""
+		bucket = self.getBucket(url, auth, method)
+		if bucket is None:
+			return 0.0
+		return bucket.reserve()
+
+	def tryReserve(self, url, auth, method):
+		"""Takes a token for the call only if it can be sent now without waiting.  Returns True if it can."""
+		bucket = self.getBucket(url, auth, method)
+		if bucket is None:
+			return True
+		return bucket.tryReserve()
+
+	@property
+	def waits(self):
+		return sum(bucket.waits for bucket in list(self._buckets.values()))
+
+	@property
+	def waitTime(self):
+		return sum(bucket.waitTime for bucket in list(self._buckets.values()))
+
+	def getStats(self):
+		"""Returns the request and wait counters of every bucket, keyed by "host credential read|write"."""
+		stats = {}
+		for (host, credential, kind), bucket in list(self._buckets.items()):
+			# Calls made without auth have no credential key.
+			stats[" ".join((host, credential or "anonymous", kind))] = {
+				"requests": bucket.requests,
+				"waits": bucket.waits,
+				"waitTime": bucket.waitTime
+				}
+		return stats
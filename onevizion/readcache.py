@@ -0,0 +1,149 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from onevizion.util import getCredentialKey
+from onevizion.curl import curl
+
+class TrackorReadCache(object):
+	"""In-memory cache of Trackor.read results, for long running modules that read the same records again
+		and again between their updates.  Reads are keyed by trackor type, URL, search body and credentials,
+		the least recently used ones are dropped beyond maxEntries, and each is served for the ttl of its
+		trackor type.
+
+		client = onevizion.OneVizionClient(paramToken=paramToken, readCache=onevizion.TrackorReadCache(ttl=300, ttlByType={'Site': 30}))
+
+		Trackor.update, create, delete and the file uploads of a Trackor drop the cached reads of its trackor
+		type once they complete, so a module never reads back stale data after its own writes.  Only writes
+		made through the wrappers sharing the cache are seen: a cache given to a OneVizionClient is invalidated
+		by the wrappers of that client, onevizion.Config["TrackorReadCache"] by the wrappers without a client.
+		Reads of a Trackor with no trackorType are dropped by every write, and its writes drop every read.
+
+		A read served from the cache has "fromCache" True and shares the parsed jsonData of the original
+		call, which must not be modified.  Failed reads are not cached.
+
+	Attributes:
+		maxEntries: reads kept at most
+		ttl: seconds a read is served from the cache.  0 keeps reads out of the cache
+		ttlByType: dict of the ttl of some trackor types, taking the place of ttl for them
+
+		hits: reads served from the cache
+		misses: reads sent to the server
+		invalidations: reads dropped by writes
+	"""
+
+	def __init__(self, maxEntries=1024, ttl=60, ttlByType=None):
+		self.maxEntries = maxEntries
+		self.ttl = ttl
+		self.ttlByType = dict(ttlByType or {})
+		self.hits = 0
+		self.misses = 0
+		self.invalidations = 0
+		self._lock = threading.Lock()
+		self._entries = OrderedDict()
+		self._generation = 0
+
+	@staticmethod
+	def getKey(trackorType, method, URL, SearchBody, auth):
+		# Reads by trackorId share their URL across trackor types, and are invalidated by type.
+		identity = "{TrackorType}\n{Method} {URL}\n{Body}\n{Credentials}".format(
+			TrackorType=trackorType,
+			Method=method.upper(),
+			URL=URL,
+			Body=json.dumps(SearchBody, sort_keys=True, default=str),
+			Credentials=getCredentialKey(auth)
+			)
+		return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+	def getTTL(self, trackorType):
+		return self.ttlByType.get(trackorType, self.ttl)
+
+	def get(self, key):
+		"""Returns a curl object holding the cached result of a read, or None if it has to be sent."""
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is not None and time.monotonic() - entry["storedAt"] >= self.getTTL(entry["trackorType"]):
+				del self._entries[key]
+				entry = None
+			if entry is None:
+				self.misses += 1
+				return None
+			self._entries.move_to_end(key)
+			self.hits += 1
+		return TrackorReadCache._getHit(entry["OVCall"])
+
+	@staticmethod
+	def _getHit(OVCall):
+		hit = curl(OVCall.method)
+		hit.url = OVCall.url
+		hit.operation = OVCall.operation
+		hit._shareResult(OVCall)
+		hit.coalesced = False
+		hit.fromCache = True
+		hit.duration = 0.0
+		return hit
+
+	def begin(self):
+		"""Returns the token to give to put() once the read it is taken for completes."""
+		with self._lock:
+			return self._generation
+
+	def put(self, key, trackorType, OVCall, generation):
+		"""Caches the result of a read, unless it failed or a write invalidated the cache since begin()."""
+		if self.getTTL(trackorType) <= 0 or len(OVCall.errors) > 0 or OVCall.request is None or OVCall.request.status_code != 200:
+			return
+		# Parsed once here, so the hits never decode the body again.
+		OVCall.jsonData
+		with self._lock:
+			if generation != self._generation:
+				return
+			self._entries[key] = {"trackorType": trackorType, "storedAt": time.monotonic(), "OVCall": OVCall}
+			self._entries.move_to_end(key)
+			while len(self._entries) > self.maxEntries:
+				self._entries.popitem(last=False)
+
+	def read(self, send, method, URL, SearchBody, auth, trackorType):
+		"""Returns the cached result of a read, or the curl object returned by send() after caching it."""
+		key = TrackorReadCache.getKey(trackorType, method, URL, SearchBody, auth)
+		hit = self.get(key)
+		if hit is not None:
+			return hit
+		generation = self.begin()
+		OVCall = send()
+		self.put(key, trackorType, OVCall, generation)
+		return OVCall
+
+	async def readAsync(self, send, method, URL, SearchBody, auth, trackorType):
+		"""Same as read, send() is a coroutine."""
+		key = TrackorReadCache.getKey(trackorType, method, URL, SearchBody, auth)
+		hit = self.get(key)
+		if hit is not None:
+			return hit
+		generation = self.begin()
+		OVCall = await send()
+		self.put(key, trackorType, OVCall, generation)
+		return OVCall
+
+	def invalidate(self, trackorType=""):
+		"""Drops the cached reads of a trackor type and of Trackors with no type, or every read if trackorType is empty."""
+		with self._lock:
+			self._generation += 1
+			keys = [key for key, entry in self._entries.items() if not trackorType or entry["trackorType"] in (trackorType, "")]
+			for key in keys:
+				del self._entries[key]
+			self.invalidations += len(keys)
+
+	def clear(self):
+		with self._lock:
+			self._generation += 1
+			self._entries.clear()
+
+	def getStats(self):
+		with self._lock:
+			return {
+				"entries": len(self._entries),
+				"hits": self.hits,
+				"misses": self.misses,
+				"invalidations": self.invalidations
+				}
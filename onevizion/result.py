@@ -0,0 +1,60 @@
+from types import MappingProxyType
+
+class CallResult(object):
+	"""Immutable outcome of one API call, returned by the "results" call style of the wrappers:
+
+		result = trackor.results.read(trackorId=1001, fields=['TRACKOR_KEY'])
+		if result.ok:
+			print(result.data, result.timing)
+
+	Calls made this way only read the wrapper they are made through, and leave its attributes and
+	onevizion.Config["Trace"] and ["Error"] untouched, so one wrapper can be used from many threads or
+	tasks at once.  Nothing is printed; check "ok" and "errors".
+
+	Attributes:
+		operation: name of the wrapper method, such as "Trackor.read"
+		url: URL of the call
+		status: HTTP status code of the response, None if there was no response
+		data: the parsed JSON of the response (the file bytes for Export getFile).  It may be shared
+			with coalesced calls, do not modify it
+		errors: tuple of the errors of the call, empty on success
+		duration: seconds the call took
+		timing: read-only mapping of the phases of the call, see curl.timing
+		attempts: number of attempts made
+	"""
+
+	__slots__ = ('operation', 'url', 'status', 'data', 'errors', 'duration', 'timing', 'attempts')
+
+	def __init__(self, OVCall, data=None, extraErrors=()):
+		response = OVCall.request
+		values = {
+			'operation': OVCall.operation,
+			'url': OVCall.url,
+			'status': response.status_code if response is not None else None,
+			'data': OVCall.jsonData if data is None else data,
+			'errors': tuple(OVCall.errors) + tuple(extraErrors),
+			'duration': OVCall.duration,
+			'timing': MappingProxyType(dict(OVCall.timing)),
+			'attempts': OVCall.attempts
+			}
+		for name, value in values.items():
+			object.__setattr__(self, name, value)
+
+	def __setattr__(self, name, value):
+		raise AttributeError("CallResult is immutable.")
+
+	def __delattr__(self, name):
+		raise AttributeError("CallResult is immutable.")
+
+	@property
+	def ok(self):
+		return len(self.errors) == 0
+
+	def __repr__(self):
+		return "CallResult({Operation} {URL}: status={Status}, errors={Errors}, duration={Duration})".format(
+			Operation=self.operation,
+			URL=self.url,
+			Status=self.status,
+			Errors=len(self.errors),
+			Duration=self.duration
+			)
@@ -0,0 +1,30 @@
+from enum import Enum
+
+class Retention(Enum):
+	"""What the wrappers (Trackor, Task, WorkPlan, Export, Import) keep of a call once their method returns.
+	Set it for the whole process with onevizion.Config["Retention"], or per call with the curl
+	"retention" option.
+
+		FULL: the curl object, the full requests.Response with its body, and the parsed jsonData
+		RESULT: status, headers, timings and the parsed jsonData.  The response body and the request
+			body are released as soon as the wrapper has read them, and Export.getFile returns the file
+			without keeping it in "content"
+		NONE: nothing.  OVCall, request and jsonData are cleared, only "errors" is kept.  For workers that
+			only write, or that read through the returned call of the Async variants
+	"""
+
+	FULL = "full"
+	RESULT = "result"
+	NONE = "none"
+
+
+def retainCall(wrapper, OVCall):
+	"""Called by the wrappers once they are done with a call, to release what its retention does not keep."""
+	retention = OVCall.getRetention()
+	if retention == Retention.FULL:
+		return
+	OVCall.releaseBody()
+	if retention == Retention.NONE:
+		wrapper.OVCall = None
+		wrapper.request = None
+		wrapper.jsonData = {}
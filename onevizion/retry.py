@@ -0,0 +1,84 @@
+import asyncio
+import random
+import requests
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+try:
+	import aiohttp
+except ImportError:
+	aiohttp = None
+
+class RetryPolicy(object):
+	"""Decides whether a failed curl call is sent again and how long to wait first.  A call is retried
+	when it raised one of exceptions or answered with one of statusCodes, as long as its HTTP method
+	is listed in methods and it has attempts left.  The wait honors the server's Retry-After header,
+	otherwise it is a capped exponential backoff with full jitter: random(0, min(maxBackoff, backoffFactor * 2**(attempt-1))).
+
+	Attributes:
+		maxAttempts: total number of attempts, including the first one
+		methods: list of HTTP methods that are retried, by default the idempotent ones.  May also be a
+			dictionary of method:maxAttempts to allow a different number of attempts per method.
+		statusCodes: HTTP status codes that are worth retrying
+		exceptions: exception classes that are worth retrying, by default connection errors and timeouts.
+			Any other exception, such as an error in a hook or a deadline running out, ends the call at once.
+		backoffFactor: base delay in seconds of the exponential backoff
+		maxBackoff: the longest backoff delay in seconds
+		maxRetryAfter: the longest Retry-After delay in seconds that is honored.  Longer ones are not retried.
+	"""
+
+	IdempotentMethods = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+	RetryStatusCodes = (429, 502, 503, 504)
+	RetryExceptions = (requests.exceptions.ConnectionError, requests.exceptions.Timeout, asyncio.TimeoutError) + ((aiohttp.ClientConnectionError,) if aiohttp is not None else ())
+
+	def __init__(self, maxAttempts=3, methods=IdempotentMethods, statusCodes=RetryStatusCodes, backoffFactor=0.5, maxBackoff=30, maxRetryAfter=120, exceptions=RetryExceptions):
+		self.maxAttempts = maxAttempts
+		self.methods = methods
+		self.statusCodes = statusCodes
+		self.exceptions = tuple(exceptions)
+		self.backoffFactor = backoffFactor
+		self.maxBackoff = maxBackoff
+		self.maxRetryAfter = maxRetryAfter
+
+	def getMaxAttempts(self, method):
+		if isinstance(self.methods, dict):
+			return self.methods.get(method.upper(), 1)
+		if method.upper() in self.methods:
+			return self.maxAttempts
+		return 1
+
+	def getDelay(self, method, attempt, response=None, exception=None):
+		"""Returns the number of seconds to wait before the next attempt, or None if the call should not be retried.
+			"attempt" is the number of attempts made so far.
+		"""
+		if attempt >= self.getMaxAttempts(method):
+			return None
+		if exception is not None and not isinstance(exception, self.exceptions):
+			return None
+		if exception is None and (response is None or response.status_code not in self.statusCodes):
+			return None
+
+		if response is not None:
+			retryAfter = RetryPolicy.parseRetryAfter(response.headers.get('Retry-After'))
+			if retryAfter is not None:
+				if retryAfter > self.maxRetryAfter:
+					return None
+				return retryAfter
+
+		return random.uniform(0, min(self.maxBackoff, self.backoffFactor * (2 ** (attempt - 1))))
+
+	@staticmethod
+	def parseRetryAfter(value):
+		if value is None:
+			return None
+		try:
+			return max(0.0, float(value))
+		except ValueError:
+			pass
+		try:
+			retryDate = parsedate_to_datetime(value)
+		except (TypeError, ValueError):
+			return None
+		if retryDate.tzinfo is None:
+			retryDate = retryDate.replace(tzinfo=timezone.utc)
+		return max(0.0, (retryDate - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,214 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from contextvars import ContextVar
+from enum import Enum
+from onevizion.pool import SessionPool
+from onevizion.deadline import Deadline, DeadlineExceeded, getRemaining
+
+_currentPriority = ContextVar("onevizion_priority", default=None)
+
+class RequestPriority(Enum):
+	"""Priority classes of API calls, most urgent first.  CONTROL is used by module logs, notification
+	status updates and interrupts, NORMAL by everything else unless a Priority block says otherwise.
+	"""
+
+	CONTROL = 0
+	INTERACTIVE = 1
+	NORMAL = 2
+	BULK = 3
+
+
+class Priority(object):
+	"""Sets the priority of the calls made inside the "with" block, for instance to mark a bulk update
+	loop as background traffic:
+
+		with Priority(RequestPriority.BULK):
+			for trackorId in trackorIds:
+				trackor.update(trackorId=trackorId, fields=fields)
+	"""
+
+	def __init__(self, priority):
+		self.priority = priority
+		self._token = None
+
+	def __enter__(self):
+		self._token = _currentPriority.set(self.priority)
+		return self
+
+	def __exit__(self, excType, excValue, traceback):
+		_currentPriority.reset(self._token)
+		self._token = None
+		return False
+
+	@staticmethod
+	def current():
+		priority = _currentPriority.get()
+		return RequestPriority.NORMAL if priority is None else priority
+
+
+class _Waiter(object):
+
+	def __init__(self, loop=None):
+		self.granted = False
+		self.cancelled = False
+		if loop is None:
+			self.event = threading.Event()
+			self.loop = None
+		else:
+			self.loop = loop
+			self.future = loop.create_future()
+
+	def grant(self):
+		self.granted = True
+		if self.loop is None:
+			self.event.set()
+		else:
+			self.loop.call_soon_threadsafe(self._resolve)
+
+	def _resolve(self):
+		if not self.future.done():
+			self.future.set_result(True)
+
+
+class _HostQueue(object):
+
+	def __init__(self):
+		self.active = 0
+		self.waiters = []
+
+
+class RequestScheduler(object):
+	"""Bounds the number of calls in flight to each host and, when they are all taken, hands the next free
+	slot to the most urgent waiting call (lowest RequestPriority), first come first served within a class.
+	So module logs and status updates do not queue behind a bulk loop running in other threads.
+
+	Attributes:
+		maxPerHost: calls allowed in flight at once per host
+
+		waits: number of calls, per RequestPriority name, that had to wait for a slot
+		waitTime: seconds, per RequestPriority name, those calls waited
+	"""
+
+	def __init__(self, maxPerHost=8):
+		self.maxPerHost = maxPerHost
+		self.waits = dict((priority.name, 0) for priority in RequestPriority)
+		self.waitTime = dict((priority.name, 0.0) for priority in RequestPriority)
+		self._hosts = {}
+		self._lock = threading.Lock()
+		self._sequence = itertools.count()
+
+	def _getHost(self, url):
+		key = SessionPool.hostKey(url)
+		host = self._hosts.get(key)
+		if host is None:
+			host = self._newHost()
+			self._hosts[key] = host
+		return host
+
+	def _newHost(self):
+		return _HostQueue()
+
+	def _getLimit(self, host):
+		return self.maxPerHost
+
+	def _record(self, host, url, response, exception, latency):
+		"""Called under the lock with the outcome of every call.  The fixed limit ignores it."""
+		pass
+
+	def _enqueue(self, url, priority, waiter):
+		"""Takes a free slot at once and returns True, or queues the waiter and returns False."""
+		with self._lock:
+			host = self._getHost(url)
+			if host.active < self._getLimit(host) and len(host.waiters) == 0:
+				host.active += 1
+				return True
+			heapq.heappush(host.waiters, (priority.value, next(self._sequence), waiter))
+			return False
+
+	def _recordWait(self, priority, seconds):
+		with self._lock:
+			self.waits[priority.name] += 1
+			self.waitTime[priority.name] += seconds
+
+	def tryAcquire(self, url):
+		"""Takes a slot on the URL's host only if one is free now and no call is waiting.  Returns True if it did."""
+		with self._lock:
+			host = self._getHost(url)
+			if host.active < self._getLimit(host) and len(host.waiters) == 0:
+				host.active += 1
+				return True
+			return False
+
+	def _giveUp(self, waiter):
+		"""Takes a waiter out of the queue once its deadline expired.  Raises DeadlineExceeded, unless the
+			slot was granted in the meantime.
+		"""
+		with self._lock:
+			if waiter.granted:
+				return
+			waiter.cancelled = True
+		raise DeadlineExceeded("Deadline of {Seconds} seconds exceeded waiting for a slot.".format(Seconds=Deadline.current().seconds))
+
+	def acquire(self, url, priority=None):
+		"""Waits for a slot on the URL's host and returns the seconds spent waiting.  Inside a Deadline block
+			it waits at most the remaining budget, then raises DeadlineExceeded.
+		"""
+		priority = priority or Priority.current()
+		waiter = _Waiter()
+		if self._enqueue(url, priority, waiter):
+			return 0.0
+		start = time.monotonic()
+		if not waiter.event.wait(getRemaining()):
+			self._giveUp(waiter)
+		waited = time.monotonic() - start
+		self._recordWait(priority, waited)
+		return waited
+
+	async def acquireAsync(self, url, priority=None):
+		"""Same as acquire(), for coroutines."""
+		priority = priority or Priority.current()
+		waiter = _Waiter(asyncio.get_running_loop())
+		if self._enqueue(url, priority, waiter):
+			return 0.0
+		start = time.monotonic()
+		try:
+			await asyncio.wait_for(waiter.future, getRemaining())
+		except asyncio.TimeoutError:
+			self._giveUp(waiter)
+		except asyncio.CancelledError:
+			with self._lock:
+				waiter.cancelled = True
+				granted = waiter.granted
+			if granted:
+				self.release(url)
+			raise
+		waited = time.monotonic() - start
+		self._recordWait(priority, waited)
+		return waited
+
+	def release(self, url, response=None, exception=None, latency=None):
+		"""Frees the slot of a finished call and gives it to the most urgent waiting call.  The outcome of
+			the call (its response or exception and latency in seconds) is only used by AdaptiveLimiter.
+		"""
+		with self._lock:
+			host = self._getHost(url)
+			# A call that was never sent says nothing about the host.
+			if response is not None or exception is not None or latency is not None:
+				self._record(host, url, response, exception, latency)
+			host.active -= 1
+			while host.active < self._getLimit(host) and len(host.waiters) > 0:
+				waiter = heapq.heappop(host.waiters)[2]
+				if not waiter.cancelled:
+					host.active += 1
+					waiter.grant()
+
+	def getStats(self):
+		"""Returns the limit, calls in flight and calls waiting per host."""
+		with self._lock:
+			return dict(
+				(key, {"limit": self._getLimit(host), "active": host.active, "waiting": sum(1 for waiter in host.waiters if not waiter[2].cancelled)})
+				for key, host in self._hosts.items()
+				)
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+from onevizion.deadline import Deadline, DeadlineExceeded, getRemaining
+
+class _Flight(object):
+
+	def __init__(self, owner):
+		self.owner = owner
+		self.done = threading.Event()
+		self.future = None
+		self.exception = None
+
+
+class SingleFlight(object):
+	"""Lets identical calls that are in flight at the same time share a single execution.  The first
+	caller for a key (the owner) runs the call, and every caller that arrives with the same key before it
+	finishes waits for it and gets the owner back instead of running the call again.
+
+	Threads and asyncio tasks are grouped separately: do() is for threads, doAsync() for coroutines.
+	A waiting caller inside a Deadline block waits at most the remaining budget, then gets DeadlineExceeded.
+	"""
+
+	def __init__(self):
+		self._flights = {}
+		self._lock = threading.Lock()
+		self.coalesced = 0
+
+	def do(self, key, owner, fn):
+		"""Runs fn() unless a call with the same key is already running.  Returns the owner of the call that ran."""
+		with self._lock:
+			flight = self._flights.get(key)
+			if flight is None:
+				flight = _Flight(owner)
+				self._flights[key] = flight
+				isOwner = True
+			else:
+				self.coalesced += 1
+				isOwner = False
+
+		if isOwner:
+			try:
+				fn()
+			except BaseException as e:
+				flight.exception = e
+				raise
+			finally:
+				with self._lock:
+					del self._flights[key]
+				flight.done.set()
+		else:
+			if not flight.done.wait(getRemaining()):
+				SingleFlight._expire()
+			if flight.exception is not None:
+				raise flight.exception
+		return flight.owner
+
+	async def doAsync(self, key, owner, fn):
+		"""Same as do(), but fn is a coroutine function and waiting callers await the owner's call."""
+		key = (asyncio.get_running_loop(), key)
+		with self._lock:
+			flight = self._flights.get(key)
+			if flight is None:
+				flight = _Flight(owner)
+				flight.future = asyncio.get_running_loop().create_future()
+				self._flights[key] = flight
+				isOwner = True
+			else:
+				self.coalesced += 1
+				isOwner = False
+
+		if isOwner:
+			try:
+				await fn()
+			except BaseException as e:
+				flight.future.set_exception(e)
+				# waiting callers get the exception, do not warn about it being never retrieved
+				flight.future.exception()
+				raise
+			else:
+				flight.future.set_result(owner)
+			finally:
+				with self._lock:
+					del self._flights[key]
+		else:
+			try:
+				await asyncio.wait_for(asyncio.shield(flight.future), getRemaining())
+			except asyncio.TimeoutError:
+				SingleFlight._expire()
+		return flight.owner
+
+	@staticmethod
+	def _expire():
+		raise DeadlineExceeded("Deadline of {Seconds} seconds exceeded waiting for an identical call.".format(Seconds=Deadline.current().seconds))
+
+
+# Shared by every curl call that asks for coalescing.
+DefaultSingleFlight = SingleFlight()
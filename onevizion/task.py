@@ -3,19 +3,24 @@ import json
 from datetime import datetime
 from onevizion.util import *
 from onevizion.curl import curl
+from onevizion.jsoncodec import dumpsJSON
+from onevizion.asynccurl import AsyncCurl
+from onevizion.retention import retainCall
+from onevizion.result import CallResult
 from onevizion.httpbearer import HTTPBearerAuth
 from onevizion.EMail import EMail
 import onevizion
 
 class Task(object):
 
-	def __init__(self, URL = "", userName="", password="", paramToken=None, isTokenAuth=False):
+	def __init__(self, URL = "", userName="", password="", paramToken=None, isTokenAuth=False, client=None):
 		self.URL = URL
 		self.userName = userName
 		self.password = password
 		self.errors = []
 		self.jsonData = {}
 		self.OVCall = curl()
+		self.client = client
 		if paramToken is not None:
 			if self.URL == "":
 				self.URL = onevizion.Config["ParameterData"][paramToken]['url']
@@ -24,83 +29,163 @@ class Task(object):
 			if self.password == "":
 				self.password = onevizion.Config["ParameterData"][paramToken]['Password']
 
+		if client is not None:
+			# The login of the client, unless this wrapper was given its own.
+			if not self.URL:
+				self.URL = client.URL
+			if not self.userName:
+				self.userName = client.userName
+			if not self.password:
+				self.password = client.password
+
 		self.URL = getUrlContainingScheme(self.URL)
 
-		if isTokenAuth:
+		if client is not None:
+			self.auth = client.auth
+		elif isTokenAuth:
 			self.auth = HTTPBearerAuth(self.userName, self.password)
 		else:
 			self.auth = requests.auth.HTTPBasicAuth(self.userName, self.password)
 
+	@property
+	def results(self):
+		"""The result call style of this Task: task.results.read(...) returns a CallResult and is thread safe."""
+		return TaskResults(self)
+
 	def read(self, taskId = None, workplanId=None, orderNumber=None):
 		""" Retrieve some data about a particular WorkPlan Tasks. Tasks must be
 			identified either by workplanId, workplanId and orderNumber or by a taskId
 		"""
+		URL = self._readRequest(taskId, workplanId, orderNumber)
+		self._readResult(curl('GET',URL,auth=self.auth,client=self.client,operation='Task.read'), URL)
+
+	async def readAsync(self, taskId = None, workplanId=None, orderNumber=None):
+		""" Same as read, but awaits the call on the running event loop.  Returns the AsyncCurl object of the call.
+		"""
+		URL = self._readRequest(taskId, workplanId, orderNumber)
+		OVCall = await AsyncCurl('GET',URL,auth=self.auth,client=self.client,operation='Task.read')
+		self._readResult(OVCall, URL)
+		return OVCall
+
+	def _readRequest(self, taskId, workplanId, orderNumber):
 		if taskId is not None:
 			URL = "{URL}/api/v3/tasks/{TaskID}".format(URL=self.URL, TaskID=taskId)
 		elif orderNumber is not None:
 			URL = "{URL}/api/v3/tasks?workplan_id={WorkPlanID}&order_number={OrderNumber}".format(URL=self.URL, WorkPlanID=workplanId, OrderNumber=orderNumber)
 		else:
 			URL = "{URL}/api/v3/wps/{WorkPlanID}/tasks".format(URL=self.URL, WorkPlanID=workplanId)
+		return URL
 
+	def _readResult(self, OVCall, URL):
 		self.errors = []
-		self.jsonData = {}
-		self.OVCall = curl('GET',URL,auth=self.auth)
-		self.jsonData = self.OVCall.jsonData
-		self.request = self.OVCall.request
+		self.OVCall = OVCall
+		self.jsonData = OVCall.jsonData
+		self.request = OVCall.request
 
 		Message(URL,2)
-		Message("Task read completed in {Duration} seconds.".format(Duration=self.OVCall.duration),1)
-		if len(self.OVCall.errors) > 0:
-			self.errors.append(self.OVCall.errors)
-			TraceTag="{TimeStamp}:".format(TimeStamp=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f'))
-			self.TraceTag = TraceTag
-			onevizion.Config["Trace"][TraceTag+"-URL"] = URL
-			try:
-				TraceMessage("Status Code: {StatusCode}".format(StatusCode=self.OVCall.request.status_code),0,TraceTag+"-StatusCode")
-				TraceMessage("Reason: {Reason}".format(Reason=self.OVCall.request.reason),0,TraceTag+"-Reason")
-				TraceMessage("Body:\n{Body}".format(Body=self.OVCall.request.text),0,TraceTag+"-Body")
-			except Exception as e:
-				TraceMessage("Errors:\n{Errors}".format(Errors=json.dumps(self.OVCall.errors,indent=2)),0,TraceTag+"-Errors")
-			onevizion.Config["Error"]=True
+		Message("Task read completed in {Duration} seconds ({Timing}).".format(Duration=OVCall.duration, Timing=OVCall.getTimingText()),1)
+		if len(OVCall.errors) > 0:
+			self.errors.append(OVCall.errors)
+			self.TraceTag = TraceCallErrors(OVCall, URL)
+		retainCall(self, OVCall)
 
 	def updatePartial(self, taskId, fields, dynamicDates):
 		"""Update Task Partial"""
 		self._update('PATCH', taskId, fields, dynamicDates)
 
+	async def updatePartialAsync(self, taskId, fields, dynamicDates):
+		"""Same as updatePartial, but awaits the call on the running event loop.  Returns the AsyncCurl object of the call."""
+		return await self._updateAsync('PATCH', taskId, fields, dynamicDates)
+
 	def update(self, taskId, fields, dynamicDates):
 		""" This endpoint doesn't support partial update, so you should pass whole Task json object.
 			Missed Task json object fields will be set to null.
 		"""
 		self._update('PUT', taskId, fields, dynamicDates)
 
+	async def updateAsync(self, taskId, fields, dynamicDates):
+		"""Same as update, but awaits the call on the running event loop.  Returns the AsyncCurl object of the call."""
+		return await self._updateAsync('PUT', taskId, fields, dynamicDates)
+
 	def _update(self, method, taskId, fields={}, dynamicDates=[]):
+		fields = Task._getUpdateFields(fields, dynamicDates)
+		URL, JSON, Headers = self._updateRequest(taskId, fields)
+		self._updateResult(curl(method, URL, data=JSON, headers=Headers, auth=self.auth, client=self.client, operation=Task._getUpdateOperation(method)), URL, fields)
+
+	async def _updateAsync(self, method, taskId, fields={}, dynamicDates=[]):
+		fields = Task._getUpdateFields(fields, dynamicDates)
+		URL, JSON, Headers = self._updateRequest(taskId, fields)
+		OVCall = await AsyncCurl(method, URL, data=JSON, headers=Headers, auth=self.auth, client=self.client, operation=Task._getUpdateOperation(method))
+		self._updateResult(OVCall, URL, fields)
+		return OVCall
+
+	@staticmethod
+	def _getUpdateOperation(method):
+		return 'Task.updatePartial' if method == 'PATCH' else 'Task.update'
+
+	@staticmethod
+	def _getUpdateFields(fields, dynamicDates):
 		if len(dynamicDates)>0:
+			# A copy, as the caller's fields may be shared by other calls, and by other threads through Task.results.
+			fields = dict(fields)
 			fields['dynamic_dates'] = dynamicDates
+		return fields
 
-		JSON = json.dumps(fields)
+	def _updateRequest(self, taskId, fields):
+		JSON = dumpsJSON(fields)
 
 		URL = "{URL}/api/v3/tasks/{TaskID}".format(URL=self.URL, TaskID=taskId)
 		#payload = open('temp_payload.json','rb')
 		Headers = {'content-type': 'application/json'}
+		return URL, JSON, Headers
+
+	def _updateResult(self, OVCall, URL, fields):
 		self.errors = []
-		self.jsonData = {}
-		self.OVCall = curl(method, URL, data=JSON, headers=Headers, auth=self.auth)
-		self.jsonData = self.OVCall.jsonData
-		self.request = self.OVCall.request
+		self.OVCall = OVCall
+		self.jsonData = OVCall.jsonData
+		self.request = OVCall.request
 
 		Message(URL,2)
 		Message(json.dumps(fields,indent=2),2)
-		Message("Task update completed in {Duration} seconds.".format(Duration=self.OVCall.duration),1)
-		if len(self.OVCall.errors) > 0:
-			self.errors.append(self.OVCall.errors)
-			TraceTag="{TimeStamp}:".format(TimeStamp=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f'))
-			self.TraceTag = TraceTag
-			onevizion.Config["Trace"][TraceTag+"-URL"] = URL
-			onevizion.Config["Trace"][TraceTag+"-PostBody"] = json.dumps(fields,indent=2)
-			try:
-				TraceMessage("Status Code: {StatusCode}".format(StatusCode=self.OVCall.request.status_code),0,TraceTag+"-StatusCode")
-				TraceMessage("Reason: {Reason}".format(Reason=self.OVCall.request.reason),0,TraceTag+"-Reason")
-				TraceMessage("Body:\n{Body}".format(Body=self.OVCall.request.text),0,TraceTag+"-Body")
-			except Exception as e:
-				TraceMessage("Errors:\n{Errors}".format(Errors=json.dumps(self.OVCall.errors,indent=2)),0,TraceTag+"-Errors")
-			onevizion.Config["Error"]=True
+		Message("Task update completed in {Duration} seconds ({Timing}).".format(Duration=OVCall.duration, Timing=OVCall.getTimingText()),1)
+		if len(OVCall.errors) > 0:
+			self.errors.append(OVCall.errors)
+			self.TraceTag = TraceCallErrors(OVCall, URL, {"PostBody": json.dumps(fields,indent=2)})
+		retainCall(self, OVCall)
+
+
+class TaskResults(object):
+	"""Result call style of a Task, see CallResult.  It has the same methods as Task, each returning
+		a CallResult instead of setting the Task's attributes.  Get it from Task.results.
+	"""
+
+	def __init__(self, task):
+		self._task = task
+
+	def read(self, taskId=None, workplanId=None, orderNumber=None):
+		URL = self._task._readRequest(taskId, workplanId, orderNumber)
+		return CallResult(curl('GET',URL,auth=self._task.auth,client=self._task.client,operation='Task.read'))
+
+	async def readAsync(self, taskId=None, workplanId=None, orderNumber=None):
+		URL = self._task._readRequest(taskId, workplanId, orderNumber)
+		return CallResult(await AsyncCurl('GET',URL,auth=self._task.auth,client=self._task.client,operation='Task.read'))
+
+	def updatePartial(self, taskId, fields, dynamicDates):
+		return self._update('PATCH', taskId, fields, dynamicDates)
+
+	async def updatePartialAsync(self, taskId, fields, dynamicDates):
+		return await self._updateAsync('PATCH', taskId, fields, dynamicDates)
+
+	def update(self, taskId, fields, dynamicDates):
+		return self._update('PUT', taskId, fields, dynamicDates)
+
+	async def updateAsync(self, taskId, fields, dynamicDates):
+		return await self._updateAsync('PUT', taskId, fields, dynamicDates)
+
+	def _update(self, method, taskId, fields, dynamicDates):
+		URL, JSON, Headers = self._task._updateRequest(taskId, Task._getUpdateFields(fields, dynamicDates))
+		return CallResult(curl(method, URL, data=JSON, headers=Headers, auth=self._task.auth, client=self._task.client, operation=Task._getUpdateOperation(method)))
+
+	async def _updateAsync(self, method, taskId, fields, dynamicDates):
+		URL, JSON, Headers = self._task._updateRequest(taskId, Task._getUpdateFields(fields, dynamicDates))
+		return CallResult(await AsyncCurl(method, URL, data=JSON, headers=Headers, auth=self._task.auth, client=self._task.client, operation=Task._getUpdateOperation(method)))
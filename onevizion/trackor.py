@@ -1,8 +1,17 @@
+import asyncio
+import contextvars
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
 import json
 from datetime import datetime
 from onevizion.util import *
 from onevizion.curl import curl
+from onevizion.jsoncodec import dumpsJSON
+from onevizion.asynccurl import AsyncCurl
+from onevizion.retention import retainCall
+from onevizion.result import CallResult
 from onevizion.httpbearer import HTTPBearerAuth
 from onevizion.EMail import EMail
 import onevizion
@@ -16,13 +25,14 @@ class Trackor(object):
 		URL: A string representing the website's main URL for instance "trackor.onevizion.com".
 		userName: the username used to login to the system
 		password: the password used to gain access to the system
+		client: OneVizionClient whose login, pool and call settings are used, see OneVizionClient.trackor
 
 		errors: array of any errors encounterd
 		OVCall: the requests object of call to the web api
 		jsonData: the json data converted to python array
 	"""
 
-	def __init__(self, trackorType = "", URL = "", userName="", password="", paramToken=None, isTokenAuth=False):
+	def __init__(self, trackorType = "", URL = "", userName="", password="", paramToken=None, isTokenAuth=False, client=None):
 		self.TrackorType = trackorType
 		self.URL = URL
 		self.userName = userName
@@ -31,6 +41,7 @@ class Trackor(object):
 		self.jsonData = {}
 		self.OVCall = curl()
 		self.request = None
+		self.client = client
 
 		if paramToken is not None:
 			if self.URL == "":
@@ -40,38 +51,60 @@ class Trackor(object):
 			if self.password == "":
 				self.password = onevizion.Config["ParameterData"][paramToken]['Password']
 
+		if client is not None:
+			# The login of the client, unless this wrapper was given its own.
+			if not self.URL:
+				self.URL = client.URL
+			if not self.userName:
+				self.userName = client.userName
+			if not self.password:
+				self.password = client.password
+
 		self.URL = getUrlContainingScheme(self.URL)
 
-		if isTokenAuth:
+		if client is not None:
+			self.auth = client.auth
+		elif isTokenAuth:
 			self.auth = HTTPBearerAuth(self.userName, self.password)
 		else:
 			self.auth = requests.auth.HTTPBasicAuth(self.userName, self.password)
 
+	@property
+	def results(self):
+		"""The result call style of this Trackor: trackor.results.read(...) returns a CallResult and is thread safe."""
+		return TrackorResults(self)
+
 	def delete(self,trackorId):
 		""" Delete a Trackor instance.  Must pass a trackorId, the unique DB number.
 		"""
+		URL = self._deleteRequest(trackorId)
+		self._deleteResult(curl('DELETE',URL,auth=self.auth,client=self.client,operation='Trackor.delete'), URL)
+
+	async def deleteAsync(self,trackorId):
+		""" Same as delete, but awaits the call on the running event loop.  Returns the AsyncCurl object of the call.
+		"""
+		URL = self._deleteRequest(trackorId)
+		OVCall = await AsyncCurl('DELETE',URL,auth=self.auth,client=self.client,operation='Trackor.delete')
+		self._deleteResult(OVCall, URL)
+		return OVCall
+
+	def _deleteRequest(self, trackorId):
 		FilterSection = "trackor_id=" + str(trackorId)
 
-		URL = "{URL}/api/v3/trackor_types/{TrackorType}/trackors?{FilterSection}".format(URL=self.URL, TrackorType=self.TrackorType, FilterSection=FilterSection)
+		return "{URL}/api/v3/trackor_types/{TrackorType}/trackors?{FilterSection}".format(URL=self.URL, TrackorType=self.TrackorType, FilterSection=FilterSection)
+
+	def _deleteResult(self, OVCall, URL):
+		self._invalidateReadCache()
 		self.errors = []
-		self.jsonData = {}
-		self.OVCall = curl('DELETE',URL,auth=self.auth)
+		self.OVCall = OVCall
+		self.jsonData = OVCall.jsonData
+		self.request = OVCall.request
 		Message(URL,2)
-		Message("Deletes completed in {Duration} seconds.".format(Duration=self.OVCall.duration),1)
-		if len(self.OVCall.errors) > 0:
-			self.errors.append(self.OVCall.errors)
-			TraceTag="{TimeStamp}:".format(TimeStamp=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f'))
-			self.TraceTag = TraceTag
-			onevizion.Config["Trace"][TraceTag+"-URL"] =  URL
-			try:
-				TraceMessage("Status Code: {StatusCode}".format(StatusCode=self.OVCall.request.status_code),0,TraceTag+"-StatusCode")
-				TraceMessage("Reason: {Reason}".format(Reason=self.OVCall.request.reason),0,TraceTag+"-Reason")
-				TraceMessage("Body:\n{Body}".format(Body=self.OVCall.request.text),0,TraceTag+"-Body")
-			except Exception as e:
-				TraceMessage("Errors:\n{Errors}".format(Errors=json.dumps(self.OVCall.errors,indent=2)),0,TraceTag+"-Errors")
-			onevizion.Config["Error"]=True
-		self.jsonData = self.OVCall.jsonData
-		self.request = self.OVCall.request
+		Message("Deletes completed in {Duration} seconds ({Timing}).".format(Duration=OVCall.duration, Timing=OVCall.getTimingText()),1)
+		if len(OVCall.errors) > 0:
+			self.errors.append(OVCall.errors)
+			self.TraceTag = TraceCallErrors(OVCall, URL)
+		retainCall(self, OVCall)
 
 
 
@@ -93,7 +126,163 @@ class Trackor(object):
 
 			fields is an array of strings that are the Configured Field Names.
 		"""
+		Method, URL, SearchBody = self._readRequest(trackorId, filterOptions, filters, search, viewOptions, fields, sort, page, perPage)
+		self._readResult(self._readCall(Method, URL, SearchBody), URL, SearchBody)
+
+	async def readAsync(self,
+		trackorId=None,
+		filterOptions=None,
+		filters={},
+		search=None,
+		viewOptions=None,
+		fields=[],
+		sort={},
+		page=None,
+		perPage=1000
+		):
+		""" Same as read, but awaits the call on the running event loop.  Returns the AsyncCurl object of the call,
+			so concurrent reads on one Trackor each keep their own "jsonData" and "errors".
+		"""
+		Method, URL, SearchBody = self._readRequest(trackorId, filterOptions, filters, search, viewOptions, fields, sort, page, perPage)
+		OVCall = await self._readCallAsync(Method, URL, SearchBody)
+		self._readResult(OVCall, URL, SearchBody)
+		return OVCall
+
+	def iterRead(self,
+		filterOptions=None,
+		filters={},
+		search=None,
+		viewOptions=None,
+		fields=[],
+		sort={},
+		perPage=1000,
+		prefetch=1,
+		workers=1,
+		ordered=True
+		):
+		""" Same as read, but yields the Trackors of every page in turn, from page 1 up to the first page
+			holding fewer than perPage Trackors.  While the caller works through a page, the next "prefetch"
+			pages are read in the background.
 
+			"workers" pages are read at once, for trackor types too large to read one page at a time.  No page
+			past the first short one is asked for once it has come back, and the pages already asked for past
+			it are dropped.  The Trackors are yielded in page order, or with ordered=False in the order the
+			pages come back, so a slow page does not hold up the others.  At most max(prefetch, workers) + 1
+			pages are held in memory.
+
+			"jsonData", "errors" and "OVCall" are those of the last page yielded.  Iteration stops at a page
+			that fails, with its errors in "errors" as for read.  Leaving the loop early stops the background
+			reads.  Give a sort so the Trackors keep their order from one page to the next.
+
+			for site in sites.iterRead(filters={'SITE_STATUS': 'Active'}, fields=['TRACKOR_KEY'], sort={'TRACKOR_KEY': 'asc'}, workers=8):
+		"""
+		arrivals = queue.Queue()
+		pages = _PagedRead(perPage, max(prefetch, workers), ordered, lambda: arrivals.put(None))
+		executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="onevizion-iterread")
+		# The pages are read in copies of the caller's context, so Deadline and Priority blocks carry over.
+		context = contextvars.copy_context()
+
+		def fetch(page):
+			Method, URL, SearchBody = self._readRequest(None, filterOptions, filters, search, viewOptions, fields, sort, page, perPage)
+			return self._readCall(Method, URL, SearchBody), URL, SearchBody
+
+		launch = lambda page: executor.submit(context.copy().run, fetch, page)
+		try:
+			pages.start(launch)
+			while True:
+				item = pages.next()
+				if item is _PagedRead.Done:
+					return
+				if item is None:
+					arrivals.get()
+					continue
+				pages.start(launch)
+				for record in self._readPage(*item):
+					yield record
+				if len(self.errors) > 0:
+					return
+		finally:
+			pages.close()
+			executor.shutdown(wait=False)
+
+	async def iterReadAsync(self,
+		filterOptions=None,
+		filters={},
+		search=None,
+		viewOptions=None,
+		fields=[],
+		sort={},
+		perPage=1000,
+		prefetch=1,
+		workers=1,
+		ordered=True
+		):
+		""" Same as iterRead, as an async generator reading the pages on the running event loop.
+
+			async for site in sites.iterReadAsync(filters={'SITE_STATUS': 'Active'}, fields=['TRACKOR_KEY'], workers=8):
+		"""
+		arrivals = asyncio.Queue()
+		pages = _PagedRead(perPage, max(prefetch, workers), ordered, lambda: arrivals.put_nowait(None))
+		running = asyncio.Semaphore(workers)
+
+		async def fetch(page):
+			async with running:
+				Method, URL, SearchBody = self._readRequest(None, filterOptions, filters, search, viewOptions, fields, sort, page, perPage)
+				return await self._readCallAsync(Method, URL, SearchBody), URL, SearchBody
+
+		launch = lambda page: asyncio.ensure_future(fetch(page))
+		try:
+			pages.start(launch)
+			while True:
+				item = pages.next()
+				if item is _PagedRead.Done:
+					return
+				if item is None:
+					await arrivals.get()
+					continue
+				pages.start(launch)
+				for record in self._readPage(*item):
+					yield record
+				if len(self.errors) > 0:
+					return
+		finally:
+			pages.close()
+
+	@staticmethod
+	def _isFullPage(OVCall, perPage):
+		return len(OVCall.errors) == 0 and isinstance(OVCall.jsonData, list) and len(OVCall.jsonData) >= perPage
+
+	def _readPage(self, OVCall, URL, SearchBody):
+		self._readResult(OVCall, URL, SearchBody)
+		if len(OVCall.errors) > 0 or not isinstance(OVCall.jsonData, list):
+			return []
+		return OVCall.jsonData
+
+	def _getReadCache(self):
+		if self.client is not None and self.client.readCache is not None:
+			return self.client.readCache
+		return onevizion.Config["TrackorReadCache"]
+
+	def _readCall(self, Method, URL, SearchBody):
+		send = lambda: curl(Method,URL,auth=self.auth,**SearchBody,client=self.client,operation='Trackor.read')
+		cache = self._getReadCache()
+		if cache is None:
+			return send()
+		return cache.read(send, Method, URL, SearchBody, self.auth, self.TrackorType)
+
+	async def _readCallAsync(self, Method, URL, SearchBody):
+		send = lambda: AsyncCurl(Method,URL,auth=self.auth,**SearchBody,client=self.client,operation='Trackor.read')
+		cache = self._getReadCache()
+		if cache is None:
+			return await send()
+		return await cache.readAsync(send, Method, URL, SearchBody, self.auth, self.TrackorType)
+
+	def _invalidateReadCache(self):
+		cache = self._getReadCache()
+		if cache is not None:
+			cache.invalidate(self.TrackorType)
+
+	def _readRequest(self, trackorId, filterOptions, filters, search, viewOptions, fields, sort, page, perPage):
 		URL = "{Website}/api/v3/trackor_types/{TrackorType}/trackors".format(
 			Website=self.URL,
 			TrackorType=self.TrackorType
@@ -144,32 +333,25 @@ class Trackor(object):
 			PageSection = "&page="+str(page)+"&per_page="+str(perPage)
 
 		URL += "?"+FilterSection+ViewSection+SortSection+PageSection
+		return Method, URL, SearchBody
 
+	def _readResult(self, OVCall, URL, SearchBody):
 		self.errors = []
-		self.jsonData = {}
-		self.OVCall = curl(Method,URL,auth=self.auth,**SearchBody)
-		self.jsonData = self.OVCall.jsonData
-		self.request = self.OVCall.request
+		self.OVCall = OVCall
+		self.jsonData = OVCall.jsonData
+		self.request = OVCall.request
 
 		Message(URL,2)
 		Message(json.dumps(SearchBody,indent=2),2)
-		Message("{TrackorType} read completed in {Duration} seconds.".format(
+		Message("{TrackorType} read completed in {Duration} seconds ({Timing}).".format(
 			TrackorType=self.TrackorType,
-			Duration=self.OVCall.duration
+			Duration=OVCall.duration,
+			Timing=OVCall.getTimingText()
 			),1)
-		if len(self.OVCall.errors) > 0:
-			self.errors.append(self.OVCall.errors)
-			TraceTag="{TimeStamp}:".format(TimeStamp=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f'))
-			self.TraceTag = TraceTag
-			onevizion.Config["Trace"][TraceTag+"-URL"] = URL
-			onevizion.Config["Trace"][TraceTag+"-PostBody"] = json.dumps(SearchBody,indent=2)
-			try:
-				TraceMessage("Status Code: {StatusCode}".format(StatusCode=self.OVCall.request.status_code),0,TraceTag+"-StatusCode")
-				TraceMessage("Reason: {Reason}".format(Reason=self.OVCall.request.reason),0,TraceTag+"-Reason")
-				TraceMessage("Body:\n{Body}".format(Body=self.OVCall.request.text),0,TraceTag+"-Body")
-			except Exception as e:
-				TraceMessage("Errors:\n{Errors}".format(Errors=json.dumps(self.OVCall.errors,indent=2)),0,TraceTag+"-Errors")
-			onevizion.Config["Error"]=True
+		if len(OVCall.errors) > 0:
+			self.errors.append(OVCall.errors)
+			self.TraceTag = TraceCallErrors(OVCall, URL, {"PostBody": json.dumps(SearchBody,indent=2)})
+		retainCall(self, OVCall)
 
 
 	def update(self, trackorId=None, filters={}, fields={}, parents={}, charset=""):
@@ -184,35 +366,20 @@ class Trackor(object):
 			"parents" is a list of TrackorType:Filter pairs.
 				"Filter" is a list of ConfigFieldName:value exactly like the about "filters"
 		"""
+		URL, JSON, Headers, JSONObj = self._updateRequest(trackorId, filters, fields, parents, charset)
+		self._writeResult(curl('PUT',URL, data=JSON, headers=Headers, auth=self.auth, client=self.client, operation='Trackor.update'), URL, JSONObj, "update")
 
-		# First build a JSON package from the fields and parents dictionaries given
-		JSONObj = {}
-
-		FieldsSection = {}
-		for key, value in fields.items():
-			if isinstance(value, dict):
-				CompoundField = {}
-				for skey,svalue in value.items():
-					CompoundField[skey] = JSONEndValue(svalue)
-				FieldsSection[key] = CompoundField
-			else:
-				FieldsSection[key] = JSONEndValue(value)
+	async def updateAsync(self, trackorId=None, filters={}, fields={}, parents={}, charset=""):
+		""" Same as update, but awaits the call on the running event loop.  Returns the AsyncCurl object of the call.
+		"""
+		URL, JSON, Headers, JSONObj = self._updateRequest(trackorId, filters, fields, parents, charset)
+		OVCall = await AsyncCurl('PUT',URL, data=JSON, headers=Headers, auth=self.auth, client=self.client, operation='Trackor.update')
+		self._writeResult(OVCall, URL, JSONObj, "update")
+		return OVCall
 
-		ParentsSection = []
-		Parentx={}
-		for key, value in parents.items():
-			Parentx["trackor_type"] = key
-			FilterPart = {}
-			for fkey,fvalue in value.items():
-				FilterPart[fkey]=JSONEndValue(fvalue)
-			Parentx["filter"] = FilterPart
-			ParentsSection.append(Parentx)
-
-		if len(FieldsSection) > 0:
-			JSONObj["fields"] = FieldsSection
-		if len(ParentsSection) > 0:
-			JSONObj["parents"] = ParentsSection
-		JSON = json.dumps(JSONObj)
+	def _updateRequest(self, trackorId, filters, fields, parents, charset):
+		JSONObj, FieldsSection = self._buildJSON(fields, parents)
+		JSON = dumpsJSON(JSONObj)
 
 		# Build up the filter to find the unique Tackor instance
 		if trackorId is None:
@@ -230,36 +397,12 @@ class Trackor(object):
 					Website=self.URL,
 					TrackorID=trackorId
 					)
-			JSON = json.dumps(FieldsSection)
+			JSON = dumpsJSON(FieldsSection)
 
 		Headers = {'content-type': 'application/json'}
 		if charset != "":
 			Headers['charset'] = charset
-		self.errors = []
-		self.jsonData = {}
-		self.OVCall = curl('PUT',URL, data=JSON, headers=Headers, auth=self.auth)
-		self.jsonData = self.OVCall.jsonData
-		self.request = self.OVCall.request
-
-		Message(URL,2)
-		Message(json.dumps(JSONObj,indent=2),2)
-		Message("{TrackorType} update completed in {Duration} seconds.".format(
-			TrackorType=self.TrackorType,
-			Duration=self.OVCall.duration
-			),1)
-		if len(self.OVCall.errors) > 0:
-			self.errors.append(self.OVCall.errors)
-			TraceTag="{TimeStamp}:".format(TimeStamp=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f'))
-			self.TraceTag = TraceTag
-			onevizion.Config["Trace"][TraceTag+"-URL"] = URL
-			onevizion.Config["Trace"][TraceTag+"-PostBody"] = json.dumps(JSONObj,indent=2)
-			try:
-				TraceMessage("Status Code: {StatusCode}".format(StatusCode=self.OVCall.request.status_code),0,TraceTag+"-StatusCode")
-				TraceMessage("Reason: {Reason}".format(Reason=self.OVCall.request.reason),0,TraceTag+"-Reason")
-				TraceMessage("Body:\n{Body}".format(Body=self.OVCall.request.text),0,TraceTag+"-Body")
-			except Exception as e:
-				TraceMessage("Errors:\n{Errors}".format(Errors=json.dumps(self.OVCall.errors,indent=2)),0,TraceTag+"-Errors")
-			onevizion.Config["Error"]=True
+		return URL, JSON, Headers, JSONObj
 
 
 	def create(self,fields={},parents={}, charset=""):
@@ -275,7 +418,29 @@ class Trackor(object):
 					Trackor instance to be updated.  Use "TrackorType.ConfigFieldName" to filter
 					with parent fields.
 		"""
+		URL, JSON, Headers, JSONObj = self._createRequest(fields, parents, charset)
+		self._writeResult(curl('POST',URL, data=JSON, headers=Headers, auth=self.auth, client=self.client, operation='Trackor.create'), URL, JSONObj, "create")
+
+	async def createAsync(self,fields={},parents={}, charset=""):
+		""" Same as create, but awaits the call on the running event loop.  Returns the AsyncCurl object of the call.
+		"""
+		URL, JSON, Headers, JSONObj = self._createRequest(fields, parents, charset)
+		OVCall = await AsyncCurl('POST',URL, data=JSON, headers=Headers, auth=self.auth, client=self.client, operation='Trackor.create')
+		self._writeResult(OVCall, URL, JSONObj, "create")
+		return OVCall
 
+	def _createRequest(self, fields, parents, charset):
+		JSONObj, FieldsSection = self._buildJSON(fields, parents)
+		JSON = dumpsJSON(JSONObj)
+
+		URL = "{URL}/api/v3/trackor_types/{TrackorType}/trackors".format(URL=self.URL, TrackorType=self.TrackorType)
+
+		Headers = {'content-type': 'application/json'}
+		if charset != "":
+			Headers['charset'] = charset
+		return URL, JSON, Headers, JSONObj
+
+	def _buildJSON(self, fields, parents):
 		# First build a JSON package from the fields and parents dictionaries given
 		JSONObj = {}
 
@@ -303,38 +468,27 @@ class Trackor(object):
 			JSONObj["fields"] = FieldsSection
 		if len(ParentsSection) > 0:
 			JSONObj["parents"] = ParentsSection
-		JSON = json.dumps(JSONObj)
-
-		URL = "{URL}/api/v3/trackor_types/{TrackorType}/trackors".format(URL=self.URL, TrackorType=self.TrackorType)
+		return JSONObj, FieldsSection
 
-		Headers = {'content-type': 'application/json'}
-		if charset != "":
-			Headers['charset'] = charset
+	def _writeResult(self, OVCall, URL, JSONObj, Action):
+		self._invalidateReadCache()
 		self.errors = []
-		self.jsonData = {}
-		self.OVCall = curl('POST',URL, data=JSON, headers=Headers, auth=self.auth)
-		self.jsonData = self.OVCall.jsonData
-		self.request = self.OVCall.request
+		self.OVCall = OVCall
+		self.jsonData = OVCall.jsonData
+		self.request = OVCall.request
 
 		Message(URL,2)
 		Message(json.dumps(JSONObj,indent=2),2)
-		Message("{TrackorType} create completed in {Duration} seconds.".format(
+		Message("{TrackorType} {Action} completed in {Duration} seconds ({Timing}).".format(
 			TrackorType=self.TrackorType,
-			Duration=self.OVCall.duration
+			Action=Action,
+			Duration=OVCall.duration,
+			Timing=OVCall.getTimingText()
 			),1)
-		if len(self.OVCall.errors) > 0:
-			self.errors.append(self.OVCall.errors)
-			TraceTag="{TimeStamp}:".format(TimeStamp=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f'))
-			self.TraceTag = TraceTag
-			onevizion.Config["Trace"][TraceTag+"-URL"] = URL
-			onevizion.Config["Trace"][TraceTag+"-PostBody"] = json.dumps(JSONObj,indent=2)
-			try:
-				TraceMessage("Status Code: {StatusCode}".format(StatusCode=self.OVCall.request.status_code),0,TraceTag+"-StatusCode")
-				TraceMessage("Reason: {Reason}".format(Reason=self.OVCall.request.reason),0,TraceTag+"-Reason")
-				TraceMessage("Body:\n{Body}".format(Body=self.OVCall.request.text),0,TraceTag+"-Body")
-			except Exception as e:
-				TraceMessage("Errors:\n{Errors}".format(Errors=json.dumps(self.OVCall.errors,indent=2)),0,TraceTag+"-Errors")
-			onevizion.Config["Error"]=True
+		if len(OVCall.errors) > 0:
+			self.errors.append(OVCall.errors)
+			self.TraceTag = TraceCallErrors(OVCall, URL, {"PostBody": json.dumps(JSONObj,indent=2)})
+		retainCall(self, OVCall)
 
 
 	def assignWorkplan(self, trackorId, workplanTemplate, name=None, isActive=False, startDate=None, finishDate=None):
@@ -347,7 +501,18 @@ class Trackor(object):
 			startDate: if given will set the Start Date of the Workplan and calculate baseline dates
 			finishDate: if given will place the finish of the Workplan and backwards calculate dates.
 		"""
+		URL = self._assignWorkplanRequest(trackorId, workplanTemplate, name, isActive, startDate, finishDate)
+		self._assignWorkplanResult(curl('POST',URL,auth=self.auth,client=self.client,operation='Trackor.assignWorkplan'), URL)
 
+	async def assignWorkplanAsync(self, trackorId, workplanTemplate, name=None, isActive=False, startDate=None, finishDate=None):
+		""" Same as assignWorkplan, but awaits the call on the running event loop.  Returns the AsyncCurl object of the call.
+		"""
+		URL = self._assignWorkplanRequest(trackorId, workplanTemplate, name, isActive, startDate, finishDate)
+		OVCall = await AsyncCurl('POST',URL,auth=self.auth,client=self.client,operation='Trackor.assignWorkplan')
+		self._assignWorkplanResult(OVCall, URL)
+		return OVCall
+
+	def _assignWorkplanRequest(self, trackorId, workplanTemplate, name, isActive, startDate, finishDate):
 		URL = "{website}/api/v3/trackors/{trackor_id}/assign_wp?workplan_template={workplan_template}&is_active={is_active}".format(
 				website=self.URL,
 				trackor_id=trackorId,
@@ -371,30 +536,24 @@ class Trackor(object):
 			else:
 				dt = str(finishDate)
 			URL += "&proj_finish_date="+URLEncode(dt)
+		return URL
 
+	def _assignWorkplanResult(self, OVCall, URL):
 		self.errors = []
-		self.jsonData = {}
-		self.OVCall = curl('POST',URL,auth=self.auth)
-		self.jsonData = self.OVCall.jsonData
-		self.request = self.OVCall.request
+		self.OVCall = OVCall
+		self.jsonData = OVCall.jsonData
+		self.request = OVCall.request
 
 		Message(URL,2)
-		Message("{TrackorType} assign workplan completed in {Duration} seconds.".format(
+		Message("{TrackorType} assign workplan completed in {Duration} seconds ({Timing}).".format(
 			TrackorType=self.TrackorType,
-			Duration=self.OVCall.duration
+			Duration=OVCall.duration,
+			Timing=OVCall.getTimingText()
 			),1)
-		if len(self.OVCall.errors) > 0:
-			self.errors.append(self.OVCall.errors)
-			TraceTag="{TimeStamp}:".format(TimeStamp=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f'))
-			self.TraceTag = TraceTag
-			onevizion.Config["Trace"][TraceTag+"-URL"] = URL
-			try:
-				TraceMessage("Status Code: {StatusCode}".format(StatusCode=self.OVCall.request.status_code),0,TraceTag+"-StatusCode")
-				TraceMessage("Reason: {Reason}".format(Reason=self.OVCall.request.reason),0,TraceTag+"-Reason")
-				TraceMessage("Body:\n{Body}".format(Body=self.OVCall.request.text),0,TraceTag+"-Body")
-			except Exception as e:
-				TraceMessage("Errors:\n{Errors}".format(Errors=json.dumps(self.OVCall.errors,indent=2)),0,TraceTag+"-Errors")
-			onevizion.Config["Error"]=True
+		if len(OVCall.errors) > 0:
+			self.errors.append(OVCall.errors)
+			self.TraceTag = TraceCallErrors(OVCall, URL)
+		retainCall(self, OVCall)
 
 
 	def GetFile(self, trackorId=None, fieldName=None, blobDataId=None):
@@ -441,43 +600,38 @@ class Trackor(object):
 			return None
 
 		before = datetime.utcnow()
-		try:
-			# NOTE the stream=True parameter
-			self.request = requests.get(URL, stream=True, auth=self.auth,allow_redirects=True)
-			with open(tmpFileName, 'wb') as f:
-				for chunk in self.request.iter_content(chunk_size=1024):
-					if chunk: # filter out keep-alive new chunks
-						f.write(chunk)
-						#f.flush() commented by recommendation from J.F.Sebastian
-		except Exception as e:
-			self.errors.append(str(e))
+		# NOTE the stream=True parameter
+		OVCall = curl('GET',URL,auth=self.auth,client=self.client,operation='Trackor.GetFile',stream=True)
+		self.OVCall = OVCall
+		self.request = OVCall.request
+		if len(OVCall.errors) > 0:
+			self.errors.append(OVCall.errors)
 		else:
-			if self.request.status_code not in range(200,300):
-				self.errors.append(str(self.request.status_code)+" = "+self.request.reason)
+			try:
+				with open(tmpFileName, 'wb') as f:
+					for chunk in self.request.iter_content(chunk_size=1024):
+						if chunk: # filter out keep-alive new chunks
+							f.write(chunk)
+							#f.flush() commented by recommendation from J.F.Sebastian
+			except Exception as e:
+				self.errors.append(str(e))
 		after = datetime.utcnow()
 		delta = after - before
 		self.duration = delta.total_seconds()
 
 		Message(URL,2)
-		Message("{TrackorType} get file completed in {Duration} seconds.".format(
+		Message("{TrackorType} get file completed in {Duration} seconds ({Timing}).".format(
 			TrackorType=self.TrackorType,
-			Duration=self.duration
+			Duration=self.duration,
+			Timing=OVCall.getTimingText()
 			),1)
 		if len(self.errors) > 0:
-			TraceTag="{TimeStamp}:".format(TimeStamp=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f'))
-			self.TraceTag = TraceTag
-			onevizion.Config["Trace"][TraceTag+"-URL"] = URL
-			try:
-				TraceMessage("Status Code: {StatusCode}".format(StatusCode=self.request.status_code),0,TraceTag+"-StatusCode")
-				TraceMessage("Reason: {Reason}".format(Reason=self.request.reason),0,TraceTag+"-Reason")
-				TraceMessage("Body:\n{Body}".format(Body=self.request.text),0,TraceTag+"-Body")
-			except Exception as e:
-				pass
-				TraceMessage("Errors:\n{Errors}".format(Errors=json.dumps(self.errors,indent=2)),0,TraceTag+"-Errors")
-			onevizion.Config["Error"]=True
+			self.TraceTag = TraceCallErrors(OVCall, URL)
+		contentDisposition = self.request.headers.get('content-disposition') if self.request is not None else None
+		retainCall(self, OVCall)
 
 		# return the name of the fiel that was downloaded.
-		newFileName = get_filename_from_cd(self.request.headers.get('content-disposition'))
+		newFileName = get_filename_from_cd(contentDisposition)
 		if newFileName is not None and len(newFileName) > 0:
 			os.rename(tmpFileName,newFileName)
 			return newFileName
@@ -512,7 +666,18 @@ class Trackor(object):
 			fileName: name of the file you want to upload.
 			fileContents: byte string or BufferedReader of the file you want to upload.
 		"""
+		URL, File = self._uploadFileRequest(trackorId, fieldName, fileName, fileContents)
+		self._uploadFileResult(curl('POST',URL,auth=self.auth,files=File,client=self.client,operation='Trackor.UploadFileByFileContents'), URL, fileName)
 
+	async def UploadFileByFileContentsAsync(self, trackorId, fieldName, fileName, fileContents):
+		""" Same as UploadFileByFileContents, but awaits the call on the running event loop.  Returns the AsyncCurl object of the call.
+		"""
+		URL, File = self._uploadFileRequest(trackorId, fieldName, fileName, fileContents)
+		OVCall = await AsyncCurl('POST',URL,auth=self.auth,files=File,client=self.client,operation='Trackor.UploadFileByFileContents')
+		self._uploadFileResult(OVCall, URL, fileName)
+		return OVCall
+
+	def _uploadFileRequest(self, trackorId, fieldName, fileName, fileContents):
 		URL = "{Website}/api/v3/trackor/{TrackorID}/file/{ConfigFieldName}".format(
 				Website=self.URL,
 				TrackorID=trackorId,
@@ -521,29 +686,175 @@ class Trackor(object):
 
 		URL += "?file_name=" + URLEncode(fileName)
 		File = {'file': (fileName, fileContents)}
+		return URL, File
 
+	def _uploadFileResult(self, OVCall, URL, fileName):
+		self._invalidateReadCache()
 		self.errors = []
-		self.jsonData = {}
-		self.OVCall = curl('POST',URL,auth=self.auth,files=File)
-		self.jsonData = self.OVCall.jsonData
-		self.request = self.OVCall.request
+		self.OVCall = OVCall
+		self.jsonData = OVCall.jsonData
+		self.request = OVCall.request
 
 		Message(URL,2)
 		Message("FileName: {FileName}".format(FileName=fileName),2)
-		Message("{TrackorType} upload file completed in {Duration} seconds.".format(
+		Message("{TrackorType} upload file completed in {Duration} seconds ({Timing}).".format(
 			TrackorType=self.TrackorType,
-			Duration=self.OVCall.duration
+			Duration=OVCall.duration,
+			Timing=OVCall.getTimingText()
 			),1)
-		if len(self.OVCall.errors) > 0:
-			self.errors.append(self.OVCall.errors)
-			TraceTag="{TimeStamp}:".format(TimeStamp=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f'))
-			self.TraceTag = TraceTag
-			onevizion.Config["Trace"][TraceTag+"-URL"] = URL
-			onevizion.Config["Trace"][TraceTag+"-FileName"] = fileName
-			try:
-				TraceMessage("Status Code: {StatusCode}".format(StatusCode=self.OVCall.request.status_code),0,TraceTag+"-StatusCode")
-				TraceMessage("Reason: {Reason}".format(Reason=self.OVCall.request.reason),0,TraceTag+"-Reason")
-				TraceMessage("Body:\n{Body}".format(Body=self.OVCall.request.text),0,TraceTag+"-Body")
-			except Exception as e:
-				TraceMessage("Errors:\n{Errors}".format(Errors=json.dumps(self.OVCall.errors,indent=2)),0,TraceTag+"-Errors")
-			onevizion.Config["Error"]=True
+		if len(OVCall.errors) > 0:
+			self.errors.append(OVCall.errors)
+			self.TraceTag = TraceCallErrors(OVCall, URL, {"FileName": fileName})
+		retainCall(self, OVCall)
+
+
+class TrackorResults(object):
+	"""Result call style of a Trackor, see CallResult.  It has the same methods as Trackor, each returning
+		a CallResult instead of setting the Trackor's attributes.  Get it from Trackor.results.
+	"""
+
+	def __init__(self, trackor):
+		self._trackor = trackor
+
+	def _written(self, OVCall):
+		self._trackor._invalidateReadCache()
+		return CallResult(OVCall)
+
+	def delete(self, trackorId):
+		URL = self._trackor._deleteRequest(trackorId)
+		return self._written(curl('DELETE',URL,auth=self._trackor.auth,client=self._trackor.client,operation='Trackor.delete'))
+
+	async def deleteAsync(self, trackorId):
+		URL = self._trackor._deleteRequest(trackorId)
+		return self._written(await AsyncCurl('DELETE',URL,auth=self._trackor.auth,client=self._trackor.client,operation='Trackor.delete'))
+
+	def read(self, trackorId=None, filterOptions=None, filters={}, search=None, viewOptions=None, fields=[], sort={}, page=None, perPage=1000):
+		Method, URL, SearchBody = self._trackor._readRequest(trackorId, filterOptions, filters, search, viewOptions, fields, sort, page, perPage)
+		return CallResult(self._trackor._readCall(Method, URL, SearchBody))
+
+	async def readAsync(self, trackorId=None, filterOptions=None, filters={}, search=None, viewOptions=None, fields=[], sort={}, page=None, perPage=1000):
+		Method, URL, SearchBody = self._trackor._readRequest(trackorId, filterOptions, filters, search, viewOptions, fields, sort, page, perPage)
+		return CallResult(await self._trackor._readCallAsync(Method, URL, SearchBody))
+
+	def update(self, trackorId=None, filters={}, fields={}, parents={}, charset=""):
+		URL, JSON, Headers, JSONObj = self._trackor._updateRequest(trackorId, filters, fields, parents, charset)
+		return self._written(curl('PUT',URL, data=JSON, headers=Headers, auth=self._trackor.auth, client=self._trackor.client, operation='Trackor.update'))
+
+	async def updateAsync(self, trackorId=None, filters={}, fields={}, parents={}, charset=""):
+		URL, JSON, Headers, JSONObj = self._trackor._updateRequest(trackorId, filters, fields, parents, charset)
+		return self._written(await AsyncCurl('PUT',URL, data=JSON, headers=Headers, auth=self._trackor.auth, client=self._trackor.client, operation='Trackor.update'))
+
+	def create(self, fields={}, parents={}, charset=""):
+		URL, JSON, Headers, JSONObj = self._trackor._createRequest(fields, parents, charset)
+		return self._written(curl('POST',URL, data=JSON, headers=Headers, auth=self._trackor.auth, client=self._trackor.client, operation='Trackor.create'))
+
+	async def createAsync(self, fields={}, parents={}, charset=""):
+		URL, JSON, Headers, JSONObj = self._trackor._createRequest(fields, parents, charset)
+		return self._written(await AsyncCurl('POST',URL, data=JSON, headers=Headers, auth=self._trackor.auth, client=self._trackor.client, operation='Trackor.create'))
+
+	def assignWorkplan(self, trackorId, workplanTemplate, name=None, isActive=False, startDate=None, finishDate=None):
+		URL = self._trackor._assignWorkplanRequest(trackorId, workplanTemplate, name, isActive, startDate, finishDate)
+		return CallResult(curl('POST',URL,auth=self._trackor.auth,client=self._trackor.client,operation='Trackor.assignWorkplan'))
+
+	async def assignWorkplanAsync(self, trackorId, workplanTemplate, name=None, isActive=False, startDate=None, finishDate=None):
+		URL = self._trackor._assignWorkplanRequest(trackorId, workplanTemplate, name, isActive, startDate, finishDate)
+		return CallResult(await AsyncCurl('POST',URL,auth=self._trackor.auth,client=self._trackor.client,operation='Trackor.assignWorkplan'))
+
+	def UploadFileByFileContents(self, trackorId, fieldName, fileName, fileContents):
+		URL, File = self._trackor._uploadFileRequest(trackorId, fieldName, fileName, fileContents)
+		return self._written(curl('POST',URL,auth=self._trackor.auth,files=File,client=self._trackor.client,operation='Trackor.UploadFileByFileContents'))
+
+	async def UploadFileByFileContentsAsync(self, trackorId, fieldName, fileName, fileContents):
+		URL, File = self._trackor._uploadFileRequest(trackorId, fieldName, fileName, fileContents)
+		return self._written(await AsyncCurl('POST',URL,auth=self._trackor.auth,files=File,client=self._trackor.client,operation='Trackor.UploadFileByFileContents'))
+
+
+class _PagedRead(object):
+	"""Pages of one Trackor.iterRead: which to ask for next, which to hand out next, and when to stop.
+		Pages are asked for in order up to the first one that comes back short or failed, with at most
+		"window" of them asked for or waiting to be handed out at once.
+	"""
+
+	Done = object()
+
+	def __init__(self, perPage, window, ordered, wake):
+		self.perPage = perPage
+		self.window = window
+		self.ordered = ordered
+		self.wake = wake
+		self.lastPage = None
+		self._nextPage = 1
+		self._nextHandedOut = 1
+		self._handedOut = set()
+		self._held = 0
+		self._started = {}
+		self._arrived = {}
+		self._closed = False
+		self._lock = threading.RLock()
+
+	def start(self, launch):
+		"""Asks for the next pages the window has room for.  launch(page) returns the future or task reading
+			the page, which returns (OVCall, URL, SearchBody).
+		"""
+		with self._lock:
+			while not self._closed and self._held < self.window and (self.lastPage is None or self._nextPage <= self.lastPage):
+				page = self._nextPage
+				self._nextPage += 1
+				self._held += 1
+				self._started[page] = launch(page)
+				self._started[page].add_done_callback(lambda done, page=page: self._arrive(page, done))
+
+	def _arrive(self, page, done):
+		if done.cancelled():
+			return
+		try:
+			item = done.result() + (None,)
+		except Exception as e:
+			item = (None, None, None, e)
+		with self._lock:
+			self._started.pop(page, None)
+			self._arrived[page] = item
+			if item[3] is not None or not Trackor._isFullPage(item[0], self.perPage):
+				if self.lastPage is None or page < self.lastPage:
+					self.lastPage = page
+			if self.lastPage is not None:
+				self._drop([later for later in self._arrived if later > self.lastPage])
+				self._drop([later for later in self._started if later > self.lastPage])
+		self.wake()
+
+	def _drop(self, pages):
+		for page in pages:
+			if page in self._arrived:
+				del self._arrived[page]
+				self._held -= 1
+			elif self._started[page].cancel():
+				del self._started[page]
+				self._held -= 1
+			# Otherwise it is being read already, and is dropped when it arrives.
+
+	def next(self):
+		"""Returns the (OVCall, URL, SearchBody) of the next page to hand out, None if it has not arrived yet,
+			or Done once every page up to the last one has been handed out.  A page that raised raises here.
+		"""
+		with self._lock:
+			if self.lastPage is not None and len([page for page in self._handedOut if page <= self.lastPage]) >= self.lastPage:
+				return _PagedRead.Done
+			if self.ordered:
+				page = self._nextHandedOut if self._nextHandedOut in self._arrived else None
+			else:
+				page = min(self._arrived) if len(self._arrived) > 0 else None
+			if page is None:
+				return None
+			OVCall, URL, SearchBody, exception = self._arrived.pop(page)
+			self._handedOut.add(page)
+			self._nextHandedOut += 1
+			self._held -= 1
+		if exception is not None:
+			raise exception
+		return OVCall, URL, SearchBody
+
+	def close(self):
+		with self._lock:
+			self._closed = True
+			for started in self._started.values():
+				started.cancel()
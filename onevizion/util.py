@@ -2,6 +2,8 @@ import urllib
 import os
 import json
 import base64
+import hashlib
+import requests
 from datetime import datetime, date
 import onevizion
 
@@ -48,6 +50,60 @@ def TraceMessage(Msg,Level=0,TraceTag=None):
 	onevizion.Config["Trace"][Tag]=Msg
 
 
+def TraceCallErrors(OVCall, URL, ExtraTrace={}, TraceTag=None):
+	"""Records the details of a failed API call in onevizion.Config["Trace"] and flags onevizion.Config["Error"].
+		Returns the TraceTag the entries were stored under.
+	"""
+	if TraceTag is None:
+		TraceTag="{TimeStamp}:".format(TimeStamp=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f'))
+	onevizion.Config["Trace"][TraceTag+"-URL"] = URL
+	for key, value in ExtraTrace.items():
+		onevizion.Config["Trace"][TraceTag+"-"+key] = value
+	try:
+		TraceMessage("Status Code: {StatusCode}".format(StatusCode=OVCall.request.status_code),0,TraceTag+"-StatusCode")
+		TraceMessage("Reason: {Reason}".format(Reason=OVCall.request.reason),0,TraceTag+"-Reason")
+		TraceMessage("Body:\n{Body}".format(Body=OVCall.request.text),0,TraceTag+"-Body")
+	except Exception as e:
+		TraceMessage("Errors:\n{Errors}".format(Errors=json.dumps(OVCall.errors,indent=2)),0,TraceTag+"-Errors")
+	onevizion.Config["Error"]=True
+	return TraceTag
+
+
+def getCredentialKey(auth):
+	"""Returns a short hash that identifies the credentials of an auth object, so calls can be grouped
+		by user without keeping the secret itself around.  Returns None when there is no auth.
+	"""
+	if auth is None:
+		return None
+	try:
+		r = requests.PreparedRequest()
+		r.prepare_headers({})
+		auth(r)
+		identity = r.headers.get('Authorization')
+	except Exception as e:
+		identity = None
+	if identity is None:
+		identity = "{Type}:{Id}".format(Type=type(auth).__name__, Id=id(auth))
+	return hashlib.sha256(identity.encode('utf-8')).hexdigest()[:16]
+
+
+def getEndpointTemplate(url):
+	"""Returns the path of an API URL with the query removed and the variable parts replaced by
+		placeholders, for instance "/api/v3/trackor_types/{type}/trackors" or "/api/v3/trackors/{id}".
+	"""
+	from urllib.parse import urlsplit
+	segments = urlsplit(url).path.split('/')
+	for i in range(len(segments)):
+		previous = segments[i-1] if i > 0 else ''
+		if segments[i].isdigit():
+			segments[i] = '{id}'
+		elif previous == 'trackor_types' or (previous == 'exports' and segments[i] != 'runs'):
+			segments[i] = '{type}'
+		elif previous == 'file' and i > 1 and segments[i-2] == '{id}':
+			segments[i] = '{field}'
+	return '/'.join(segments)
+
+
 def getUrlContainingScheme(url):
 	if not url:
 		return ""
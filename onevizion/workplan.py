@@ -3,6 +3,9 @@ import json
 from datetime import datetime
 from onevizion.util import *
 from onevizion.curl import curl
+from onevizion.asynccurl import AsyncCurl
+from onevizion.retention import retainCall
+from onevizion.result import CallResult
 from onevizion.httpbearer import HTTPBearerAuth
 from onevizion.EMail import EMail
 import onevizion
@@ -15,19 +18,21 @@ class WorkPlan(object):
 		URL: A string representing the website's main URL for instance "trackor.onevizion.com".
 		userName: the username used to login to the system
 		password: the password used to gain access to the system
+		client: OneVizionClient whose login, pool and call settings are used, see OneVizionClient.workPlan
 
 		errors: array of any errors encounterd
 		OVCall: the requests object of call to the web api
 		jsonData: the json data converted to python array
 	"""
 
-	def __init__(self, URL = "", userName="", password="", paramToken=None, isTokenAuth=False):
+	def __init__(self, URL = "", userName="", password="", paramToken=None, isTokenAuth=False, client=None):
 		self.URL = URL
 		self.userName = userName
 		self.password = password
 		self.errors = []
 		self.jsonData = {}
 		self.OVCall = curl()
+		self.client = client
 		if paramToken is not None:
 			if self.URL == "":
 				self.URL = onevizion.Config["ParameterData"][paramToken]['url']
@@ -36,17 +41,45 @@ class WorkPlan(object):
 			if self.password == "":
 				self.password = onevizion.Config["ParameterData"][paramToken]['Password']
 
+		if client is not None:
+			# The login of the client, unless this wrapper was given its own.
+			if not self.URL:
+				self.URL = client.URL
+			if not self.userName:
+				self.userName = client.userName
+			if not self.password:
+				self.password = client.password
+
 		self.URL = getUrlContainingScheme(self.URL)
 
-		if isTokenAuth:
+		if client is not None:
+			self.auth = client.auth
+		elif isTokenAuth:
 			self.auth = HTTPBearerAuth(self.userName, self.password)
 		else:
 			self.auth = requests.auth.HTTPBasicAuth(self.userName, self.password)
 
+	@property
+	def results(self):
+		"""The result call style of this WorkPlan: workplan.results.read(...) returns a CallResult and is thread safe."""
+		return WorkPlanResults(self)
+
 	def read(self, workplanId = None, workplanTemplate = "", trackorType = "", trackorId = None):
 		""" Retrieve some data about a particular WorkPlan.WorkPlan must be
 			identified either by workplanId or by a WorkPlanTemplate, TrackorType, and TrackorID
 		"""
+		URL = self._readRequest(workplanId, workplanTemplate, trackorType, trackorId)
+		self._readResult(curl('GET',URL,auth=self.auth,client=self.client,operation='WorkPlan.read'), URL)
+
+	async def readAsync(self, workplanId = None, workplanTemplate = "", trackorType = "", trackorId = None):
+		""" Same as read, but awaits the call on the running event loop.  Returns the AsyncCurl object of the call.
+		"""
+		URL = self._readRequest(workplanId, workplanTemplate, trackorType, trackorId)
+		OVCall = await AsyncCurl('GET',URL,auth=self.auth,client=self.client,operation='WorkPlan.read')
+		self._readResult(OVCall, URL)
+		return OVCall
+
+	def _readRequest(self, workplanId, workplanTemplate, trackorType, trackorId):
 		FilterSection = ""
 		if workplanId is None:
 			#?wp_template=Augment%20Workplan&trackor_type=SAR&trackor_id=1234
@@ -59,24 +92,34 @@ class WorkPlan(object):
 			#1234
 			FilterSection = str(workplanId)
 
-		URL = "{URL}/api/v3/wps/{FilterSection}".format(URL=self.URL, FilterSection=FilterSection)
+		return "{URL}/api/v3/wps/{FilterSection}".format(URL=self.URL, FilterSection=FilterSection)
+
+	def _readResult(self, OVCall, URL):
 		self.errors = []
-		self.jsonData = {}
-		self.OVCall = curl('GET',URL,auth=self.auth)
-		self.jsonData = self.OVCall.jsonData
-		self.request = self.OVCall.request
+		self.OVCall = OVCall
+		self.jsonData = OVCall.jsonData
+		self.request = OVCall.request
 
 		Message(URL,2)
-		Message("Workplan read completed in {Duration} seconds.".format(Duration=self.OVCall.duration),1)
-		if len(self.OVCall.errors) > 0:
-			self.errors.append(self.OVCall.errors)
-			TraceTag="{TimeStamp}:".format(TimeStamp=datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f'))
-			self.TraceTag = TraceTag
-			onevizion.Config["Trace"][TraceTag+"-URL"] = URL
-			try:
-				TraceMessage("Status Code: {StatusCode}".format(StatusCode=self.OVCall.request.status_code),0,TraceTag+"-StatusCode")
-				TraceMessage("Reason: {Reason}".format(Reason=self.OVCall.request.reason),0,TraceTag+"-Reason")
-				TraceMessage("Body:\n{Body}".format(Body=self.OVCall.request.text),0,TraceTag+"-Body")
-			except Exception as e:
-				TraceMessage("Errors:\n{Errors}".format(Errors=json.dumps(self.OVCall.errors,indent=2)),0,TraceTag+"-Errors")
-			onevizion.Config["Error"]=True
+		Message("Workplan read completed in {Duration} seconds ({Timing}).".format(Duration=OVCall.duration, Timing=OVCall.getTimingText()),1)
+		if len(OVCall.errors) > 0:
+			self.errors.append(OVCall.errors)
+			self.TraceTag = TraceCallErrors(OVCall, URL)
+		retainCall(self, OVCall)
+
+
+class WorkPlanResults(object):
+	"""Result call style of a WorkPlan, see CallResult.  It has the same methods as WorkPlan, each returning
+		a CallResult instead of setting the WorkPlan's attributes.  Get it from WorkPlan.results.
+	"""
+
+	def __init__(self, workplan):
+		self._workplan = workplan
+
+	def read(self, workplanId=None, workplanTemplate="", trackorType="", trackorId=None):
+		URL = self._workplan._readRequest(workplanId, workplanTemplate, trackorType, trackorId)
+		return CallResult(curl('GET',URL,auth=self._workplan.auth,client=self._workplan.client,operation='WorkPlan.read'))
+
+	async def readAsync(self, workplanId=None, workplanTemplate="", trackorType="", trackorId=None):
+		URL = self._workplan._readRequest(workplanId, workplanTemplate, trackorType, trackorId)
+		return CallResult(await AsyncCurl('GET',URL,auth=self._workplan.auth,client=self._workplan.client,operation='WorkPlan.read'))
@@ -0,0 +1,67 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+class LocalServer(object):
+	"""Threaded HTTP server on a free local port, so the tests run without a OneVizion instance.
+
+		GET /rows?count=N&sleep=S answers a JSON list of N Trackors after S seconds.
+		GET /api/v3/trackor/<id>/file/<field> and /api/v3/files/<id> answer a text file.
+
+	Attributes:
+		URL: base URL of the server, such as "http://127.0.0.1:54321"
+		requests: number of requests answered
+	"""
+
+	FileBody = b"name,value\nfirst,1\nsecond,2\n"
+	FileName = "export.csv"
+
+	def __init__(self):
+		server = self
+		self.requests = 0
+		self._lock = threading.Lock()
+
+		class Handler(BaseHTTPRequestHandler):
+			protocol_version = "HTTP/1.1"
+
+			def log_message(self, format, *args):
+				pass
+
+			def do_GET(self):
+				with server._lock:
+					server.requests += 1
+				parts = urlsplit(self.path)
+				query = parse_qs(parts.query)
+				time.sleep(float(query.get('sleep', ['0'])[0]))
+				if parts.path == '/rows':
+					count = int(query.get('count', ['1'])[0])
+					rows = [{"TRACKOR_ID": i, "TRACKOR_KEY": "K{Index}".format(Index=i)} for i in range(count)]
+					self._answer(json.dumps(rows).encode('utf-8'), 'application/json')
+				elif '/file/' in parts.path or parts.path.startswith('/api/v3/files/'):
+					self._answer(LocalServer.FileBody, 'text/csv', {'Content-Disposition': 'attachment; filename=' + LocalServer.FileName})
+				else:
+					self._answer(b'{"error": "not found"}', 'application/json', status=404)
+
+			def _answer(self, body, contentType, headers={}, status=200):
+				self.send_response(status)
+				self.send_header('Content-Type', contentType)
+				self.send_header('Content-Length', str(len(body)))
+				for name, value in headers.items():
+					self.send_header(name, value)
+				self.end_headers()
+				self.wfile.write(body)
+
+		self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+		self._server.daemon_threads = True
+		self.URL = "http://127.0.0.1:{Port}".format(Port=self._server.server_address[1])
+		self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+	def start(self):
+		self._thread.start()
+		return self
+
+	def stop(self):
+		self._server.shutdown()
+		self._server.server_close()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+import onevizion
+from localserver import LocalServer
+
+class TestCassetteGetFile(unittest.TestCase):
+
+	@classmethod
+	def setUpClass(cls):
+		cls.server = LocalServer().start()
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.server.stop()
+
+	def setUp(self):
+		self.cassette = onevizion.Config["Cassette"]
+		self.workingDir = os.getcwd()
+		self.tempDir = tempfile.TemporaryDirectory()
+		# GetFile saves the download in the working directory.
+		os.chdir(self.tempDir.name)
+		self.fileName = os.path.join(self.tempDir.name, "getfile.json.gz")
+
+	def tearDown(self):
+		onevizion.Config["Cassette"] = self.cassette
+		os.chdir(self.workingDir)
+		self.tempDir.cleanup()
+
+	def getFile(self):
+		trackor = onevizion.Trackor(trackorType='Site', URL=self.server.URL, userName='user', password='password')
+		fileName = trackor.GetFile(trackorId=1001, fieldName='SITE_FILE')
+		self.assertEqual(trackor.errors, [])
+		self.assertEqual(fileName, LocalServer.FileName)
+		with open(fileName, 'rb') as f:
+			self.assertEqual(f.read(), LocalServer.FileBody)
+		os.remove(fileName)
+
+	def test_record_and_replay(self):
+		with onevizion.Cassette(self.fileName, onevizion.CassetteMode.RECORD) as cassette:
+			onevizion.Config["Cassette"] = cassette
+			self.getFile()
+		requests = self.server.requests
+
+		cassette = onevizion.Cassette(self.fileName, onevizion.CassetteMode.REPLAY)
+		onevizion.Config["Cassette"] = cassette
+		self.getFile()
+		self.assertEqual(cassette.hits, 1)
+		self.assertEqual(self.server.requests, requests)
+
+	def test_replay_miss(self):
+		with onevizion.Cassette(self.fileName, onevizion.CassetteMode.RECORD) as cassette:
+			pass
+		onevizion.Config["Cassette"] = onevizion.Cassette(self.fileName, onevizion.CassetteMode.REPLAY)
+		trackor = onevizion.Trackor(trackorType='Site', URL=self.server.URL, userName='user', password='password')
+		trackor.GetFile(trackorId=1001, fieldName='SITE_FILE')
+		self.assertIsInstance(trackor.OVCall.exception, onevizion.CassetteMissError)
+
+
+if __name__ == '__main__':
+	unittest.main()
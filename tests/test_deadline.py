@@ -0,0 +1,51 @@
+import asyncio
+import time
+import unittest
+import onevizion
+from onevizion.curl import curl
+from onevizion.asynccurl import AsyncCurl
+from localserver import LocalServer
+
+class TestRateLimitDeadline(unittest.TestCase):
+
+	@classmethod
+	def setUpClass(cls):
+		cls.server = LocalServer().start()
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.server.stop()
+
+	def setUp(self):
+		self.rateLimiter = onevizion.Config["RateLimiter"]
+		# One call every 5 seconds: the second call would wait far past the deadline.
+		onevizion.Config["RateLimiter"] = onevizion.RateLimiter(readRate=0.2, readBurst=1)
+		self.URL = self.server.URL + "/rows?count=1"
+
+	def tearDown(self):
+		onevizion.Config["RateLimiter"] = self.rateLimiter
+
+	def test_wait_past_deadline_fails_at_once(self):
+		with onevizion.Deadline(1):
+			self.assertEqual(curl('GET', self.URL).errors, [])
+			start = time.monotonic()
+			call = curl('GET', self.URL)
+		self.assertLess(time.monotonic() - start, 0.5)
+		self.assertIsInstance(call.exception, onevizion.DeadlineExceeded)
+		self.assertEqual(call.rateLimitWait, 0.0)
+
+	def test_wait_past_deadline_fails_at_once_async(self):
+		async def run():
+			with onevizion.Deadline(1):
+				self.assertEqual((await AsyncCurl('GET', self.URL)).errors, [])
+				start = time.monotonic()
+				call = await AsyncCurl('GET', self.URL)
+			return call, time.monotonic() - start
+
+		call, seconds = asyncio.run(run())
+		self.assertLess(seconds, 0.5)
+		self.assertIsInstance(call.exception, onevizion.DeadlineExceeded)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+import onevizion
+from localserver import LocalServer
+
+class TestGetFileRetention(unittest.TestCase):
+
+	@classmethod
+	def setUpClass(cls):
+		cls.server = LocalServer().start()
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.server.stop()
+
+	def setUp(self):
+		self.retention = onevizion.Config["Retention"]
+		self.workingDir = os.getcwd()
+		self.tempDir = tempfile.TemporaryDirectory()
+		# GetFile saves the download in the working directory.
+		os.chdir(self.tempDir.name)
+
+	def tearDown(self):
+		onevizion.Config["Retention"] = self.retention
+		os.chdir(self.workingDir)
+		self.tempDir.cleanup()
+
+	def getFile(self, retention):
+		onevizion.Config["Retention"] = retention
+		trackor = onevizion.Trackor(trackorType='Site', URL=self.server.URL, userName='user', password='password')
+		fileName = trackor.GetFile(trackorId=1001, fieldName='SITE_FILE')
+		self.assertEqual(trackor.errors, [])
+		self.assertEqual(fileName, LocalServer.FileName)
+		with open(fileName, 'rb') as f:
+			self.assertEqual(f.read(), LocalServer.FileBody)
+		return trackor
+
+	def test_full(self):
+		trackor = self.getFile(onevizion.Retention.FULL)
+		self.assertIsNotNone(trackor.request)
+
+	def test_result(self):
+		trackor = self.getFile(onevizion.Retention.RESULT)
+		self.assertEqual(trackor.OVCall.jsonData, {})
+		self.assertEqual(trackor.request.content, b'')
+
+	def test_none(self):
+		trackor = self.getFile(onevizion.Retention.NONE)
+		self.assertIsNone(trackor.OVCall)
+		self.assertIsNone(trackor.request)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,54 @@
+import threading
+import unittest
+import onevizion
+from onevizion.curl import curl
+from localserver import LocalServer
+
+class TestSingleFlight(unittest.TestCase):
+
+	Threads = 8
+	Rounds = 5
+	Rows = 100000
+
+	@classmethod
+	def setUpClass(cls):
+		cls.server = LocalServer().start()
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.server.stop()
+
+	def setUp(self):
+		self.singleFlight = onevizion.Config["SingleFlight"]
+		onevizion.Config["SingleFlight"] = True
+
+	def tearDown(self):
+		onevizion.Config["SingleFlight"] = self.singleFlight
+
+	def test_followers_read_the_owners_jsonData(self):
+		URL = "{URL}/rows?count={Count}&sleep=0.2".format(URL=self.server.URL, Count=TestSingleFlight.Rows)
+		for _ in range(TestSingleFlight.Rounds):
+			barrier = threading.Barrier(TestSingleFlight.Threads)
+			calls = [None] * TestSingleFlight.Threads
+			sizes = [None] * TestSingleFlight.Threads
+
+			def run(index):
+				barrier.wait()
+				calls[index] = curl('GET', URL)
+				# Owner and followers all parse at once, as soon as the shared call completes.
+				sizes[index] = len(calls[index].jsonData)
+
+			threads = [threading.Thread(target=run, args=(index,)) for index in range(TestSingleFlight.Threads)]
+			for thread in threads:
+				thread.start()
+			for thread in threads:
+				thread.join()
+
+			self.assertTrue(any(call.coalesced for call in calls))
+			for call, size in zip(calls, sizes):
+				self.assertEqual(call.errors, [])
+				self.assertEqual(size, TestSingleFlight.Rows, "coalesced={Coalesced}".format(Coalesced=call.coalesced))
+
+
+if __name__ == '__main__':
+	unittest.main()